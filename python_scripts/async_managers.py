@@ -0,0 +1,1099 @@
+#!/usr/bin/env python3
+"""
+Async Managers
+asyncio counterparts of the DNA Center and ISE managers, built on aiohttp, so both
+deployments can run side by side from one event loop
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from typing import AsyncIterator, Awaitable, Dict, List, Mapping, Optional, Tuple, Union
+
+import aiohttp
+
+from dnac_fabric_manager import (DEVICE_PAGE_SIZE, ROLE_ENDPOINTS, TASK_POLL_BACKOFF,
+                                 TASK_POLL_INITIAL_INTERVAL, TASK_POLL_MAX_FAILURES,
+                                 TASK_POLL_MAX_INTERVAL, TOKEN_LIFETIME, TOKEN_REFRESH_MARGIN,
+                                 DNACFabricManager, DNACQueryError)
+from ise_policy_manager import ERS_PAGE_SIZE, ISEPolicyManager, ISEQueryError
+from rate_limiter import RateLimiter
+from request_metrics import RequestLog, RequestMetrics
+
+# Connections kept open per host; requests beyond this queue for a free connection
+DEFAULT_MAX_CONNECTIONS = 100
+
+
+def create_session(max_connections: int = DEFAULT_MAX_CONNECTIONS) -> aiohttp.ClientSession:
+    """
+    Create a keep-alive session that DNA Center and ISE clients can share
+    
+    Must be called from a running event loop.
+    
+    Args:
+        max_connections: Maximum open connections per host
+    
+    Returns:
+        aiohttp.ClientSession
+    """
+    connector = aiohttp.TCPConnector(limit=0, limit_per_host=max(1, max_connections))
+    return aiohttp.ClientSession(connector=connector)
+
+
+class _AsyncClient:
+    """Session ownership shared by the async managers"""
+    
+    def __init__(self, host: str, verify_ssl: bool, session: Optional[aiohttp.ClientSession],
+                 rate_limiter: Optional[RateLimiter], max_connections: int,
+                 metrics: Optional[RequestMetrics]):
+        self.host = host
+        self.verify_ssl = verify_ssl
+        self.base_url = f"https://{host}"
+        self.session = session
+        self._owns_session = session is None
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_connections = max_connections
+        self.metrics = metrics or RequestMetrics()
+    
+    async def __aenter__(self):
+        if self.session is None:
+            self.session = create_session(self.max_connections)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def close(self):
+        """Close the session if this client created it"""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    async def _send(self, method: str, url: str, **kwargs) -> Tuple[int, str, Mapping[str, str], str]:
+        """Send one request and read the whole response"""
+        async with self.session.request(method, url, ssl=None if self.verify_ssl else False,
+                                        **kwargs) as response:
+            return response.status, response.reason, response.headers, await response.text()
+    
+    async def _timed_send(self, method: str, endpoint: str,
+                          **kwargs) -> Tuple[int, str, Mapping[str, str], str]:
+        """Send one API request, recording it in the request metrics"""
+        with self.metrics.timer(method, endpoint) as timer:
+            status, reason, headers, body = await self._send(method, f"{self.base_url}{endpoint}",
+                                                             **kwargs)
+            timer.response(status, len(body.encode()))
+        return status, reason, headers, body
+
+
+class AsyncDNACFabricManager(_AsyncClient):
+    """Manages SD-Access fabric configuration via DNA Center APIs without blocking"""
+    
+    # Response parsing is shared with the synchronous manager
+    _get_task_id = DNACFabricManager._get_task_id
+    
+    def __init__(self, host: str, username: str, password: str, verify_ssl: bool = False,
+                 task_timeout: int = 1800, session: Optional[aiohttp.ClientSession] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 metrics: Optional[RequestMetrics] = None):
+        """
+        Initialize DNA Center connection
+        
+        Args:
+            host: DNA Center IP or hostname
+            username: DNA Center username
+            password: DNA Center password
+            verify_ssl: Whether to verify SSL certificates
+            task_timeout: Seconds to wait for an asynchronous task to finish
+            session: Shared aiohttp session; one is created on entering
+                the client's context when omitted
+            rate_limiter: Shared rate limiter; a default one is created when omitted
+            max_connections: Connections per host for a session created here
+            metrics: Shared request metrics; a private one is created when omitted
+        """
+        super().__init__(host, verify_ssl, session, rate_limiter, max_connections, metrics)
+        self.username = username
+        self.password = password
+        self.token = None
+        self.token_acquired_at = 0.0
+        self._auth_lock = asyncio.Lock()
+        self.task_timeout = task_timeout
+        self.task_latencies = []
+    
+    async def authenticate(self) -> bool:
+        """
+        Authenticate to DNA Center and obtain token
+        
+        Returns:
+            bool: True if authentication successful
+        """
+        try:
+            status, reason, _, body = await self._timed_send(
+                "POST",
+                "/dna/system/api/v1/auth/token",
+                auth=aiohttp.BasicAuth(self.username, self.password),
+                headers={"Content-Type": "application/json"},
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+            if status >= 400:
+                print(f"Authentication failed: {status} {reason}")
+                return False
+            
+            self.token = json.loads(body)["Token"]
+            self.token_acquired_at = time.monotonic()
+            print(f"Successfully authenticated to DNA Center at {self.host}")
+            return True
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError) as e:
+            print(f"Authentication failed: {e}")
+            return False
+    
+    async def _refresh_token(self, stale_token: Optional[str]) -> bool:
+        """Re-authenticate once on behalf of all coroutines holding stale_token"""
+        async with self._auth_lock:
+            if self.token and self.token != stale_token:
+                return True
+            print("Refreshing DNA Center token")
+            return await self.authenticate()
+    
+    async def _current_token(self) -> Optional[str]:
+        """Return the token, refreshing it proactively when it is about to expire"""
+        token = self.token
+        if token and time.monotonic() - self.token_acquired_at > TOKEN_LIFETIME - TOKEN_REFRESH_MARGIN:
+            await self._refresh_token(token)
+            token = self.token
+        return token
+    
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                            params: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Make authenticated API request
+        
+        Args:
+            method: HTTP method (GET, POST, PUT, DELETE)
+            endpoint: API endpoint path
+            data: Request payload
+            params: Query string parameters
+        
+        Returns:
+            Response JSON or None on error
+        """
+        if not self.token:
+            print("Not authenticated. Call authenticate() first.")
+            return None
+        
+        url = f"{self.base_url}{endpoint}"
+        params = {key: str(value) for key, value in (params or {}).items()}
+        
+        reauthenticated = False
+        attempt = 0
+        while True:
+            token = await self._current_token()
+            headers = {
+                "X-Auth-Token": token,
+                "Content-Type": "application/json"
+            }
+            
+            try:
+                await self.rate_limiter.acquire_async(endpoint)
+                status, reason, response_headers, body = await self._timed_send(
+                    method,
+                    endpoint,
+                    headers=headers,
+                    json=data,
+                    params=params,
+                    timeout=aiohttp.ClientTimeout(total=60)
+                )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Request failed: {e}")
+                return None
+            
+            if status == 401 and not reauthenticated:
+                reauthenticated = True
+                if not await self._refresh_token(token):
+                    return None
+                continue
+            if await self.rate_limiter.wait_before_retry_async(method, endpoint, status,
+                                                               response_headers, attempt):
+                attempt += 1
+                continue
+            if status >= 400:
+                print(f"Request failed: {status} {reason} for url: {url}")
+                print(f"Response: {body}")
+                return None
+            try:
+                return json.loads(body) if body else {}
+            except ValueError as e:
+                print(f"Request failed: invalid JSON from {url}: {e}")
+                print(f"Response: {body[:500]}")
+                return None
+    
+    async def _get_task_status(self, kind: str, task_id: str) -> Optional[bool]:
+        """
+        Query the current state of a task
+        
+        Args:
+            kind: "task" or "execution"
+            task_id: Task or execution ID
+        
+        Returns:
+            True if finished successfully, False if failed, None while running
+        
+        Raises:
+            DNACQueryError: If the status could not be read
+        """
+        if kind == "task":
+            endpoint = f"/dna/intent/api/v1/task/{task_id}"
+        else:
+            endpoint = f"/dna/intent/api/v1/dnacaap/management/execution-status/{task_id}"
+        result = await self._make_request("GET", endpoint)
+        if result is None:
+            raise DNACQueryError(f"Failed to read the status of {kind} {task_id}")
+        
+        if kind == "task":
+            task = result.get("response")
+            if not task:
+                return None
+            if task.get("isError"):
+                print(f"Task {task_id} failed: {task.get('failureReason', task.get('progress'))}")
+                return False
+            if task.get("endTime"):
+                return True
+            return None
+        
+        status = result.get("status")
+        if status == "SUCCESS":
+            return True
+        if status == "FAILURE":
+            print(f"Execution {task_id} failed: {result.get('bapiError')}")
+            return False
+        return None
+    
+    async def wait_for_task(self, kind: str, task_id: str, description: str = "") -> bool:
+        """
+        Poll a task until it completes, backing off between polls
+        
+        Args:
+            kind: "task" or "execution"
+            task_id: Task or execution ID
+            description: Human readable label used in latency records
+        
+        Returns:
+            bool: True if the task completed successfully
+        """
+        start = time.monotonic()
+        interval = TASK_POLL_INITIAL_INTERVAL
+        failures = 0
+        
+        while True:
+            try:
+                status = await self._get_task_status(kind, task_id)
+                failures = 0
+            except DNACQueryError as e:
+                failures += 1
+                status = None
+                if failures >= TASK_POLL_MAX_FAILURES:
+                    print(f"Giving up on {description or task_id}: {e}")
+                    status = False
+            elapsed = time.monotonic() - start
+            if status is not None:
+                break
+            if elapsed >= self.task_timeout:
+                print(f"Timed out after {elapsed:.0f}s waiting for {description or task_id}")
+                status = False
+                break
+            await asyncio.sleep(min(interval, self.task_timeout - elapsed))
+            interval = min(interval * TASK_POLL_BACKOFF, TASK_POLL_MAX_INTERVAL)
+        
+        self.task_latencies.append({
+            "task_id": task_id,
+            "description": description,
+            "seconds": round(elapsed, 3),
+            "success": status
+        })
+        return status
+    
+    async def _submit_task(self, endpoint: str, data: Dict, description: str) -> bool:
+        """
+        POST an intent request and wait for the resulting task to finish
+        
+        Args:
+            endpoint: API endpoint path
+            data: Request payload
+            description: Human readable label used in latency records
+        
+        Returns:
+            bool: True if the request and its task succeeded
+        """
+        result = await self._make_request("POST", endpoint, data)
+        if not result:
+            return False
+        
+        task = self._get_task_id(result)
+        if task is None:
+            return True
+        return await self.wait_for_task(task[0], task[1], description)
+    
+    async def iter_devices(self, page_size: int = DEVICE_PAGE_SIZE,
+                           filters: Optional[Dict] = None) -> AsyncIterator[Dict]:
+        """
+        Stream network devices from inventory page by page
+        
+        The next page is requested while the caller consumes the current one.
+        
+        Args:
+            page_size: Devices per request (DNA Center caps this at 500)
+            filters: Server-side query filters, e.g. {"family": "Switches and Hubs"}
+        
+        Yields:
+            Device dictionaries
+        
+        Raises:
+            DNACQueryError: If a page cannot be retrieved
+        """
+        endpoint = "/dna/intent/api/v1/network-device"
+        page_size = max(1, min(page_size, DEVICE_PAGE_SIZE))
+        
+        async def fetch_page(offset: int) -> List[Dict]:
+            params = dict(filters or {})
+            params.update(offset=offset, limit=page_size)
+            result = await self._make_request("GET", endpoint, params=params)
+            if not result or not isinstance(result.get("response"), list):
+                raise DNACQueryError(f"Failed to retrieve devices at offset {offset}")
+            return result["response"]
+        
+        # DNA Center offsets are 1-based
+        offset = 1
+        pending = asyncio.ensure_future(fetch_page(offset))
+        try:
+            while True:
+                page = await pending
+                offset += page_size
+                if len(page) >= page_size:
+                    pending = asyncio.ensure_future(fetch_page(offset))
+                
+                for device in page:
+                    yield device
+                
+                if len(page) < page_size:
+                    return
+        finally:
+            # The consumer may stop early (e.g. find_device); drop the prefetch
+            if not pending.done():
+                pending.cancel()
+    
+    async def get_devices(self) -> List[Dict]:
+        """Get all network devices from inventory"""
+        return [device async for device in self.iter_devices()]
+    
+    async def find_device(self, value: str) -> Optional[Dict]:
+        """
+        Find an inventory device by management IP, hostname or serial number
+        
+        Args:
+            value: Management IP, hostname or serial number
+        
+        Returns:
+            Device dictionary or None
+        """
+        async for device in self.iter_devices():
+            if value in (device.get("managementIpAddress"), device.get("hostname"),
+                         device.get("serialNumber")):
+                return device
+        return None
+    
+    async def create_fabric_site(self, site_hierarchy: str, fabric_type: str = "FABRIC_SITE") -> bool:
+        """
+        Create a fabric site
+        
+        Args:
+            site_hierarchy: Site name hierarchy
+            fabric_type: Type of fabric site
+        
+        Returns:
+            bool: True if successful
+        """
+        endpoint = "/dna/intent/api/v1/business/sda/fabric-site"
+        data = {
+            "siteNameHierarchy": site_hierarchy,
+            "fabricType": fabric_type
+        }
+        
+        if await self._submit_task(endpoint, data, f"fabric site {site_hierarchy}"):
+            print(f"Fabric site created: {site_hierarchy}")
+            return True
+        return False
+    
+    async def add_control_plane_device(self, device_ip: str, site_hierarchy: str) -> bool:
+        """
+        Add device as control plane node
+        
+        Args:
+            device_ip: Device management IP
+            site_hierarchy: Site name hierarchy
+        
+        Returns:
+            bool: True if successful
+        """
+        endpoint = "/dna/intent/api/v1/business/sda/control-plane-device"
+        data = {
+            "deviceManagementIpAddress": device_ip,
+            "siteNameHierarchy": site_hierarchy,
+            "routeDistributionProtocol": "LISP_BGP"
+        }
+        
+        if await self._submit_task(endpoint, data, f"control plane device {device_ip}"):
+            print(f"Control plane device added: {device_ip}")
+            return True
+        return False
+    
+    async def add_border_device(self, device_ip: str, site_hierarchy: str,
+                                internal_asn: str = "65001") -> bool:
+        """
+        Add device as border node
+        
+        Args:
+            device_ip: Device management IP
+            site_hierarchy: Site name hierarchy
+            internal_asn: Internal BGP AS number
+        
+        Returns:
+            bool: True if successful
+        """
+        endpoint = "/dna/intent/api/v1/business/sda/border-device"
+        data = {
+            "deviceManagementIpAddress": device_ip,
+            "siteNameHierarchy": site_hierarchy,
+            "externalDomainRoutingProtocolName": "BGP",
+            "internalAutonomouSystemNumber": internal_asn,
+            "borderSessionType": "EXTERNAL"
+        }
+        
+        if await self._submit_task(endpoint, data, f"border device {device_ip}"):
+            print(f"Border device added: {device_ip}")
+            return True
+        return False
+    
+    async def add_edge_device(self, device_ip: str, site_hierarchy: str) -> bool:
+        """
+        Add device as edge node
+        
+        Args:
+            device_ip: Device management IP
+            site_hierarchy: Site name hierarchy
+        
+        Returns:
+            bool: True if successful
+        """
+        endpoint = "/dna/intent/api/v1/business/sda/edge-device"
+        data = {
+            "deviceManagementIpAddress": device_ip,
+            "siteNameHierarchy": site_hierarchy
+        }
+        
+        if await self._submit_task(endpoint, data, f"edge device {device_ip}"):
+            print(f"Edge device added: {device_ip}")
+            return True
+        return False
+    
+    async def create_virtual_network(self, vn_name: str, site_hierarchy: str) -> bool:
+        """
+        Create a virtual network
+        
+        Args:
+            vn_name: Virtual network name
+            site_hierarchy: Site name hierarchy
+        
+        Returns:
+            bool: True if successful
+        """
+        endpoint = "/dna/intent/api/v1/business/sda/virtual-network"
+        data = {
+            "virtualNetworkName": vn_name,
+            "siteNameHierarchy": site_hierarchy
+        }
+        
+        if await self._submit_task(endpoint, data, f"virtual network {vn_name}"):
+            print(f"Virtual network created: {vn_name}")
+            return True
+        return False
+    
+    async def add_ip_pool_to_vn(self, vn_name: str, ip_pool: str, gateway: str) -> bool:
+        """
+        Add IP pool to virtual network
+        
+        Args:
+            vn_name: Virtual network name
+            ip_pool: IP pool range (CIDR)
+            gateway: Gateway IP address
+        
+        Returns:
+            bool: True if successful
+        """
+        endpoint = "/dna/intent/api/v1/business/sda/virtualnetwork/ippool"
+        data = {
+            "virtualNetworkName": vn_name,
+            "ipPoolName": f"{vn_name}_Pool",
+            "trafficType": "DATA",
+            "ipPoolRange": ip_pool,
+            "gateway": gateway
+        }
+        
+        if await self._submit_task(endpoint, data, f"IP pool {ip_pool} for {vn_name}"):
+            print(f"IP pool added to {vn_name}: {ip_pool}")
+            return True
+        return False
+    
+    async def provision_device(self, device_ip: str, site_hierarchy: str) -> bool:
+        """
+        Provision fabric configuration to device
+        
+        Args:
+            device_ip: Device management IP
+            site_hierarchy: Site name hierarchy
+        
+        Returns:
+            bool: True if successful
+        """
+        endpoint = "/dna/intent/api/v1/business/sda/provision-device"
+        data = {
+            "deviceManagementIpAddress": device_ip,
+            "siteNameHierarchy": site_hierarchy
+        }
+        
+        if await self._submit_task(endpoint, data, f"provision {device_ip}"):
+            print(f"Device provisioned: {device_ip}")
+            return True
+        return False
+    
+    async def get_fabric_sites(self) -> List[Dict]:
+        """Get all fabric sites"""
+        result = await self._make_request("GET", "/dna/intent/api/v1/business/sda/fabric-site")
+        if result and "response" in result:
+            return result["response"]
+        return []
+    
+    async def deploy_site(self, config: Dict) -> bool:
+        """
+        Deploy one fabric site
+        
+        Follows the dependency order of the synchronous deployment: the
+        site first, then role devices (control plane, border, edge) while
+        VNs and their pools are created alongside; each device is
+        provisioned once its role is added and all VNs exist, role by role.
+        
+        Args:
+            config: Single-site configuration
+        
+        Returns:
+            bool: True if every operation succeeded
+        """
+        site_hierarchy = config["fabric_site"]["site_hierarchy"]
+        fabric_type = config["fabric_site"].get("fabric_type", "FABRIC_SITE")
+        
+        if not await self.create_fabric_site(site_hierarchy, fabric_type):
+            return False
+        
+        add_device = {
+            "control_plane_devices": self.add_control_plane_device,
+            "border_devices": self.add_border_device,
+            "edge_devices": self.add_edge_device
+        }
+        
+        async def add_roles() -> Dict[str, bool]:
+            added = {}
+            for role in ROLE_ENDPOINTS:
+                ips = [device["ip"] for device in config.get(role, [])]
+                results = await asyncio.gather(*(add_device[role](ip, site_hierarchy) for ip in ips))
+                added.update(zip(ips, results))
+            return added
+        
+        async def add_vn(vn: Dict) -> bool:
+            return (await self.create_virtual_network(vn["name"], site_hierarchy)
+                    and await self.add_ip_pool_to_vn(vn["name"], vn["ip_pool"], vn["gateway"]))
+        
+        added, vns = await asyncio.gather(
+            add_roles(),
+            asyncio.gather(*(add_vn(vn) for vn in config.get("virtual_networks", [])))
+        )
+        
+        provisioned = []
+        for role in ROLE_ENDPOINTS:
+            ips = [device["ip"] for device in config.get(role, []) if added[device["ip"]]]
+            provisioned += await asyncio.gather(*(self.provision_device(ip, site_hierarchy)
+                                                  for ip in ips))
+        
+        return all(added.values()) and all(vns) and all(provisioned)
+    
+    async def deploy_fabric(self, config: Dict) -> bool:
+        """
+        Deploy every fabric site of a single- or multi-site configuration concurrently
+        
+        Args:
+            config: Fabric configuration
+        
+        Returns:
+            bool: True if every site deployed
+        """
+        sites = DNACFabricManager._site_configs(config)
+        print(f"\n=== Deploying {len(sites)} fabric site(s) ===")
+        return all(await asyncio.gather(*(self.deploy_site(site) for site in sites)))
+
+
+class AsyncISEPolicyManager(_AsyncClient):
+    """Manages ISE configuration for SD-Access without blocking"""
+    
+    def __init__(self, host: str, username: str, password: str, verify_ssl: bool = False,
+                 session: Optional[aiohttp.ClientSession] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 metrics: Optional[RequestMetrics] = None):
+        """
+        Initialize ISE connection
+        
+        Args:
+            host: ISE IP or hostname
+            username: ISE username
+            password: ISE password
+            verify_ssl: Whether to verify SSL certificates
+            session: Shared aiohttp session; one is created on entering
+                the client's context when omitted
+            rate_limiter: Shared rate limiter; a default one is created when omitted
+            max_connections: Connections per host for a session created here
+            metrics: Shared request metrics; a private one is created when omitted
+        """
+        super().__init__(host, verify_ssl, session, rate_limiter, max_connections, metrics)
+        self.auth = aiohttp.BasicAuth(username, password)
+        self.headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+        self._sgt_ids = None
+        self._sgt_tags = None
+        self._sgt_lock = asyncio.Lock()
+    
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                            params: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Make API request to ISE
+        
+        Args:
+            method: HTTP method
+            endpoint: API endpoint
+            data: Request payload
+            params: Query string parameters
+        
+        Returns:
+            Response JSON or None on error
+        """
+        url = f"{self.base_url}{endpoint}"
+        params = {key: str(value) for key, value in (params or {}).items()}
+        
+        try:
+            attempt = 0
+            while True:
+                await self.rate_limiter.acquire_async(endpoint)
+                status, reason, headers, body = await self._timed_send(
+                    method,
+                    endpoint,
+                    auth=self.auth,
+                    headers=self.headers,
+                    json=data,
+                    params=params,
+                    timeout=aiohttp.ClientTimeout(total=30)
+                )
+                if not await self.rate_limiter.wait_before_retry_async(method, endpoint, status,
+                                                                       headers, attempt):
+                    break
+                attempt += 1
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Request failed: {e}")
+            return None
+        
+        if status >= 400:
+            print(f"Request failed: {status} {reason} for url: {url}")
+            print(f"Response: {body}")
+            return None
+        if body:
+            try:
+                return json.loads(body)
+            except ValueError as e:
+                print(f"Request failed: invalid JSON from {url}: {e}")
+                print(f"Response: {body[:500]}")
+                return None
+        
+        result = {"status": "success"}
+        if headers.get("Location"):
+            result["location"] = headers["Location"]
+        return result
+    
+    async def _create(self, resource: str, object_key: str, payload: Dict) -> Optional[Dict]:
+        """POST one ERS object"""
+        return await self._make_request("POST", f"/ers/config/{resource}", {object_key: payload})
+    
+    async def create_security_group(self, name: str, tag: int, description: str = "") -> bool:
+        """
+        Create Security Group Tag (SGT)
+        
+        Args:
+            name: Security group name
+            tag: SGT value
+            description: Description
+        
+        Returns:
+            bool: True if successful
+        """
+        result = await self._create("sgt", "Sgt", ISEPolicyManager._sgt_payload(name, tag, description))
+        
+        if result:
+            if result.get("location") and self._sgt_ids is not None:
+                sgt_id = result["location"].rstrip("/").rsplit("/", 1)[-1]
+                self._sgt_ids[name] = sgt_id
+                if self._sgt_tags is not None:
+                    self._sgt_tags[int(tag)] = sgt_id
+            else:
+                self.invalidate_sgt_cache()
+            print(f"Security group created: {name} (SGT {tag})")
+            return True
+        return False
+    
+    async def get_resources(self, resource: str, page_size: int = ERS_PAGE_SIZE) -> List[Dict]:
+        """
+        Get the search results of an ERS resource, remaining pages fetched concurrently
+        
+        Args:
+            resource: ERS resource name, e.g. "sgt" or "networkdevice"
+            page_size: Results per page (ERS caps this at 100)
+        
+        Returns:
+            Search result entries with id, name and description
+        
+        Raises:
+            ISEQueryError: If a page cannot be retrieved, so a failed request
+                is never mistaken for the end of the results
+        """
+        endpoint = f"/ers/config/{resource}"
+        page_size = max(1, min(page_size, ERS_PAGE_SIZE))
+        
+        async def fetch_page(page: int) -> Dict:
+            result = await self._make_request("GET", endpoint, params={"size": page_size, "page": page})
+            if not result or not isinstance(result.get("SearchResult"), dict):
+                raise ISEQueryError(f"Failed to retrieve {resource} search page {page}")
+            return result["SearchResult"]
+        
+        search = await fetch_page(1)
+        items = list(search.get("resources", []))
+        pages = math.ceil(search.get("total", len(items)) / page_size)
+        for search in await asyncio.gather(*(fetch_page(page) for page in range(2, pages + 1))):
+            items.extend(search.get("resources", []))
+        return items
+    
+    async def get_security_groups(self) -> List[Dict]:
+        """Get all security groups"""
+        return await self.get_resources("sgt")
+    
+    async def get_resource(self, resource: str, resource_id: str) -> Optional[Dict]:
+        """
+        Get the full representation of one ERS object
+        
+        Args:
+            resource: ERS resource name
+            resource_id: Object ID
+        
+        Returns:
+            The object's attributes, or None on error
+        """
+        result = await self._make_request("GET", f"/ers/config/{resource}/{resource_id}")
+        if not result:
+            return None
+        return next(iter(result.values()), None)
+    
+    async def resolve_sgt(self, value: Union[str, int]) -> Optional[str]:
+        """
+        Resolve a security group given by name, tag value or ID to its ID
+        
+        The first lookup loads every SGT once; later lookups are served
+        from memory until invalidate_sgt_cache is called.
+        
+        Args:
+            value: SGT name, tag value or ERS ID
+        
+        Returns:
+            Security group ID or None
+        
+        Raises:
+            ISEQueryError: If the SGT lookups could not be loaded
+        """
+        by_tag = isinstance(value, int) or str(value).isdigit()
+        sgt_ids, sgt_tags = self._sgt_ids, self._sgt_tags
+        if sgt_ids is None or (by_tag and sgt_tags is None):
+            sgt_ids, sgt_tags = await self._load_sgt_lookups(by_tag)
+        
+        if by_tag:
+            return sgt_tags.get(int(value))
+        if value in sgt_ids:
+            return sgt_ids[value]
+        return value if value in sgt_ids.values() else None
+    
+    async def _load_sgt_lookups(self, tags: bool) -> Tuple[Dict[str, str], Optional[Dict[int, str]]]:
+        """
+        Load the SGT name lookup, and the tag lookup if asked, once for all waiting lookups
+        
+        Concurrent misses wait on one load instead of each reading every SGT.
+        Nothing is cached when a read fails, so the next lookup retries.
+        
+        Returns:
+            Name -> id and tag -> id mappings
+        
+        Raises:
+            ISEQueryError: If the SGT search or any SGT read failed
+        """
+        async with self._sgt_lock:
+            if self._sgt_ids is None:
+                self._sgt_ids = {item["name"]: item["id"] for item in await self.get_security_groups()}
+            sgt_ids = self._sgt_ids
+            
+            if tags and self._sgt_tags is None:
+                ids = list(sgt_ids.values())
+                details = await asyncio.gather(*(self.get_resource("sgt", sgt_id) for sgt_id in ids))
+                failed = details.count(None)
+                if failed:
+                    raise ISEQueryError(f"Failed to read {failed} security groups for their tags")
+                self._sgt_tags = {
+                    int(detail["value"]): sgt_id
+                    for sgt_id, detail in zip(ids, details)
+                    if detail and detail.get("value") is not None
+                }
+            return sgt_ids, self._sgt_tags
+    
+    def invalidate_sgt_cache(self):
+        """Drop the SGT name and tag lookups so the next resolution reloads them"""
+        self._sgt_ids = None
+        self._sgt_tags = None
+    
+    async def create_sgacl(self, name: str, description: str, acl_content: str) -> bool:
+        """
+        Create Security Group ACL
+        
+        Args:
+            name: SGACL name
+            description: Description
+            acl_content: ACL content/rules
+        
+        Returns:
+            bool: True if successful
+        """
+        result = await self._create("sgacl", "Sgacl",
+                                    ISEPolicyManager._sgacl_payload(name, description, acl_content))
+        
+        if result:
+            print(f"SGACL created: {name}")
+            return True
+        return False
+    
+    async def create_egress_policy(self, name: str, source_sgt: Union[str, int],
+                                   dest_sgt: Union[str, int], sgacl_id: str) -> bool:
+        """
+        Create TrustSec egress policy
+        
+        Args:
+            name: Policy name
+            source_sgt: Source SGT name, tag value or ID
+            dest_sgt: Destination SGT name, tag value or ID
+            sgacl_id: ID of the SGACL to apply
+        
+        Returns:
+            bool: True if successful
+        """
+        source_id, dest_id = await asyncio.gather(self.resolve_sgt(source_sgt),
+                                                  self.resolve_sgt(dest_sgt))
+        if source_id is None or dest_id is None:
+            print(f"Unknown security group: {source_sgt if source_id is None else dest_sgt}")
+            return False
+        
+        result = await self._create("egressmatrixcell", "EgressMatrixCell", {
+            "name": name,
+            "sourceSgtId": source_id,
+            "destinationSgtId": dest_id,
+            "matrixCellStatus": "ENABLED",
+            "defaultRule": "NONE",
+            "sgacls": [sgacl_id]
+        })
+        
+        if result:
+            print(f"Egress policy created: {source_sgt} -> {dest_sgt}")
+            return True
+        return False
+    
+    async def add_network_device(self, name: str, ip_address: str, radius_key: str,
+                                 device_type: str = "Cisco") -> bool:
+        """
+        Add network device to ISE
+        
+        Args:
+            name: Device name
+            ip_address: Device IP
+            radius_key: RADIUS shared secret
+            device_type: Device type
+        
+        Returns:
+            bool: True if successful
+        """
+        result = await self._create("networkdevice", "NetworkDevice",
+                                    ISEPolicyManager._network_device_payload(
+                                        name, ip_address, radius_key, device_type))
+        
+        if result:
+            print(f"Network device added: {name} ({ip_address})")
+            return True
+        return False
+    
+    async def create_authorization_profile(self, name: str, vlan: int,
+                                           sgt: int, description: str = "") -> bool:
+        """
+        Create authorization profile
+        
+        Args:
+            name: Profile name
+            vlan: VLAN ID
+            sgt: Security Group Tag
+            description: Description
+        
+        Returns:
+            bool: True if successful
+        """
+        result = await self._create("authorizationprofile", "AuthorizationProfile",
+                                    ISEPolicyManager._authorization_profile_payload(
+                                        name, vlan, sgt, description))
+        
+        if result:
+            print(f"Authorization profile created: {name}")
+            return True
+        return False
+    
+    async def deploy_config(self, config: Dict) -> bool:
+        """
+        Deploy complete ISE configuration
+        
+        SGTs, network devices and SGACLs are created concurrently;
+        authorization profiles follow once the SGTs exist.
+        
+        Args:
+            config: ISE configuration
+        
+        Returns:
+            bool: True if every object was created
+        """
+        print("\n=== Deploying ISE Configuration ===")
+        
+        async def groups_then_profiles() -> List[bool]:
+            created = await asyncio.gather(*(
+                self.create_security_group(sg["name"], sg["tag"], sg.get("description", ""))
+                for sg in config.get("security_groups", [])
+            ))
+            return list(created) + list(await asyncio.gather(*(
+                self.create_authorization_profile(profile["name"], profile["vlan"], profile["sgt"],
+                                                  profile.get("description", ""))
+                for profile in config.get("authorization_profiles", [])
+            )))
+        
+        calls: List[Awaitable] = [groups_then_profiles()]
+        calls += [
+            self.add_network_device(device["name"], device["ip"], device["radius_key"],
+                                    device.get("type", "Cisco"))
+            for device in config.get("network_devices", [])
+        ]
+        calls += [
+            self.create_sgacl(sgacl["name"], sgacl.get("description", ""), sgacl["acl_content"])
+            for sgacl in config.get("sgacls", [])
+        ]
+        
+        results = await asyncio.gather(*calls)
+        return all(results[0]) and all(results[1:])
+
+
+async def deploy_concurrently(args: argparse.Namespace) -> bool:
+    """
+    Deploy DNA Center and ISE configurations side by side from one event loop
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Returns:
+        bool: True if both deployments succeeded
+    """
+    with open(args.fabric_config, 'r') as f:
+        fabric_config = json.load(f)
+    with open(args.ise_config, 'r') as f:
+        ise_config = json.load(f)
+    
+    rate_limiter = RateLimiter()
+    metrics = RequestMetrics()
+    request_log = RequestLog(args.request_log) if args.request_log else None
+    if request_log:
+        metrics.add_hook(request_log)
+    
+    async with create_session(args.max_connections) as session:
+        dnac = AsyncDNACFabricManager(args.dnac_host, args.dnac_username, args.dnac_password,
+                                      verify_ssl=args.verify_ssl, task_timeout=args.task_timeout,
+                                      session=session, rate_limiter=rate_limiter, metrics=metrics)
+        ise = AsyncISEPolicyManager(args.ise_host, args.ise_username, args.ise_password,
+                                    verify_ssl=args.verify_ssl, session=session,
+                                    rate_limiter=rate_limiter, metrics=metrics)
+        
+        if not await dnac.authenticate():
+            return False
+        
+        start = time.monotonic()
+        try:
+            fabric_ok, ise_ok = await asyncio.gather(dnac.deploy_fabric(fabric_config),
+                                                     ise.deploy_config(ise_config))
+        finally:
+            if request_log:
+                request_log.close()
+            if args.metrics_file:
+                metrics.export(args.metrics_file, args.metrics_format)
+        print(f"\nDNA Center {'succeeded' if fabric_ok else 'FAILED'}, "
+              f"ISE {'succeeded' if ise_ok else 'FAILED'} in {time.monotonic() - start:.1f}s")
+        rate_limiter.print_stats()
+        metrics.print_stats()
+        return fabric_ok and ise_ok
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Concurrent DNA Center and ISE deployment (asyncio)")
+    parser.add_argument("--dnac-host", required=True, help="DNA Center IP or hostname")
+    parser.add_argument("--dnac-username", required=True, help="DNA Center username")
+    parser.add_argument("--dnac-password", required=True, help="DNA Center password")
+    parser.add_argument("--ise-host", required=True, help="ISE IP or hostname")
+    parser.add_argument("--ise-username", required=True, help="ISE username")
+    parser.add_argument("--ise-password", required=True, help="ISE password")
+    parser.add_argument("--fabric-config", required=True, help="Path to fabric configuration JSON file")
+    parser.add_argument("--ise-config", required=True, help="Path to ISE configuration JSON file")
+    parser.add_argument("--verify-ssl", action="store_true", help="Verify SSL certificates")
+    parser.add_argument("--task-timeout", type=int, default=1800,
+                        help="Seconds to wait for each DNA Center task (default: 1800)")
+    parser.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS,
+                        help=f"Connections per host (default: {DEFAULT_MAX_CONNECTIONS})")
+    parser.add_argument("--metrics-file",
+                        help="Write per-endpoint request latency histograms to this file")
+    parser.add_argument("--metrics-format", choices=("prometheus", "jsonl"), default="prometheus",
+                        help="Metrics file format: Prometheus textfile or JSON lines "
+                             "(default: prometheus)")
+    parser.add_argument("--request-log", help="Append a JSON line per API request to this file")
+    
+    args = parser.parse_args()
+    
+    if asyncio.run(deploy_concurrently(args)):
+        print("\nDeployment successful!")
+        return 0
+    else:
+        print("\nDeployment failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Deployment Benchmark
+Measures deploy_full_fabric and deploy_full_config against the mock SDA server
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from dnac_fabric_manager import DNACFabricManager
+from http_transport import HTTPTransport
+from ise_policy_manager import ISEPolicyManager
+from mock_server import MockState, start_server
+from rate_limiter import RateLimiter
+from request_metrics import RequestMetrics
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def fabric_config(devices: int) -> Dict:
+    """Single-site fabric configuration with the given number of devices"""
+    ips = [f"10.{100 + i // 65536}.{i // 256 % 256}.{i % 256}" for i in range(devices)]
+    control_plane = ips[:min(2, devices)]
+    border = ips[len(control_plane):min(4, devices)]
+    return {
+        "fabric_site": {"site_hierarchy": "Global/Benchmark/Campus", "fabric_type": "FABRIC_SITE"},
+        "control_plane_devices": [{"name": f"cp-{ip}", "ip": ip} for ip in control_plane],
+        "border_devices": [{"name": f"border-{ip}", "ip": ip} for ip in border],
+        "edge_devices": [{"name": f"edge-{ip}", "ip": ip}
+                         for ip in ips[len(control_plane) + len(border):]],
+        "virtual_networks": [
+            {"name": f"VN-{index}", "ip_pool": f"10.{index}.0.0/16", "gateway": f"10.{index}.0.1"}
+            for index in range(10, 14)
+        ]
+    }
+
+
+def ise_config(devices: int) -> Dict:
+    """ISE configuration registering the given number of network devices"""
+    return {
+        "security_groups": [{"name": f"SG-{tag}", "tag": tag, "description": ""}
+                            for tag in range(10, 110, 10)],
+        "network_devices": [
+            {"name": f"nad-{i}", "ip": f"10.{100 + i // 65536}.{i // 256 % 256}.{i % 256}",
+             "radius_key": "benchmark", "type": "Cisco"}
+            for i in range(devices)
+        ],
+        "sgacls": [{"name": f"ACL-{index}", "description": "", "acl_content": "permit ip"}
+                   for index in range(3)],
+        "authorization_profiles": [{"name": f"Profile-{tag}", "vlan": tag, "sgt": tag}
+                                   for tag in range(10, 40, 10)]
+    }
+
+
+def _serve(settings: Dict, ports: multiprocessing.Queue):
+    """Child process entry point running the mock server"""
+    server = start_server(MockState(**settings))
+    ports.put(server.server_address[1])
+    while True:
+        time.sleep(3600)
+
+
+def run_case(system: str, devices: int, args: argparse.Namespace, workdir: str) -> Dict:
+    """
+    Deploy one generated configuration against a fresh mock server
+    
+    The server runs in its own process so it does not compete with the
+    client for the interpreter lock.
+    
+    Args:
+        system: "dnac" or "ise"
+        devices: Number of devices in the configuration
+        args: Parsed command line arguments
+        workdir: Directory for generated configurations and journals
+    
+    Returns:
+        Result dict with request count, throughput, latency percentiles and duration
+    """
+    settings = {"latency": args.latency, "jitter": args.jitter, "max_rps": args.max_rps,
+                "task_duration": args.task_duration, "inventory_size": devices}
+    ports = multiprocessing.Queue()
+    server = multiprocessing.Process(target=_serve, args=(settings, ports), daemon=True)
+    server.start()
+    
+    try:
+        port = ports.get(timeout=30)
+        config_file = os.path.join(workdir, f"{system}-{devices}.json")
+        with open(config_file, 'w') as f:
+            json.dump(fabric_config(devices) if system == "dnac" else ise_config(devices), f)
+        
+        transport = HTTPTransport(pool_size=args.max_workers)
+        metrics = RequestMetrics()
+        latencies = []
+        metrics.add_hook(lambda entry: latencies.append(entry["seconds"]))
+        if args.client_rps:
+            rate_limiter = RateLimiter({"*": {"rate": args.client_rps, "burst": args.client_rps}})
+        else:
+            rate_limiter = RateLimiter({"*": {"rate": 1e9, "burst": 1_000_000}})
+        
+        if system == "dnac":
+            manager = DNACFabricManager("127.0.0.1", "admin", "benchmark",
+                                        max_workers=args.max_workers, transport=transport,
+                                        rate_limiter=rate_limiter, metrics=metrics)
+        else:
+            manager = ISEPolicyManager("127.0.0.1", "admin", "benchmark", transport=transport,
+                                       rate_limiter=rate_limiter, max_workers=args.max_workers,
+                                       metrics=metrics)
+        manager.base_url = f"http://127.0.0.1:{port}"
+        
+        output = None if args.verbose else open(os.devnull, 'w')
+        start = time.monotonic()
+        with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+            if system == "dnac":
+                success = manager.authenticate() and manager.deploy_full_fabric(
+                    config_file, journal_dir=workdir)
+            else:
+                success = manager.deploy_full_config(config_file, journal_dir=workdir)
+        duration = time.monotonic() - start
+        if output:
+            output.close()
+        transport.close()
+    
+    finally:
+        server.terminate()
+        server.join()
+    
+    return {
+        "system": system,
+        "devices": devices,
+        "success": bool(success),
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / duration if duration else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "seconds": duration
+    }
+
+
+def print_results(results: List[Dict]):
+    """Print benchmark results as a table"""
+    print(f"\n{'System':6}  {'Devices':>7}  {'Requests':>8}  {'Req/s':>8}  "
+          f"{'p50 ms':>8}  {'p99 ms':>8}  {'Total s':>8}  Result")
+    for r in results:
+        print(f"{r['system']:6}  {r['devices']:7d}  {r['requests']:8d}  "
+              f"{r['requests_per_second']:8.1f}  {r['p50_ms']:8.1f}  {r['p99_ms']:8.1f}  "
+              f"{r['seconds']:8.1f}  {'ok' if r['success'] else 'FAILED'}")
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Benchmark DNA Center and ISE deployments offline")
+    parser.add_argument("--sizes", default="10,1000,10000",
+                        help="Comma separated device counts (default: 10,1000,10000)")
+    parser.add_argument("--systems", default="dnac,ise",
+                        help="Comma separated systems to benchmark (default: dnac,ise)")
+    parser.add_argument("--max-workers", type=int, default=32,
+                        help="Concurrent operations per deployment (default: 32)")
+    parser.add_argument("--latency", type=float, default=0.01,
+                        help="Mock server latency per request in seconds (default: 0.01)")
+    parser.add_argument("--jitter", type=float, default=0.005,
+                        help="Mock server random extra latency in seconds (default: 0.005)")
+    parser.add_argument("--max-rps", type=float, default=0.0,
+                        help="Mock server throttling threshold (default: unlimited)")
+    parser.add_argument("--task-duration", type=float, default=0.2,
+                        help="Seconds each mock DNA Center task runs (default: 0.2)")
+    parser.add_argument("--client-rps", type=float, default=0.0,
+                        help="Client-side rate limit; the production limits are not applied "
+                             "by default so the server and client are measured")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show deployment output")
+    
+    args = parser.parse_args()
+    
+    sizes = [int(size) for size in args.sizes.split(",")]
+    systems = [system.strip() for system in args.systems.split(",")]
+    
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for devices in sizes:
+            for system in systems:
+                print(f"Benchmarking {system} with {devices} devices...")
+                results.append(run_case(system, devices, args, workdir))
+    
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(r["success"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    exit(main())
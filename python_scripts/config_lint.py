@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Configuration Linter
+Schema and consistency checks for the fabric, ISE and Ansible inventory files,
+run before a deployment instead of failing part way through one
+"""
+
+import argparse
+import ipaddress
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+DEFAULT_FABRIC_CONFIG = "config/fabric-config.json"
+DEFAULT_ISE_CONFIG = "config/ise-config.json"
+DEFAULT_INVENTORY = "ansible/inventory/hosts.yml"
+
+# Device lists of a fabric site, in deployment order
+DEVICE_ROLES = ("control_plane_devices", "border_devices", "edge_devices")
+
+# Usable SGT values in ISE
+SGT_RANGE = (2, 65519)
+
+# Egress matrix rules that are not SGACL names (see ise_policy_manager)
+EGRESS_DEFAULT_RULES = ("PERMIT_IP", "DENY_IP")
+
+
+class LintReport:
+    """Errors and warnings collected while linting"""
+    
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+    
+    def error(self, source: str, message: str):
+        self.errors.append(f"{source}: {message}")
+    
+    def warning(self, source: str, message: str):
+        self.warnings.append(f"{source}: {message}")
+    
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _entries(config: Dict, key: str, source: str, report: LintReport) -> Iterator[Tuple[str, Dict]]:
+    """Yield (location, entry) for each object of a list-valued key"""
+    items = config.get(key, [])
+    if not isinstance(items, list):
+        report.error(source, f"{key} must be a list")
+        return
+    for index, item in enumerate(items):
+        where = f"{key}[{index}]"
+        if not isinstance(item, dict):
+            report.error(source, f"{where} must be an object")
+            continue
+        if item.get("name"):
+            where += f" ({item['name']})"
+        yield where, item
+
+
+def _address(entry: Dict, key: str, where: str, source: str,
+             report: LintReport) -> Optional[ipaddress.IPv4Address]:
+    """Parse an IPv4 address field, reporting a missing or malformed value"""
+    value = entry.get(key)
+    if value is None:
+        report.error(source, f"{where}: missing {key}")
+        return None
+    try:
+        return ipaddress.IPv4Address(value)
+    except (ipaddress.AddressValueError, ValueError):
+        report.error(source, f"{where}: {key} {value!r} is not an IPv4 address")
+        return None
+
+
+def find_overlaps(intervals: List[Tuple[int, int, str]]) -> List[Tuple[str, str]]:
+    """
+    Find overlapping address ranges with a sorted sweep
+    
+    Each range is reported against the widest-reaching range that started
+    before it, so n ranges cost O(n log n) regardless of how many overlap.
+    
+    Args:
+        intervals: (first address, last address, label) tuples
+    
+    Returns:
+        List of (earlier label, overlapping label)
+    """
+    overlaps = []
+    reach, owner = -1, None
+    for start, end, label in sorted(intervals):
+        if start <= reach:
+            overlaps.append((owner, label))
+        if end > reach:
+            reach, owner = end, label
+    return overlaps
+
+
+def _fabric_sites(config: Dict) -> List[Tuple[str, Dict, List]]:
+    """Return (site hierarchy, site config, effective virtual networks) per fabric site"""
+    if "fabric_sites" not in config:
+        site = config.get("fabric_site", {})
+        hierarchy = site.get("site_hierarchy", "") if isinstance(site, dict) else ""
+        return [(hierarchy, config, config.get("virtual_networks", []))]
+    sites = config["fabric_sites"] if isinstance(config["fabric_sites"], list) else []
+    return [(site.get("site_hierarchy", ""), site,
+             site.get("virtual_networks", config.get("virtual_networks", [])))
+            for site in sites if isinstance(site, dict)]
+
+
+def lint_fabric_config(config: Dict, source: str, report: LintReport) -> Dict[str, str]:
+    """
+    Check a single- or multi-site fabric configuration
+    
+    Args:
+        config: Parsed fabric configuration
+        source: File name used in messages
+        report: Report to add findings to
+    
+    Returns:
+        Fabric device names keyed by IP address
+    """
+    if "fabric_sites" not in config and not isinstance(config.get("fabric_site"), dict):
+        report.error(source, "missing fabric_site (or fabric_sites for multi-site configurations)")
+    
+    devices = {}
+    device_sites = {}
+    # Pools of every site go into one sweep, so overlaps across sites are found too
+    pools = []
+    for hierarchy, site, virtual_networks in _fabric_sites(config):
+        prefix = f"{hierarchy}: " if "fabric_sites" in config else ""
+        if not hierarchy:
+            report.error(source, f"{prefix}missing site_hierarchy")
+        
+        for role in DEVICE_ROLES:
+            seen_in_role = set()
+            for where, device in _entries(site, role, source, report):
+                where = prefix + where
+                if not device.get("name"):
+                    report.error(source, f"{where}: missing name")
+                address = _address(device, "ip", where, source, report)
+                if address is None:
+                    continue
+                ip = str(address)
+                if ip in seen_in_role:
+                    report.error(source, f"{where}: duplicate IP {ip} in {role}")
+                seen_in_role.add(ip)
+                # A device may hold several roles in its site (e.g. co-located
+                # control plane and border) but only under one name and in one site
+                if ip in devices and devices[ip] != device.get("name"):
+                    report.error(source, f"{where}: IP {ip} is already used by {devices[ip]}")
+                elif ip in device_sites and device_sites[ip] != hierarchy:
+                    report.error(source, f"{where}: {ip} is also in site {device_sites[ip]}")
+                devices.setdefault(ip, device.get("name"))
+                device_sites.setdefault(ip, hierarchy)
+        
+        names = set()
+        container = {"virtual_networks": virtual_networks}
+        for where, vn in _entries(container, "virtual_networks", source, report):
+            where = prefix + where
+            if not vn.get("name"):
+                report.error(source, f"{where}: missing name")
+            elif vn["name"] in names:
+                report.error(source, f"{where}: duplicate virtual network name")
+            names.add(vn.get("name"))
+            
+            try:
+                interface = ipaddress.IPv4Interface(str(vn.get("ip_pool")))
+            except (ipaddress.AddressValueError, ipaddress.NetmaskValueError, ValueError):
+                report.error(source, f"{where}: ip_pool {vn.get('ip_pool')!r} is not an IPv4 network")
+                continue
+            pool = interface.network
+            if interface.ip != pool.network_address:
+                report.warning(source, f"{where}: ip_pool {vn['ip_pool']} has host bits set ({pool})")
+            pools.append((int(pool.network_address), int(pool.broadcast_address),
+                          f"{where} {pool}"))
+            
+            gateway = _address(vn, "gateway", where, source, report)
+            if gateway is None:
+                continue
+            if gateway not in pool:
+                report.error(source, f"{where}: gateway {gateway} is outside ip_pool {pool}")
+            elif pool.prefixlen < 31 and gateway in (pool.network_address, pool.broadcast_address):
+                report.error(source, f"{where}: gateway {gateway} is the network or broadcast "
+                                     f"address of {pool}")
+    
+    for first, second in find_overlaps(pools):
+        report.error(source, f"{second} overlaps {first}")
+    
+    return devices
+
+
+def lint_ise_config(config: Dict, source: str, report: LintReport) -> Dict[str, str]:
+    """
+    Check an ISE configuration
+    
+    Args:
+        config: Parsed ISE configuration
+        source: File name used in messages
+        report: Report to add findings to
+    
+    Returns:
+        Network device names keyed by IP address
+    """
+    tags = {}
+    names = set()
+    for where, group in _entries(config, "security_groups", source, report):
+        if not group.get("name"):
+            report.error(source, f"{where}: missing name")
+        elif group["name"] in names:
+            report.error(source, f"{where}: duplicate security group name")
+        names.add(group.get("name"))
+        
+        tag = group.get("tag")
+        if not isinstance(tag, int) or isinstance(tag, bool):
+            report.error(source, f"{where}: tag {tag!r} must be an integer")
+        elif not SGT_RANGE[0] <= tag <= SGT_RANGE[1]:
+            report.error(source, f"{where}: tag {tag} is outside {SGT_RANGE[0]}-{SGT_RANGE[1]}")
+        elif tag in tags:
+            report.error(source, f"{where}: duplicate SGT tag {tag} (also {tags[tag]})")
+        else:
+            tags[tag] = group.get("name")
+    
+    nads = {}
+    for where, device in _entries(config, "network_devices", source, report):
+        if not device.get("name"):
+            report.error(source, f"{where}: missing name")
+        if not device.get("radius_key"):
+            report.error(source, f"{where}: missing radius_key")
+        address = _address(device, "ip", where, source, report)
+        if address is None:
+            continue
+        ip = str(address)
+        if ip in nads:
+            report.error(source, f"{where}: duplicate IP {ip} (also {nads[ip]})")
+        nads.setdefault(ip, device.get("name"))
+    
+    sgacls = set()
+    for where, sgacl in _entries(config, "sgacls", source, report):
+        if not sgacl.get("name"):
+            report.error(source, f"{where}: missing name")
+        elif sgacl["name"] in sgacls:
+            report.error(source, f"{where}: duplicate SGACL name")
+        sgacls.add(sgacl.get("name"))
+    
+    for where, profile in _entries(config, "authorization_profiles", source, report):
+        if not profile.get("name"):
+            report.error(source, f"{where}: missing name")
+        sgt = profile.get("sgt")
+        if sgt is not None and sgt not in tags and sgt not in names:
+            report.warning(source, f"{where}: sgt {sgt} is not defined in security_groups")
+    
+    if "egress_matrix" in config:
+        _lint_egress_matrix(config["egress_matrix"], names, sgacls, source, report)
+    
+    return nads
+
+
+def _lint_egress_matrix(spec: Dict, groups: Set[str], sgacls: Set[str], source: str,
+                       report: LintReport):
+    """
+    Check that an egress matrix spec only references defined SGTs and SGACLs
+    
+    The matrix spans the configured security groups, so a misspelt SGT
+    would be dropped at deploy time and a misspelt SGACL would fail its cells.
+    """
+    if not isinstance(spec, dict):
+        report.error(source, "egress_matrix must be an object")
+        return
+    
+    def check_sgt(where: str, name) -> None:
+        if name != "*" and name not in groups:
+            report.error(source, f"{where}: SGT {name!r} is not defined in security_groups")
+    
+    def check_rule(where: str, rule) -> None:
+        names = [rule] if isinstance(rule, str) else rule
+        if not isinstance(names, list) or not names:
+            report.error(source, f"{where}: rule {rule!r} must be an SGACL name or a list of them")
+            return
+        for name in names:
+            if name not in sgacls and name not in EGRESS_DEFAULT_RULES:
+                report.error(source, f"{where}: SGACL {name!r} is not defined in sgacls")
+    
+    if spec.get("default") is not None:
+        check_rule("egress_matrix.default", spec["default"])
+    
+    rows = spec.get("rows", {})
+    if not isinstance(rows, dict):
+        report.error(source, "egress_matrix.rows must be an object")
+        rows = {}
+    for src, row in rows.items():
+        where = f"egress_matrix.rows[{src}]"
+        check_sgt(where, src)
+        if not isinstance(row, dict):
+            report.error(source, f"{where} must be an object")
+            continue
+        for dst, rule in row.items():
+            check_sgt(f"{where}[{dst}]", dst)
+            check_rule(f"{where}[{dst}]", rule)
+    
+    container = {"overrides": spec.get("overrides", [])}
+    for where, override in _entries(container, "overrides", source, report):
+        where = f"egress_matrix.{where}"
+        for key in ("source", "destination"):
+            if key not in override:
+                report.error(source, f"{where}: missing {key}")
+            elif override[key] == "*":
+                report.error(source, f"{where}: {key} must name an SGT, not '*'")
+            else:
+                check_sgt(f"{where} {key}", override[key])
+        if "rule" not in override:
+            report.error(source, f"{where}: missing rule")
+        else:
+            check_rule(where, override["rule"])
+
+
+def _inventory_hosts(group: Dict, inherited: Dict) -> Iterator[Tuple[str, Dict]]:
+    """Walk an inventory group tree, yielding (host name, merged variables)"""
+    if not isinstance(group, dict):
+        return
+    variables = dict(inherited, **(group.get("vars") or {}))
+    for name, host_vars in (group.get("hosts") or {}).items():
+        yield name, dict(variables, **(host_vars or {}))
+    for child in (group.get("children") or {}).values():
+        yield from _inventory_hosts(child, variables)
+
+
+def lint_inventory(inventory: Dict, source: str, report: LintReport) -> Dict[str, str]:
+    """
+    Check an Ansible YAML inventory for duplicate management and loopback addresses
+    
+    Args:
+        inventory: Parsed inventory
+        source: File name used in messages
+        report: Report to add findings to
+    
+    Returns:
+        Host names keyed by ansible_host address
+    """
+    hosts = {}
+    loopbacks = {}
+    seen = set()
+    for name, variables in _inventory_hosts((inventory or {}).get("all", {}), {}):
+        if name in seen:
+            continue
+        seen.add(name)
+        for key, addresses in (("ansible_host", hosts), ("loopback0", loopbacks)):
+            if key not in variables:
+                continue
+            address = _address(variables, key, name, source, report)
+            if address is None:
+                continue
+            ip = str(address)
+            if ip in addresses:
+                report.error(source, f"{name}: duplicate {key} {ip} (also {addresses[ip]})")
+            addresses.setdefault(ip, name)
+    return hosts
+
+
+def _load_yaml(path: str):
+    """Parse a YAML file, using the libyaml loader when it is available"""
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=loader)
+
+
+def lint_files(fabric_config: str = DEFAULT_FABRIC_CONFIG, ise_config: str = DEFAULT_ISE_CONFIG,
+               inventory: Optional[str] = DEFAULT_INVENTORY) -> LintReport:
+    """
+    Lint the configuration files and check that they agree with each other
+    
+    Every fabric device must be registered in ISE as a network device, and
+    should appear in the Ansible inventory.
+    
+    Args:
+        fabric_config: Fabric configuration JSON file
+        ise_config: ISE configuration JSON file
+        inventory: Ansible YAML inventory, or None to skip it
+    
+    Returns:
+        LintReport
+    """
+    report = LintReport()
+    
+    parsed = {}
+    for path in (fabric_config, ise_config):
+        try:
+            with open(path, 'r') as f:
+                parsed[path] = json.load(f)
+        except (OSError, ValueError) as e:
+            report.error(path, f"cannot be read: {e}")
+            continue
+        if not isinstance(parsed[path], dict):
+            report.error(path, "must contain a JSON object")
+            del parsed[path]
+    
+    fabric_name = os.path.basename(fabric_config)
+    ise_name = os.path.basename(ise_config)
+    devices = (lint_fabric_config(parsed[fabric_config], fabric_name, report)
+               if fabric_config in parsed else None)
+    nads = lint_ise_config(parsed[ise_config], ise_name, report) if ise_config in parsed else None
+    
+    hosts = None
+    if inventory:
+        try:
+            hosts = lint_inventory(_load_yaml(inventory), os.path.basename(inventory), report)
+        except ImportError:
+            report.warning(inventory, "PyYAML is not installed, inventory not checked")
+        except Exception as e:
+            report.error(inventory, f"cannot be read: {e}")
+    
+    if devices is not None and nads is not None:
+        for ip, name in devices.items():
+            if ip not in nads:
+                report.error(fabric_name, f"{name} ({ip}) is not in {ise_name} network_devices")
+    if devices is not None and hosts is not None:
+        for ip, name in devices.items():
+            if ip not in hosts:
+                report.warning(fabric_name, f"{name} ({ip}) is not in the Ansible inventory")
+    
+    return report
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Lint the fabric, ISE and inventory configuration")
+    parser.add_argument("--fabric-config", default=DEFAULT_FABRIC_CONFIG,
+                        help=f"Fabric configuration JSON file (default: {DEFAULT_FABRIC_CONFIG})")
+    parser.add_argument("--ise-config", default=DEFAULT_ISE_CONFIG,
+                        help=f"ISE configuration JSON file (default: {DEFAULT_ISE_CONFIG})")
+    parser.add_argument("--inventory", default=DEFAULT_INVENTORY,
+                        help=f"Ansible inventory (default: {DEFAULT_INVENTORY})")
+    parser.add_argument("--no-inventory", action="store_true", help="Skip the Ansible inventory")
+    
+    args = parser.parse_args()
+    
+    report = lint_files(args.fabric_config, args.ise_config,
+                        None if args.no_inventory else args.inventory)
+    for message in report.errors:
+        print(f"ERROR {message}")
+    for message in report.warnings:
+        print(f"WARNING {message}")
+    print(f"{len(report.errors)} errors, {len(report.warnings)} warnings")
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+DAG Scheduler
+Runs a dependency graph of deployment tasks with maximum parallelism
+"""
+
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List
+
+
+class DAGScheduler:
+    """Executes tasks as soon as their dependencies finish, bounded by max_workers"""
+    
+    def __init__(self, max_workers: int = 8):
+        """
+        Initialize the scheduler
+        
+        Args:
+            max_workers: Maximum number of tasks running at once
+        """
+        self.max_workers = max(1, max_workers)
+        self.tasks = {}
+        self.results = {}
+        self.started = 0.0
+        self.finished = 0.0
+    
+    def add(self, name: str, func: Callable[..., bool], *args,
+            requires: Iterable[str] = (), after: Iterable[str] = ()) -> str:
+        """
+        Add a task to the graph
+        
+        Dependencies must already have been added, which also keeps the
+        graph acyclic.
+        
+        Args:
+            name: Unique task name
+            func: Callable returning True on success
+            *args: Positional arguments for func
+            requires: Tasks that must succeed first; the task is skipped if one fails
+            after: Tasks that must finish first, whatever their outcome
+        
+        Returns:
+            The task name
+        
+        Raises:
+            ValueError: If the name is taken or a dependency is unknown
+        """
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task: {name}")
+        requires = list(requires)
+        after = list(after)
+        unknown = [dep for dep in requires + after if dep not in self.tasks]
+        if unknown:
+            raise ValueError(f"Task {name} depends on unknown tasks: {', '.join(unknown)}")
+        self.tasks[name] = {
+            "func": func,
+            "args": args,
+            "requires": requires,
+            "after": after
+        }
+        return name
+    
+    def run(self) -> bool:
+        """
+        Execute every task in the graph
+        
+        Returns:
+            bool: True if all tasks succeeded
+        """
+        dependents = {name: [] for name in self.tasks}
+        waiting = {}
+        for name, task in self.tasks.items():
+            deps = set(task["requires"]) | set(task["after"])
+            waiting[name] = len(deps)
+            for dep in deps:
+                dependents[dep].append(name)
+        
+        self.results = {}
+        self.started = time.monotonic()
+        ready = deque(name for name, count in waiting.items() if count == 0)
+        running = {}
+        
+        # Only max_workers futures are in flight at a time; the rest wait in
+        # ready, which keeps each wait() proportional to the pool size
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while ready or running:
+                while ready and len(running) < self.max_workers:
+                    name = ready.popleft()
+                    task = self.tasks[name]
+                    if any(self.results[dep]["status"] != "ok" for dep in task["requires"]):
+                        now = time.monotonic()
+                        self.results[name] = {"status": "skipped", "start": now, "end": now}
+                        ready.extend(self._release(name, dependents, waiting))
+                        continue
+                    running[executor.submit(self._run_task, name)] = name
+                
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    self.results[name] = future.result()
+                    ready.extend(self._release(name, dependents, waiting))
+        
+        self.finished = time.monotonic()
+        return all(result["status"] == "ok" for result in self.results.values())
+    
+    def _run_task(self, name: str) -> Dict:
+        """Run one task and time it"""
+        task = self.tasks[name]
+        start = time.monotonic()
+        try:
+            ok = bool(task["func"](*task["args"]))
+        except Exception as e:
+            print(f"Task {name} raised: {e}")
+            ok = False
+        return {"status": "ok" if ok else "failed", "start": start, "end": time.monotonic()}
+    
+    @staticmethod
+    def _release(name: str, dependents: Dict[str, List[str]], waiting: Dict[str, int]) -> List[str]:
+        """Mark a task finished and return the dependents that became ready"""
+        ready = []
+        for dependent in dependents[name]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                ready.append(dependent)
+        return ready
+    
+    def critical_path(self) -> List[str]:
+        """
+        Trace the chain of tasks that determined the total run time
+        
+        Starting from the task that finished last, repeatedly step to the
+        dependency that finished last before it.
+        
+        Returns:
+            Task names from first to last
+        """
+        if not self.results:
+            return []
+        
+        path = []
+        name = max(self.results, key=lambda n: self.results[n]["end"])
+        while name is not None:
+            path.append(name)
+            task = self.tasks[name]
+            deps = task["requires"] + task["after"]
+            name = max(deps, key=lambda n: self.results[n]["end"]) if deps else None
+        return list(reversed(path))
+    
+    def print_report(self, title: str = ""):
+        """
+        Print outcome counts and the critical path
+        
+        Args:
+            title: Label appended to the report heading
+        """
+        if not self.results:
+            return
+        
+        counts = {"ok": 0, "failed": 0, "skipped": 0}
+        for result in self.results.values():
+            counts[result["status"]] += 1
+        wall = self.finished - self.started
+        busy = sum(r["end"] - r["start"] for r in self.results.values())
+        
+        print(f"\n=== Critical Path{': ' + title if title else ''} ===")
+        for name in self.critical_path():
+            result = self.results[name]
+            print(f"{result['start'] - self.started:8.1f}s +{result['end'] - result['start']:6.1f}s  "
+                  f"{result['status']:7}  {name}")
+        print(f"{len(self.results)} tasks ({counts['ok']} ok, {counts['failed']} failed, "
+              f"{counts['skipped']} skipped) in {wall:.1f}s wall time, "
+              f"average parallelism {busy / wall if wall else 0:.1f}")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Deploy Journal
+Append-only record of completed deployment operations used to resume interrupted runs
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+
+DEFAULT_JOURNAL_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sda-automation", "journal")
+
+
+def config_hash(config_file: str) -> str:
+    """Return a short SHA-256 digest of a configuration file's contents"""
+    with open(config_file, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+class DeployJournal:
+    """JSON-lines journal, fsync'd after every entry, keyed by configuration hash"""
+    
+    def __init__(self, name: str, config_file: str, resume: bool = False,
+                 journal_dir: str = DEFAULT_JOURNAL_DIR):
+        """
+        Open the journal for a configuration file
+        
+        Args:
+            name: Journal family, e.g. "dnac" or "ise"
+            config_file: Configuration being deployed; its hash selects the journal
+            resume: Load previous entries instead of starting a new journal
+            journal_dir: Directory holding journal files
+        """
+        os.makedirs(journal_dir, exist_ok=True)
+        self.path = os.path.join(journal_dir, f"{name}-{config_hash(config_file)}.jsonl")
+        self.completed = set()
+        self.submitted = {}
+        self.lock = threading.Lock()
+        
+        if resume and os.path.exists(self.path):
+            self._load()
+            print(f"Resuming from journal {self.path}: {len(self.completed)} operations done, "
+                  f"{len(self.submitted)} in flight")
+        
+        self.file = open(self.path, 'a' if resume else 'w')
+    
+    def _load(self):
+        """Replay journal entries; a truncated last line from a crash is ignored"""
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry["state"] == "done":
+                    self.completed.add(entry["op"])
+                    self.submitted.pop(entry["op"], None)
+                elif entry["state"] == "submitted":
+                    self.submitted[entry["op"]] = (entry["kind"], entry["task_id"])
+    
+    def _append(self, entry: dict):
+        """Write one entry and force it to disk"""
+        entry["time"] = time.time()
+        with self.lock:
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+    
+    def is_done(self, op: str) -> bool:
+        """Check whether an operation completed in a previous run"""
+        return op in self.completed
+    
+    def pending_task(self, op: str) -> Optional[Tuple[str, str]]:
+        """Return the (kind, task ID) of an operation that was submitted but not confirmed"""
+        return self.submitted.get(op)
+    
+    def record_submitted(self, op: str, kind: str, task_id: str):
+        """Record that an operation was accepted and is running as a task"""
+        self._append({"op": op, "state": "submitted", "kind": kind, "task_id": task_id})
+    
+    def record_done(self, op: str):
+        """Record that an operation completed successfully"""
+        self._append({"op": op, "state": "done"})
+        with self.lock:
+            self.completed.add(op)
+            self.submitted.pop(op, None)
+    
+    def close(self):
+        """Close the journal file"""
+        self.file.close()
@@ -5,20 +5,68 @@ This script automates SD-Access fabric deployment using DNA Center APIs
 """
 
 import json
+import re
 import time
 import requests
 import argparse
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from urllib3.exceptions import InsecureRequestWarning
 
+from dag_scheduler import DAGScheduler
+from deploy_journal import DEFAULT_JOURNAL_DIR, DeployJournal
+from http_transport import HTTPTransport
+from inventory_cache import DEFAULT_CACHE_DIR, InventoryCache
+from rate_limiter import RateLimiter
+from request_metrics import RequestLog, RequestMetrics
+
 # Suppress SSL warnings
 requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
 
+# Task polling: start fast, back off geometrically up to the ceiling
+TASK_POLL_INITIAL_INTERVAL = 0.5
+TASK_POLL_MAX_INTERVAL = 10.0
+TASK_POLL_BACKOFF = 1.5
+# Consecutive unreadable task statuses tolerated before a task is given up on
+TASK_POLL_MAX_FAILURES = 5
+
+# DNA Center tokens are valid for 60 minutes; refresh well before expiry
+TOKEN_LIFETIME = 3600
+TOKEN_REFRESH_MARGIN = 300
+
+# Largest page the network-device API returns
+DEVICE_PAGE_SIZE = 500
+
+# Failure descriptions the SDA APIs use when the requested object does not exist
+NOT_FOUND_PATTERN = re.compile(r"not found|does not exist|not present|no .* found", re.IGNORECASE)
+
+# Fabric roles in the order they must be added, with their SDA endpoints
+ROLE_ENDPOINTS = {
+    "control_plane_devices": "/dna/intent/api/v1/business/sda/control-plane-device",
+    "border_devices": "/dna/intent/api/v1/business/sda/border-device",
+    "edge_devices": "/dna/intent/api/v1/business/sda/edge-device"
+}
+ROLE_TITLES = {
+    "control_plane_devices": "Control Plane",
+    "border_devices": "Border",
+    "edge_devices": "Edge"
+}
+
+
+class DNACQueryError(RuntimeError):
+    """A read the caller depends on could not be completed"""
+
 
 class DNACFabricManager:
     """Manages SD-Access fabric configuration via DNA Center APIs"""
     
-    def __init__(self, host: str, username: str, password: str, verify_ssl: bool = False):
+    def __init__(self, host: str, username: str, password: str, verify_ssl: bool = False,
+                 task_timeout: int = 1800, max_workers: int = 8,
+                 transport: Optional[HTTPTransport] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[InventoryCache] = None,
+                 metrics: Optional[RequestMetrics] = None):
         """
         Initialize DNA Center connection
         
@@ -27,6 +75,13 @@ class DNACFabricManager:
             username: DNA Center username
             password: DNA Center password
             verify_ssl: Whether to verify SSL certificates
+            task_timeout: Seconds to wait for an asynchronous task to finish
+            max_workers: Maximum number of concurrent API operations
+            transport: Shared HTTP transport; a pool sized to max_workers
+                is created when omitted
+            rate_limiter: Shared rate limiter; a default one is created when omitted
+            cache: Inventory cache for device and fabric site lookups
+            metrics: Shared request metrics; a private one is created when omitted
         """
         self.host = host
         self.username = username
@@ -34,6 +89,18 @@ class DNACFabricManager:
         self.verify_ssl = verify_ssl
         self.base_url = f"https://{host}"
         self.token = None
+        self.token_acquired_at = 0.0
+        self._auth_lock = threading.Lock()
+        self.task_timeout = task_timeout
+        self.max_workers = max(1, max_workers)
+        self.transport = transport or HTTPTransport(pool_size=self.max_workers)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.cache = cache
+        self._inventory_lock = threading.Lock()
+        self.metrics = metrics or RequestMetrics()
+        self.journal = None
+        self._operation = threading.local()
+        self.task_latencies = []
         
     def authenticate(self) -> bool:
         """
@@ -42,19 +109,23 @@ class DNACFabricManager:
         Returns:
             bool: True if authentication successful
         """
-        url = f"{self.base_url}/dna/system/api/v1/auth/token"
+        endpoint = "/dna/system/api/v1/auth/token"
         
         try:
-            response = requests.post(
-                url,
-                auth=(self.username, self.password),
-                headers={"Content-Type": "application/json"},
-                verify=self.verify_ssl,
-                timeout=30
-            )
+            with self.metrics.timer("POST", endpoint) as timer:
+                response = self.transport.request(
+                    "POST",
+                    f"{self.base_url}{endpoint}",
+                    auth=(self.username, self.password),
+                    headers={"Content-Type": "application/json"},
+                    verify=self.verify_ssl,
+                    timeout=30
+                )
+                timer.response(response.status_code, len(response.content))
             response.raise_for_status()
             
             self.token = response.json()["Token"]
+            self.token_acquired_at = time.monotonic()
             print(f"Successfully authenticated to DNA Center at {self.host}")
             return True
             
@@ -62,7 +133,35 @@ class DNACFabricManager:
             print(f"Authentication failed: {e}")
             return False
     
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Optional[Dict]:
+    def _refresh_token(self, stale_token: Optional[str]) -> bool:
+        """
+        Re-authenticate once on behalf of all workers holding stale_token
+        
+        Workers that arrive while another one is refreshing wait on the lock
+        and then reuse the new token instead of requesting their own.
+        
+        Args:
+            stale_token: The token the caller found to be expired or rejected
+        
+        Returns:
+            bool: True if a valid token is available
+        """
+        with self._auth_lock:
+            if self.token and self.token != stale_token:
+                return True
+            print("Refreshing DNA Center token")
+            return self.authenticate()
+    
+    def _current_token(self) -> Optional[str]:
+        """Return the token, refreshing it proactively when it is about to expire"""
+        token = self.token
+        if token and time.monotonic() - self.token_acquired_at > TOKEN_LIFETIME - TOKEN_REFRESH_MARGIN:
+            self._refresh_token(token)
+            token = self.token
+        return token
+    
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                      params: Optional[Dict] = None, missing_ok: bool = False) -> Optional[Dict]:
         """
         Make authenticated API request
         
@@ -70,6 +169,9 @@ class DNACFabricManager:
             method: HTTP method (GET, POST, PUT, DELETE)
             endpoint: API endpoint path
             data: Request payload
+            params: Query string parameters
+            missing_ok: Return an empty dict instead of None when the server
+                reports that the requested object does not exist
             
         Returns:
             Response JSON or None on error
@@ -79,37 +181,321 @@ class DNACFabricManager:
             return None
         
         url = f"{self.base_url}{endpoint}"
-        headers = {
-            "X-Auth-Token": self.token,
-            "Content-Type": "application/json"
-        }
         
-        try:
-            response = requests.request(
-                method,
-                url,
-                headers=headers,
-                json=data,
-                verify=self.verify_ssl,
-                timeout=60
-            )
-            response.raise_for_status()
-            return response.json()
+        # A 401 means the token expired or was revoked server-side:
+        # re-authenticate and replay the request once. 429 responses (and
+        # 503 for idempotent methods) are retried with backoff by the rate limiter.
+        reauthenticated = False
+        attempt = 0
+        while True:
+            token = self._current_token()
+            headers = {
+                "X-Auth-Token": token,
+                "Content-Type": "application/json"
+            }
             
-        except requests.exceptions.RequestException as e:
-            print(f"Request failed: {e}")
-            if hasattr(e.response, 'text'):
-                print(f"Response: {e.response.text}")
+            try:
+                self.rate_limiter.acquire(endpoint)
+                with self.metrics.timer(method, endpoint) as timer:
+                    response = self.transport.request(
+                        method,
+                        url,
+                        headers=headers,
+                        json=data,
+                        params=params,
+                        verify=self.verify_ssl,
+                        timeout=60
+                    )
+                    timer.response(response.status_code, len(response.content))
+                if response.status_code == 401 and not reauthenticated:
+                    reauthenticated = True
+                    if not self._refresh_token(token):
+                        return None
+                    continue
+                if self.rate_limiter.wait_before_retry(method, endpoint, response, attempt):
+                    attempt += 1
+                    continue
+                if missing_ok and self._is_not_found(response):
+                    return {}
+                response.raise_for_status()
+                return response.json()
+            
+            except requests.exceptions.RequestException as e:
+                print(f"Request failed: {e}")
+                if hasattr(e.response, 'text'):
+                    print(f"Response: {e.response.text}")
+                return None
+    
+    @staticmethod
+    def _not_found_body(body) -> bool:
+        """True if a response body is a failure saying the object does not exist"""
+        if not isinstance(body, dict):
+            return False
+        body = body.get("response", body) if isinstance(body.get("response"), dict) else body
+        return (str(body.get("status", "")).lower() == "failed"
+                and bool(NOT_FOUND_PATTERN.search(str(body.get("description", "")))))
+    
+    def _is_not_found(self, response: requests.Response) -> bool:
+        """True if a 4xx response means the requested object does not exist"""
+        if response.status_code == 404:
+            return True
+        if not 400 <= response.status_code < 500:
+            return False
+        try:
+            return self._not_found_body(response.json())
+        except ValueError:
+            return False
+    
+    def _get_task_id(self, result: Dict) -> Optional[Tuple[str, str]]:
+        """
+        Extract the asynchronous task reference from an API response
+        
+        Args:
+            result: Response JSON of a POST/PUT/DELETE call
+        
+        Returns:
+            ("task", id) or ("execution", id), or None for synchronous responses
+        """
+        response = result.get("response", result)
+        if not isinstance(response, dict):
+            return None
+        if response.get("taskId"):
+            return ("task", response["taskId"])
+        if response.get("executionId"):
+            return ("execution", response["executionId"])
+        return None
+    
+    def _get_task_status(self, kind: str, task_id: str) -> Optional[bool]:
+        """
+        Query the current state of a task
+        
+        Args:
+            kind: "task" or "execution"
+            task_id: Task or execution ID
+        
+        Returns:
+            True if finished successfully, False if failed, None while running
+        
+        Raises:
+            DNACQueryError: If the status could not be read or the task is
+                unknown (e.g. purged), so its outcome cannot be determined
+        """
+        if kind == "task":
+            endpoint = f"/dna/intent/api/v1/task/{task_id}"
+        else:
+            endpoint = f"/dna/intent/api/v1/dnacaap/management/execution-status/{task_id}"
+        result = self._make_request("GET", endpoint, missing_ok=True)
+        if result is None:
+            raise DNACQueryError(f"Failed to read the status of {kind} {task_id}")
+        if not result:
+            raise DNACQueryError(f"{kind.capitalize()} {task_id} not found")
+        
+        if kind == "task":
+            task = result.get("response")
+            if not task:
+                return None
+            if task.get("isError"):
+                print(f"Task {task_id} failed: {task.get('failureReason', task.get('progress'))}")
+                return False
+            if task.get("endTime"):
+                return True
             return None
+        
+        status = result.get("status")
+        if status == "SUCCESS":
+            return True
+        if status == "FAILURE":
+            print(f"Execution {task_id} failed: {result.get('bapiError')}")
+            return False
+        return None
     
-    def get_devices(self) -> List[Dict]:
-        """Get all network devices from inventory"""
+    def wait_for_task(self, kind: str, task_id: str, description: str = "",
+                      max_failures: int = TASK_POLL_MAX_FAILURES) -> bool:
+        """
+        Poll a task until it completes, backing off between polls
+        
+        Args:
+            kind: "task" or "execution"
+            task_id: Task or execution ID
+            description: Human readable label used in latency records
+            max_failures: Consecutive unreadable statuses after which the
+                task is treated as failed
+        
+        Returns:
+            bool: True if the task completed successfully
+        """
+        start = time.monotonic()
+        interval = TASK_POLL_INITIAL_INTERVAL
+        failures = 0
+        
+        while True:
+            try:
+                status = self._get_task_status(kind, task_id)
+                failures = 0
+            except DNACQueryError as e:
+                failures += 1
+                status = None
+                if failures >= max_failures:
+                    print(f"Giving up on {description or task_id}: {e}")
+                    status = False
+            elapsed = time.monotonic() - start
+            if status is not None:
+                break
+            if elapsed >= self.task_timeout:
+                print(f"Timed out after {elapsed:.0f}s waiting for {description or task_id}")
+                status = False
+                break
+            time.sleep(min(interval, self.task_timeout - elapsed))
+            interval = min(interval * TASK_POLL_BACKOFF, TASK_POLL_MAX_INTERVAL)
+        
+        self.task_latencies.append({
+            "task_id": task_id,
+            "description": description,
+            "seconds": round(elapsed, 3),
+            "success": status
+        })
+        return status
+    
+    def _submit_task(self, endpoint: str, data: Dict, description: str) -> bool:
+        """
+        POST an intent request and wait for the resulting task to finish
+        
+        Args:
+            endpoint: API endpoint path
+            data: Request payload
+            description: Human readable label used in latency records
+        
+        Returns:
+            bool: True if the request and its task succeeded
+        """
+        result = self._make_request("POST", endpoint, data)
+        if not result:
+            return False
+        
+        task = self._get_task_id(result)
+        if task is None:
+            return True
+        
+        operation = getattr(self._operation, "name", None)
+        if self.journal is not None and operation:
+            self.journal.record_submitted(operation, task[0], task[1])
+        return self.wait_for_task(task[0], task[1], description)
+    
+    def print_task_summary(self):
+        """Print per-task latency statistics"""
+        if not self.task_latencies:
+            return
+        
+        print("\n=== Task Latency Summary ===")
+        for record in self.task_latencies:
+            state = "ok" if record["success"] else "FAILED"
+            print(f"{record['seconds']:8.1f}s  {state:6}  {record['description']}")
+        
+        total = sum(r["seconds"] for r in self.task_latencies)
+        slowest = max(self.task_latencies, key=lambda r: r["seconds"])
+        print(f"{len(self.task_latencies)} tasks, {total:.1f}s total, "
+              f"slowest: {slowest['description']} ({slowest['seconds']:.1f}s)")
+    
+    def iter_devices(self, page_size: int = DEVICE_PAGE_SIZE, filters: Optional[Dict] = None,
+                     fields: Optional[List[str]] = None) -> Iterator[Dict]:
+        """
+        Stream network devices from inventory page by page
+        
+        The next page is requested in the background while the caller
+        consumes the current one, so memory use is bounded by two pages.
+        
+        Args:
+            page_size: Devices per request (DNA Center caps this at 500)
+            filters: Server-side query filters, e.g. {"family": "Switches and Hubs"}
+            fields: Device attributes to keep; all attributes when omitted
+        
+        Yields:
+            Device dictionaries
+        
+        Raises:
+            DNACQueryError: If a page cannot be retrieved, so a failed request
+                is never mistaken for the end of the inventory
+        """
         endpoint = "/dna/intent/api/v1/network-device"
-        result = self._make_request("GET", endpoint)
+        page_size = max(1, min(page_size, DEVICE_PAGE_SIZE))
         
-        if result and "response" in result:
+        def fetch_page(offset: int) -> List[Dict]:
+            params = dict(filters or {})
+            params.update(offset=offset, limit=page_size)
+            result = self._make_request("GET", endpoint, params=params)
+            if not result or not isinstance(result.get("response"), list):
+                raise DNACQueryError(f"Failed to retrieve devices at offset {offset}")
             return result["response"]
-        return []
+        
+        # DNA Center offsets are 1-based
+        offset = 1
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = executor.submit(fetch_page, offset)
+            while True:
+                page = pending.result()
+                offset += page_size
+                if len(page) >= page_size:
+                    pending = executor.submit(fetch_page, offset)
+                
+                for device in page:
+                    if fields:
+                        yield {field: device.get(field) for field in fields}
+                    else:
+                        yield device
+                
+                if len(page) < page_size:
+                    return
+    
+    def get_devices(self, refresh: bool = False) -> List[Dict]:
+        """
+        Get all network devices from inventory
+        
+        Args:
+            refresh: Bypass the inventory cache TTL
+        
+        Returns:
+            List of device dictionaries
+        
+        Raises:
+            DNACQueryError: If the inventory could not be read completely
+        """
+        if self.cache is None:
+            return list(self.iter_devices())
+        
+        self._refresh_device_cache(refresh)
+        return self.cache.get("devices")
+    
+    def _refresh_device_cache(self, refresh: bool = False):
+        """Sync the device cache from inventory if its TTL expired or refresh is set"""
+        # Concurrent site deployments share one refresh
+        with self._inventory_lock:
+            if not refresh and self.cache.is_fresh("devices"):
+                return
+            counts = self.cache.sync(
+                "devices", self.iter_devices(), "id", updated_field="lastUpdateTime"
+            )
+        print(f"Device cache refreshed: {counts['added']} added, {counts['updated']} updated, "
+              f"{counts['unchanged']} unchanged, {counts['removed']} removed")
+    
+    def find_device(self, value: str) -> Optional[Dict]:
+        """
+        Find an inventory device by management IP, hostname or serial number
+        
+        Args:
+            value: Management IP, hostname or serial number
+        
+        Returns:
+            Device dictionary or None
+        """
+        if self.cache is None:
+            for device in self.iter_devices():
+                if value in (device.get("managementIpAddress"), device.get("hostname"),
+                             device.get("serialNumber")):
+                    return device
+            return None
+        
+        self._refresh_device_cache()
+        return self.cache.find_device(value)
     
     def create_fabric_site(self, site_hierarchy: str, fabric_type: str = "FABRIC_SITE") -> bool:
         """
@@ -128,10 +514,10 @@ class DNACFabricManager:
             "fabricType": fabric_type
         }
         
-        result = self._make_request("POST", endpoint, data)
-        
-        if result:
+        if self._submit_task(endpoint, data, f"fabric site {site_hierarchy}"):
             print(f"Fabric site created: {site_hierarchy}")
+            if self.cache is not None:
+                self.cache.invalidate("fabric_sites")
             return True
         return False
     
@@ -153,9 +539,7 @@ class DNACFabricManager:
             "routeDistributionProtocol": "LISP_BGP"
         }
         
-        result = self._make_request("POST", endpoint, data)
-        
-        if result:
+        if self._submit_task(endpoint, data, f"control plane device {device_ip}"):
             print(f"Control plane device added: {device_ip}")
             return True
         return False
@@ -182,9 +566,7 @@ class DNACFabricManager:
             "borderSessionType": "EXTERNAL"
         }
         
-        result = self._make_request("POST", endpoint, data)
-        
-        if result:
+        if self._submit_task(endpoint, data, f"border device {device_ip}"):
             print(f"Border device added: {device_ip}")
             return True
         return False
@@ -206,9 +588,7 @@ class DNACFabricManager:
             "siteNameHierarchy": site_hierarchy
         }
         
-        result = self._make_request("POST", endpoint, data)
-        
-        if result:
+        if self._submit_task(endpoint, data, f"edge device {device_ip}"):
             print(f"Edge device added: {device_ip}")
             return True
         return False
@@ -230,9 +610,7 @@ class DNACFabricManager:
             "siteNameHierarchy": site_hierarchy
         }
         
-        result = self._make_request("POST", endpoint, data)
-        
-        if result:
+        if self._submit_task(endpoint, data, f"virtual network {vn_name}"):
             print(f"Virtual network created: {vn_name}")
             return True
         return False
@@ -258,9 +636,7 @@ class DNACFabricManager:
             "gateway": gateway
         }
         
-        result = self._make_request("POST", endpoint, data)
-        
-        if result:
+        if self._submit_task(endpoint, data, f"IP pool {ip_pool} for {vn_name}"):
             print(f"IP pool added to {vn_name}: {ip_pool}")
             return True
         return False
@@ -282,28 +658,517 @@ class DNACFabricManager:
             "siteNameHierarchy": site_hierarchy
         }
         
-        result = self._make_request("POST", endpoint, data)
-        
-        if result:
-            print(f"Device provisioning initiated: {device_ip}")
+        if self._submit_task(endpoint, data, f"provision {device_ip}"):
+            print(f"Device provisioned: {device_ip}")
+            if self.cache is not None:
+                self.cache.invalidate("devices")
             return True
         return False
     
-    def get_fabric_sites(self) -> List[Dict]:
-        """Get all fabric sites"""
+    def get_fabric_sites(self, refresh: bool = False) -> List[Dict]:
+        """
+        Get all fabric sites
+        
+        Args:
+            refresh: Bypass the inventory cache TTL
+        
+        Returns:
+            List of fabric site dictionaries
+        
+        Raises:
+            DNACQueryError: If the site list could not be retrieved
+        """
+        if self.cache is not None and not refresh and self.cache.is_fresh("fabric_sites"):
+            return self.cache.get("fabric_sites")
+        
         endpoint = "/dna/intent/api/v1/business/sda/fabric-site"
         result = self._make_request("GET", endpoint)
+        if not result or not isinstance(result.get("response"), list):
+            raise DNACQueryError("Failed to retrieve fabric sites")
         
-        if result and "response" in result:
-            return result["response"]
-        return []
+        sites = result["response"]
+        if self.cache is not None:
+            self.cache.sync("fabric_sites", sites, "siteNameHierarchy")
+        return sites
     
-    def deploy_full_fabric(self, config_file: str) -> bool:
+    def _run_concurrently(self, func: Callable[..., bool], calls: List[tuple]) -> List[bool]:
+        """
+        Run func once per argument tuple with at most max_workers in flight
+        
+        Args:
+            func: Manager method to call
+            calls: Positional argument tuples, one per call
+        
+        Returns:
+            List of results in the same order as calls
+        """
+        if not calls:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(calls))) as executor:
+            futures = [executor.submit(func, *args) for args in calls]
+            return [future.result() for future in futures]
+    
+    def _get_sda_object(self, endpoint: str, params: Dict, site_hierarchy: str) -> Optional[Dict]:
+        """
+        Read one SDA object by its identifying query parameters
+        
+        Args:
+            endpoint: SDA endpoint
+            params: Query identifying the object (device IP, VN or pool name)
+            site_hierarchy: Fabric site the object must belong to
+        
+        Returns:
+            The object, or None if it does not exist in this site
+        
+        Raises:
+            DNACQueryError: If the read failed for any reason other than the
+                object not existing
+        """
+        result = self._make_request("GET", endpoint, params=params, missing_ok=True)
+        if result is None:
+            raise DNACQueryError(f"Failed to retrieve {endpoint} for {params}")
+        if self._not_found_body(result):
+            return None
+        
+        item = result.get("response", result)
+        if isinstance(item, list):
+            item = item[0] if item else {}
+        if not isinstance(item, dict):
+            raise DNACQueryError(f"Unexpected response from {endpoint} for {params}")
+        if str(item.get("status", "")).lower() == "failed":
+            raise DNACQueryError(
+                f"Failed to retrieve {endpoint} for {params}: {item.get('description')}"
+            )
+        if not item or item.get("siteNameHierarchy", site_hierarchy) != site_hierarchy:
+            return None
+        return item
+    
+    def get_fabric_state(self, config: Dict) -> Dict:
+        """
+        Fetch the current state of a fabric site in one round of queries
+        
+        The SDA APIs look objects up by device IP, VN name or pool name, so
+        every configured device and VN is read individually (concurrently).
+        The fabric site list and device inventory come from the inventory
+        cache while it is fresh.
+        
+        Args:
+            config: Fabric configuration of a single site
+        
+        Returns:
+            Dict with the site's existence, device IPs per role, VN names,
+            IP pools per VN, provisioned device IPs and configured device IPs
+            missing from the inventory
+        
+        Raises:
+            DNACQueryError: If any query failed; a failed read is never
+                taken to mean the object does not exist
+        """
+        site_hierarchy = config["fabric_site"]["site_hierarchy"]
+        device_ips = self.config_device_ips(config)
+        state = {
+            "fabric_site": False,
+            "virtual_networks": set(),
+            "ip_pools": {},
+            "provisioned": set(),
+            "unknown_devices": set()
+        }
+        for role in ROLE_ENDPOINTS:
+            state[role] = set()
+        
+        if self.cache is not None:
+            state["unknown_devices"] = {ip for ip in device_ips if self.find_device(ip) is None}
+        
+        sites = self.get_fabric_sites()
+        state["fabric_site"] = any(
+            site.get("siteNameHierarchy") == site_hierarchy for site in sites
+        )
+        if not state["fabric_site"]:
+            return state
+        
+        # (state key, value recorded when the object exists, endpoint, query)
+        queries = []
+        for role, endpoint in ROLE_ENDPOINTS.items():
+            queries += [(role, device["ip"], endpoint, {"deviceManagementIpAddress": device["ip"]})
+                        for device in config.get(role, [])]
+        queries += [("provisioned", ip, "/dna/intent/api/v1/business/sda/provision-device",
+                     {"deviceManagementIpAddress": ip}) for ip in device_ips]
+        for vn in config.get("virtual_networks", []):
+            queries.append(("virtual_networks", vn["name"],
+                            "/dna/intent/api/v1/business/sda/virtual-network",
+                            {"virtualNetworkName": vn["name"], "siteNameHierarchy": site_hierarchy}))
+            queries.append(("ip_pools", vn["name"],
+                            "/dna/intent/api/v1/business/sda/virtualnetwork/ippool",
+                            {"siteNameHierarchy": site_hierarchy, "virtualNetworkName": vn["name"],
+                             "ipPoolName": f"{vn['name']}_Pool"}))
+        
+        items = self._run_concurrently(
+            self._get_sda_object,
+            [(endpoint, params, site_hierarchy) for _, _, endpoint, params in queries]
+        )
+        for (key, value, _, _), item in zip(queries, items):
+            if item is None:
+                continue
+            if key == "ip_pools":
+                state["ip_pools"][value] = (item.get("ipPoolRange"), item.get("gateway"))
+            else:
+                state[key].add(value)
+        return state
+    
+    def plan_deployment(self, config: Dict, state: Optional[Dict] = None) -> Dict:
+        """
+        Work out which API operations a deployment needs
+        
+        Args:
+            config: Fabric configuration
+            state: Current fabric state from get_fabric_state; when omitted
+                every object in the configuration is created
+        
+        Returns:
+            Plan dict listing the site, devices per role, VNs, IP pools and
+            provisioning operations to perform, plus detected drift
+        """
+        site_hierarchy = config["fabric_site"]["site_hierarchy"]
+        if state is None:
+            state = {"fabric_site": False, "virtual_networks": set(), "ip_pools": {},
+                     "provisioned": set(), "unknown_devices": set()}
+            for role in ROLE_ENDPOINTS:
+                state[role] = set()
+        
+        plan = {
+            "fabric_site": [] if state["fabric_site"] else [site_hierarchy],
+            "virtual_networks": [],
+            "ip_pools": [],
+            "provision": {},
+            "drift": [],
+            "unknown_devices": []
+        }
+        
+        for role in ROLE_ENDPOINTS:
+            wanted = [device["ip"] for device in config.get(role, [])]
+            plan["unknown_devices"] += [ip for ip in wanted if ip in state["unknown_devices"]]
+            plan[role] = [ip for ip in wanted if ip not in state[role]]
+            added = set(plan[role])
+            plan["provision"][role] = [
+                ip for ip in wanted if ip in added or ip not in state["provisioned"]
+            ]
+        
+        for vn in config.get("virtual_networks", []):
+            if vn["name"] not in state["virtual_networks"]:
+                plan["virtual_networks"].append(vn)
+            elif vn["name"] not in state["ip_pools"]:
+                plan["ip_pools"].append(vn)
+            elif any(current not in (None, wanted) for current, wanted in
+                     zip(state["ip_pools"][vn["name"]], (vn["ip_pool"], vn["gateway"]))):
+                # Fields the pool read did not return are not treated as drift
+                current_pool, current_gateway = state["ip_pools"][vn["name"]]
+                plan["drift"].append(
+                    f"{vn['name']} pool is {current_pool} via {current_gateway}, "
+                    f"config wants {vn['ip_pool']} via {vn['gateway']}"
+                )
+        
+        return plan
+    
+    def _count_plan_calls(self, plan: Dict) -> int:
+        """Number of intent API calls a plan will issue"""
+        calls = len(plan["fabric_site"]) + len(plan["ip_pools"])
+        calls += 2 * len(plan["virtual_networks"])
+        for role in ROLE_ENDPOINTS:
+            calls += len(plan[role]) + len(plan["provision"][role])
+        return calls
+    
+    def print_plan(self, plan: Dict, full_plan: Dict, site_hierarchy: str):
+        """
+        Print a reconcile plan and the calls it saves
+        
+        Args:
+            plan: Plan computed against the current fabric state
+            full_plan: Plan of a deployment from scratch
+            site_hierarchy: Site name hierarchy
+        """
+        print(f"\n=== Reconcile Plan: {site_hierarchy} ===")
+        rows = [("Fabric site", "fabric_site")] + [
+            (ROLE_TITLES[role] + " devices", role) for role in ROLE_ENDPOINTS
+        ] + [("Virtual networks", "virtual_networks"), ("IP pools", "ip_pools")]
+        for title, key in rows:
+            print(f"  {title}: {len(plan[key])} to create")
+        provision = sum(len(ips) for ips in plan["provision"].values())
+        print(f"  Device provisioning: {provision} to run")
+        
+        for message in plan["drift"]:
+            print(f"  Drift (not changed automatically): {message}")
+        for ip in dict.fromkeys(plan["unknown_devices"]):
+            print(f"  Warning: {ip} is not in the DNA Center inventory")
+        
+        planned = self._count_plan_calls(plan)
+        saved = self._count_plan_calls(full_plan) - planned
+        print(f"{planned} API calls planned, {saved} saved versus a full deployment")
+    
+    def _journaled(self, operation: str, func: Callable[..., bool], *args) -> bool:
+        """
+        Run a deployment operation, consulting the resume journal first
+        
+        Operations the journal records as done are skipped; operations that
+        were submitted but never confirmed have their task re-polled and are
+        only re-run if that task did not succeed. A task whose status cannot
+        be read (e.g. purged since the crash) is re-run straight away.
+        
+        Args:
+            operation: Unique operation key
+            func: Manager method performing the operation
+            *args: Arguments for func
+        
+        Returns:
+            bool: True if the operation is complete
+        """
+        journal = self.journal
+        if journal is None:
+            return func(*args)
+        
+        if journal.is_done(operation):
+            print(f"Already completed: {operation}")
+            return True
+        
+        pending = journal.pending_task(operation)
+        if pending and self.wait_for_task(pending[0], pending[1], operation, max_failures=1):
+            print(f"In-flight task completed: {operation}")
+            journal.record_done(operation)
+            return True
+        
+        self._operation.name = operation
+        try:
+            success = func(*args)
+        finally:
+            self._operation.name = None
+        
+        if success:
+            journal.record_done(operation)
+        return success
+    
+    def _execute_plan(self, plan: Dict, site_hierarchy: str, fabric_type: str,
+                      max_workers: int) -> Tuple[DAGScheduler, bool]:
+        """
+        Run the operations of a deployment plan as a dependency graph
+        
+        Args:
+            plan: Plan from plan_deployment
+            site_hierarchy: Site name hierarchy
+            fabric_type: Type of fabric site
+            max_workers: Concurrent operations allowed for this site
+        
+        Returns:
+            The scheduler holding per-task results, and True if every
+            operation succeeded
+        """
+        scheduler = DAGScheduler(max_workers=max_workers)
+        self.schedule_plan(scheduler, plan, site_hierarchy, fabric_type)
+        
+        print(f"\n=== Deploying {site_hierarchy} ({len(scheduler.tasks)} operations) ===")
+        success = scheduler.run()
+        scheduler.print_report(site_hierarchy)
+        return scheduler, success
+    
+    def schedule_plan(self, scheduler: DAGScheduler, plan: Dict, site_hierarchy: str,
+                      fabric_type: str, prefix: str = "",
+                      external: Optional[Dict[str, List[str]]] = None) -> List[str]:
+        """
+        Add the operations of a deployment plan to a scheduler
+        
+        Dependencies: site -> role devices (control plane, then border,
+        then edge); site -> VN -> IP pool; role device + all VNs -> provision.
+        Every operation starts as soon as its own prerequisites are done.
+        
+        Args:
+            scheduler: Scheduler to add tasks to, possibly shared with other sites
+                or systems
+            plan: Plan from plan_deployment
+            site_hierarchy: Site name hierarchy
+            fabric_type: Type of fabric site
+            prefix: Prepended to task names to keep them unique in a shared scheduler
+            external: Extra prerequisites from outside this plan, keyed by
+                operation name (e.g. "provision:10.2.1.1"); the operation is
+                skipped if one of them fails
+        
+        Returns:
+            Names of the added tasks
+        """
+        external = external or {}
+        added = []
+        
+        def add(name: str, func: Callable[..., bool], *args, requires=(), after=()) -> str:
+            added.append(scheduler.add(f"{prefix}{name}", self._journaled,
+                                       f"{site_hierarchy}|{name}", func, *args,
+                                       requires=list(requires) + external.get(name, []),
+                                       after=after))
+            return added[-1]
+        
+        site = []
+        if plan["fabric_site"]:
+            site = [add("site", self.create_fabric_site, site_hierarchy, fabric_type)]
+        
+        add_device = {
+            "control_plane_devices": self.add_control_plane_device,
+            "border_devices": self.add_border_device,
+            "edge_devices": self.add_edge_device
+        }
+        role_tasks = {}
+        previous_role = []
+        for role in ROLE_ENDPOINTS:
+            role_tasks[role] = {
+                ip: add(f"{role}:{ip}", add_device[role], ip, site_hierarchy,
+                        requires=site, after=previous_role)
+                for ip in plan[role]
+            }
+            previous_role = list(role_tasks[role].values()) or previous_role
+        
+        vn_tasks = []
+        for vn in plan["virtual_networks"]:
+            vn_task = add(f"vn:{vn['name']}", self.create_virtual_network,
+                          vn["name"], site_hierarchy, requires=site)
+            vn_tasks.append(vn_task)
+            vn_tasks.append(add(f"pool:{vn['name']}", self.add_ip_pool_to_vn,
+                                vn["name"], vn["ip_pool"], vn["gateway"],
+                                requires=[vn_task]))
+        for vn in plan["ip_pools"]:
+            vn_tasks.append(add(f"pool:{vn['name']}", self.add_ip_pool_to_vn,
+                                vn["name"], vn["ip_pool"], vn["gateway"],
+                                requires=site))
+        
+        # Provisioning keeps the role order as well
+        previous_role = []
+        for role in ROLE_ENDPOINTS:
+            provision_tasks = [
+                add(f"provision:{ip}", self.provision_device, ip, site_hierarchy,
+                    requires=site + ([role_tasks[role][ip]] if ip in role_tasks[role] else []),
+                    after=vn_tasks + previous_role)
+                for ip in plan["provision"][role]
+            ]
+            previous_role = provision_tasks or previous_role
+        
+        return added
+    
+    @staticmethod
+    def config_device_ips(config: Dict) -> List[str]:
+        """Return the IPs of every device in a single-site configuration"""
+        return list(dict.fromkeys(
+            device["ip"] for role in ROLE_ENDPOINTS for device in config.get(role, [])
+        ))
+    
+    @staticmethod
+    def _site_configs(config: Dict) -> List[Dict]:
+        """
+        Split a configuration into one single-site configuration per fabric site
+        
+        Accepts both the single-site schema ("fabric_site" plus device and VN
+        lists at the top level) and the multi-site schema, where
+        "fabric_sites" is a list of objects that each carry "site_hierarchy",
+        "fabric_type", an optional "max_workers" cap and their own device and
+        VN lists. Top-level "virtual_networks" apply to every site that does
+        not define its own.
+        
+        Args:
+            config: Parsed configuration file
+        
+        Returns:
+            List of single-site configurations
+        """
+        if "fabric_sites" not in config:
+            return [config]
+        
+        sites = []
+        for site in config["fabric_sites"]:
+            site_config = {
+                "fabric_site": {
+                    "site_hierarchy": site["site_hierarchy"],
+                    "fabric_type": site.get("fabric_type", "FABRIC_SITE")
+                },
+                "virtual_networks": site.get("virtual_networks", config.get("virtual_networks", []))
+            }
+            for role in ROLE_ENDPOINTS:
+                site_config[role] = site.get(role, [])
+            if "max_workers" in site:
+                site_config["max_workers"] = site["max_workers"]
+            sites.append(site_config)
+        return sites
+    
+    def deploy_site(self, config: Dict, reconcile: bool = False, dry_run: bool = False) -> Dict:
+        """
+        Deploy a single fabric site
+        
+        Args:
+            config: Single-site configuration
+            reconcile: Compare against the current fabric state and only
+                create what is missing
+            dry_run: Print the reconcile plan without applying it
+        
+        Returns:
+            Result dict with the site, success flag, task counts and duration
+        """
+        site_hierarchy = config["fabric_site"]["site_hierarchy"]
+        start = time.monotonic()
+        plan = self.plan_deployment(config)
+        counts = {"ok": 0, "failed": 0, "skipped": 0}
+        
+        if reconcile or dry_run:
+            full_plan = plan
+            try:
+                state = self.get_fabric_state(config)
+            except DNACQueryError as e:
+                # Applying a plan built on partial state would recreate
+                # whatever could not be read
+                print(f"Reconcile aborted for {site_hierarchy}, current state unknown: {e}")
+                return {"site": site_hierarchy, "success": False, "calls": 0,
+                        "seconds": time.monotonic() - start, **counts}
+            plan = self.plan_deployment(config, state)
+            self.print_plan(plan, full_plan, site_hierarchy)
+        
+        success = True
+        if not dry_run:
+            scheduler, success = self._execute_plan(
+                plan, site_hierarchy, config["fabric_site"]["fabric_type"],
+                config.get("max_workers", self.max_workers)
+            )
+            for result in scheduler.results.values():
+                counts[result["status"]] += 1
+        
+        return {
+            "site": site_hierarchy,
+            "success": success,
+            "calls": self._count_plan_calls(plan),
+            "seconds": time.monotonic() - start,
+            **counts
+        }
+    
+    def print_site_summary(self, results: List[Dict]):
+        """Print the aggregated results of a multi-site deployment"""
+        print("\n=== Site Summary ===")
+        for result in results:
+            state = "ok" if result["success"] else "FAILED"
+            print(f"{result['seconds']:8.1f}s  {state:6}  {result['site']}: "
+                  f"{result['calls']} calls, {result['ok']} ok, {result['failed']} failed, "
+                  f"{result['skipped']} skipped")
+        failed = sum(1 for result in results if not result["success"])
+        print(f"{len(results)} sites, {failed} failed")
+    
+    def deploy_full_fabric(self, config_file: str, reconcile: bool = False,
+                           dry_run: bool = False, max_sites: int = 4, resume: bool = False,
+                           journal_dir: str = DEFAULT_JOURNAL_DIR) -> bool:
         """
         Deploy complete fabric from configuration file
         
+        Independent fabric sites are deployed concurrently against the same
+        DNA Center, sharing its connection pool and rate limits.
+        
         Args:
             config_file: Path to JSON configuration file
+            reconcile: Compare against the current fabric state and only
+                create what is missing
+            dry_run: Print the reconcile plan without applying it
+            max_sites: Maximum number of sites deployed at once
+            resume: Skip operations a previous run of the same configuration
+                completed and re-poll the tasks it left in flight
+            journal_dir: Directory holding resume journals
             
         Returns:
             bool: True if successful
@@ -312,80 +1177,38 @@ class DNACFabricManager:
             with open(config_file, 'r') as f:
                 config = json.load(f)
             
-            # Create fabric site
-            print("\n=== Creating Fabric Site ===")
-            if not self.create_fabric_site(
-                config["fabric_site"]["site_hierarchy"],
-                config["fabric_site"]["fabric_type"]
-            ):
-                return False
-            
-            time.sleep(5)
-            
-            # Add control plane devices
-            print("\n=== Adding Control Plane Devices ===")
-            for device in config.get("control_plane_devices", []):
-                self.add_control_plane_device(
-                    device["ip"],
-                    config["fabric_site"]["site_hierarchy"]
-                )
-                time.sleep(2)
-            
-            # Add border devices
-            print("\n=== Adding Border Devices ===")
-            for device in config.get("border_devices", []):
-                self.add_border_device(
-                    device["ip"],
-                    config["fabric_site"]["site_hierarchy"]
-                )
-                time.sleep(2)
-            
-            # Add edge devices
-            print("\n=== Adding Edge Devices ===")
-            for device in config.get("edge_devices", []):
-                self.add_edge_device(
-                    device["ip"],
-                    config["fabric_site"]["site_hierarchy"]
-                )
-                time.sleep(2)
+            sites = self._site_configs(config)
+            if not dry_run:
+                self.journal = DeployJournal("dnac", config_file, resume, journal_dir)
             
-            # Create virtual networks
-            print("\n=== Creating Virtual Networks ===")
-            for vn in config.get("virtual_networks", []):
-                if self.create_virtual_network(
-                    vn["name"],
-                    config["fabric_site"]["site_hierarchy"]
-                ):
-                    time.sleep(2)
-                    self.add_ip_pool_to_vn(
-                        vn["name"],
-                        vn["ip_pool"],
-                        vn["gateway"]
-                    )
-                time.sleep(2)
+            with ThreadPoolExecutor(max_workers=max(1, min(max_sites, len(sites)))) as executor:
+                results = list(executor.map(
+                    lambda site: self.deploy_site(site, reconcile, dry_run), sites
+                ))
             
-            # Provision all devices
-            print("\n=== Provisioning Devices ===")
-            all_devices = (
-                config.get("control_plane_devices", []) +
-                config.get("border_devices", []) +
-                config.get("edge_devices", [])
-            )
+            if dry_run:
+                return all(result["success"] for result in results)
             
-            for device in all_devices:
-                self.provision_device(
-                    device["ip"],
-                    config["fabric_site"]["site_hierarchy"]
-                )
-                time.sleep(2)
+            self.print_task_summary()
+            if len(results) > 1:
+                self.print_site_summary(results)
+            self.transport.print_stats()
+            self.rate_limiter.print_stats()
+            self.metrics.print_stats()
+            if not all(result["success"] for result in results):
+                return False
             
             print("\n=== Fabric Deployment Complete ===")
-            print("Note: Device provisioning may take 10-20 minutes to complete.")
             return True
             
         except Exception as e:
             print(f"Deployment failed: {e}")
             return False
+        
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
 
 
 def main():
@@ -396,15 +1219,50 @@ def main():
     parser.add_argument("--password", required=True, help="DNA Center password")
     parser.add_argument("--config", required=True, help="Path to configuration JSON file")
     parser.add_argument("--verify-ssl", action="store_true", help="Verify SSL certificates")
+    parser.add_argument("--task-timeout", type=int, default=1800,
+                        help="Seconds to wait for each DNA Center task (default: 1800)")
+    parser.add_argument("--max-workers", type=int, default=8,
+                        help="Maximum concurrent device operations (default: 8)")
+    parser.add_argument("--pool-size", type=int,
+                        help="HTTP connection pool size (default: --max-workers x --max-sites)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"Inventory cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the inventory cache")
+    parser.add_argument("--reconcile", action="store_true",
+                        help="Only create objects missing from the current fabric")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Print the reconcile plan without making changes")
+    parser.add_argument("--max-sites", type=int, default=4,
+                        help="Maximum fabric sites deployed concurrently (default: 4)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume an interrupted deployment of the same configuration")
+    parser.add_argument("--journal-dir", default=DEFAULT_JOURNAL_DIR,
+                        help=f"Resume journal directory (default: {DEFAULT_JOURNAL_DIR})")
+    parser.add_argument("--metrics-file",
+                        help="Write per-endpoint request latency histograms to this file")
+    parser.add_argument("--metrics-format", choices=("prometheus", "jsonl"), default="prometheus",
+                        help="Metrics file format: Prometheus textfile or JSON lines "
+                             "(default: prometheus)")
+    parser.add_argument("--request-log", help="Append a JSON line per API request to this file")
     
     args = parser.parse_args()
     
+    metrics = RequestMetrics()
+    request_log = RequestLog(args.request_log) if args.request_log else None
+    if request_log:
+        metrics.add_hook(request_log)
+    
     # Create manager instance
     manager = DNACFabricManager(
         host=args.host,
         username=args.username,
         password=args.password,
-        verify_ssl=args.verify_ssl
+        verify_ssl=args.verify_ssl,
+        task_timeout=args.task_timeout,
+        max_workers=args.max_workers,
+        transport=HTTPTransport(pool_size=args.pool_size or args.max_workers * args.max_sites),
+        cache=None if args.no_cache else InventoryCache(args.host, args.cache_dir),
+        metrics=metrics
     )
     
     # Authenticate
@@ -413,7 +1271,17 @@ def main():
         return 1
     
     # Deploy fabric
-    if manager.deploy_full_fabric(args.config):
+    try:
+        success = manager.deploy_full_fabric(args.config, reconcile=args.reconcile,
+                                             dry_run=args.dry_run, max_sites=args.max_sites,
+                                             resume=args.resume, journal_dir=args.journal_dir)
+    finally:
+        if request_log:
+            request_log.close()
+        if args.metrics_file:
+            metrics.export(args.metrics_file, args.metrics_format)
+    
+    if success:
         print("\nFabric deployment successful!")
         return 0
     else:
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+HTTP Transport
+Shared, connection-pooled HTTP session used by the DNA Center and ISE managers
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict
+
+
+class HTTPTransport:
+    """Keep-alive HTTP session with a bounded connection pool per host"""
+    
+    def __init__(self, pool_size: int = 10, max_hosts: int = 4):
+        """
+        Initialize the transport
+        
+        Args:
+            pool_size: Maximum open connections kept per host; match this to
+                the number of concurrent workers using the transport
+            max_hosts: Number of per-host pools to keep (DNA Center, ISE, ...)
+        """
+        self.pool_size = max(1, pool_size)
+        self.session = requests.Session()
+        
+        # pool_block makes workers wait for a free connection instead of
+        # opening throwaway ones beyond pool_size
+        self.adapter = HTTPAdapter(
+            pool_connections=max_hosts,
+            pool_maxsize=self.pool_size,
+            pool_block=True
+        )
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+    
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request over the pooled session
+        
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            **kwargs: Passed through to requests.Session.request
+        
+        Returns:
+            requests.Response
+        """
+        return self.session.request(method, url, **kwargs)
+    
+    def connection_stats(self) -> Dict[str, int]:
+        """
+        Count requests served on reused connections vs. new TCP/TLS handshakes
+        
+        Returns:
+            Dict with requests, new_connections and reused_connections
+        """
+        pools = self.adapter.poolmanager.pools
+        total_requests = 0
+        new_connections = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            total_requests += pool.num_requests
+            new_connections += pool.num_connections
+        
+        return {
+            "requests": total_requests,
+            "new_connections": new_connections,
+            "reused_connections": max(0, total_requests - new_connections)
+        }
+    
+    def print_stats(self):
+        """Print connection reuse statistics"""
+        stats = self.connection_stats()
+        print(f"HTTP: {stats['requests']} requests, "
+              f"{stats['new_connections']} new connections, "
+              f"{stats['reused_connections']} reused (pool size {self.pool_size})")
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
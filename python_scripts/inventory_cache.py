@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Inventory Cache
+On-disk cache of DNA Center inventory with per-resource TTLs and an in-memory device index
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sda-automation")
+
+# Seconds a cached resource is considered current
+DEFAULT_TTLS = {
+    "devices": 900,
+    "fabric_sites": 3600
+}
+
+# Device attributes the in-memory index is keyed on
+DEVICE_INDEX_FIELDS = ("managementIpAddress", "hostname", "serialNumber")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    resource TEXT NOT NULL,
+    key TEXT NOT NULL,
+    updated TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (resource, key)
+);
+CREATE TABLE IF NOT EXISTS refreshes (
+    resource TEXT PRIMARY KEY,
+    refreshed_at REAL NOT NULL
+);
+"""
+
+
+class InventoryCache:
+    """SQLite-backed inventory cache, one database file per DNA Center host"""
+    
+    def __init__(self, host: str, cache_dir: str = DEFAULT_CACHE_DIR,
+                 ttls: Optional[Dict[str, int]] = None):
+        """
+        Initialize the cache
+        
+        Args:
+            host: DNA Center IP or hostname the cached data belongs to
+            cache_dir: Directory holding the cache databases
+            ttls: Per-resource TTL overrides in seconds
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        safe_host = re.sub(r"[^A-Za-z0-9._-]", "_", host)
+        self.path = os.path.join(cache_dir, f"dnac-{safe_host}.sqlite")
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self._index = None
+        self._lock = threading.Lock()
+        
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection; SQLite connections are not shared between threads"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def is_fresh(self, resource: str) -> bool:
+        """
+        Check whether a resource was refreshed within its TTL
+        
+        Args:
+            resource: Resource name, e.g. "devices"
+        
+        Returns:
+            bool: True if the cached copy can be used
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT refreshed_at FROM refreshes WHERE resource = ?", (resource,)
+            ).fetchone()
+        if row is None:
+            return False
+        return time.time() - row[0] < self.ttls.get(resource, 0)
+    
+    def get(self, resource: str) -> List[Dict]:
+        """Return all cached items of a resource"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT data FROM items WHERE resource = ? ORDER BY key", (resource,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+    
+    def sync(self, resource: str, items: Iterable[Dict], key_field: str,
+             updated_field: Optional[str] = None) -> Dict[str, int]:
+        """
+        Incrementally refresh a resource from a stream of items
+        
+        Rows whose last-updated value matches the cached one are left
+        untouched; only new and changed items are written, and items that
+        no longer exist are removed. Everything happens in one transaction:
+        if the stream raises, nothing is written and the cache keeps its
+        previous contents and refresh time.
+        
+        Args:
+            resource: Resource name, e.g. "devices"
+            items: Items as returned by the API, may be a generator
+            key_field: Attribute uniquely identifying an item
+            updated_field: Attribute holding the item's last-updated timestamp
+        
+        Returns:
+            Counts of added, updated, unchanged and removed items
+        
+        Raises:
+            Whatever the item stream raises, after rolling back
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        
+        with self._lock, self._connect() as conn:
+            known = dict(conn.execute(
+                "SELECT key, updated FROM items WHERE resource = ?", (resource,)
+            ).fetchall())
+            seen = set()
+            writes = []
+            
+            for item in items:
+                key = str(item.get(key_field))
+                seen.add(key)
+                updated = str(item.get(updated_field)) if updated_field else None
+                
+                if key in known and updated is not None and known[key] == updated:
+                    counts["unchanged"] += 1
+                    continue
+                counts["updated" if key in known else "added"] += 1
+                writes.append((resource, key, updated, json.dumps(item)))
+                
+                if len(writes) >= 500:
+                    self._write(conn, writes)
+                    writes = []
+            self._write(conn, writes)
+            
+            # Only reached once the whole stream was read: a partial stream
+            # must neither delete the items it did not get to nor look fresh
+            removed = [(resource, key) for key in known if key not in seen]
+            conn.executemany("DELETE FROM items WHERE resource = ? AND key = ?", removed)
+            counts["removed"] = len(removed)
+            
+            conn.execute(
+                "INSERT OR REPLACE INTO refreshes (resource, refreshed_at) VALUES (?, ?)",
+                (resource, time.time())
+            )
+            self._index = None
+        
+        return counts
+    
+    def _write(self, conn: sqlite3.Connection, rows: List[tuple]):
+        """Upsert a batch of item rows"""
+        conn.executemany(
+            "INSERT OR REPLACE INTO items (resource, key, updated, data) VALUES (?, ?, ?, ?)",
+            rows
+        )
+    
+    def invalidate(self, resource: Optional[str] = None):
+        """
+        Mark a resource (or every resource) as stale
+        
+        Args:
+            resource: Resource name; all resources when omitted
+        """
+        with self._lock, self._connect() as conn:
+            if resource:
+                conn.execute("DELETE FROM refreshes WHERE resource = ?", (resource,))
+            else:
+                conn.execute("DELETE FROM refreshes")
+            self._index = None
+    
+    def find_device(self, value: str) -> Optional[Dict]:
+        """
+        Look up a cached device by management IP, hostname or serial number
+        
+        Args:
+            value: Management IP, hostname or serial number
+        
+        Returns:
+            Device dictionary or None
+        """
+        with self._lock:
+            if self._index is None:
+                index = {}
+                for device in self.get("devices"):
+                    for field in DEVICE_INDEX_FIELDS:
+                        if device.get(field):
+                            index.setdefault(device[field], device)
+                self._index = index
+            return self._index.get(value)
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+IP Planner
+Carves non-overlapping virtual network pools and loopback addresses from
+supernets and writes them into the fabric configuration and Ansible files
+"""
+
+import argparse
+import ipaddress
+import json
+import re
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Addresses a pool needs beyond its hosts: network, broadcast and gateway
+RESERVED_ADDRESSES = 3
+
+# Smallest pool handed out (/30)
+MIN_POOL_BITS = 2
+
+# Hosts of the first subnet of each pool, as in group_vars/all.yml
+DEFAULT_SUBNET_HOSTS = 253
+
+
+def pool_bits(hosts: Sequence[int]) -> List[int]:
+    """
+    Host bits of the smallest pool that fits each host count
+    
+    Args:
+        hosts: Hosts to fit per pool
+    
+    Returns:
+        Host bits (32 - prefix length) per pool
+    """
+    if np is not None:
+        needed = np.asarray(hosts, dtype=np.int64) + (RESERVED_ADDRESSES - 1)
+        # frexp's exponent is the bit length of a positive integer
+        return np.maximum(np.frexp(needed.astype(np.float64))[1], MIN_POOL_BITS).tolist()
+    return [max((host + RESERVED_ADDRESSES - 1).bit_length(), MIN_POOL_BITS) for host in hosts]
+
+
+def carve(supernet: ipaddress.IPv4Network, groups: Sequence[int], bits: Sequence[int]) -> List[int]:
+    """
+    Allocate aligned, non-overlapping blocks grouped into contiguous per-group ranges
+    
+    Blocks are placed largest first within each group and groups largest
+    first within the supernet. With power-of-two sizes taken in decreasing
+    order every running offset is a multiple of the next size, so the
+    allocation is a pair of prefix sums with no fragmentation.
+    
+    Args:
+        supernet: Network to carve from
+        groups: Group index (e.g. site) per block, numbered from 0
+        bits: Host bits per block
+    
+    Returns:
+        Network address per block, as integers, in input order
+    
+    Raises:
+        ValueError: If the blocks do not fit in the supernet
+    """
+    if not len(bits):
+        return []
+    base = int(supernet.network_address)
+    capacity = supernet.num_addresses
+    if np is not None:
+        return _carve_numpy(base, capacity, np.asarray(groups, dtype=np.int64),
+                            np.asarray(bits, dtype=np.int64))
+    return _carve_python(base, capacity, list(groups), list(bits))
+
+
+def _carve_numpy(base: int, capacity: int, groups, bits) -> List[int]:
+    """carve() on integer arrays"""
+    sizes = np.left_shift(np.int64(1), bits)
+    order = np.lexsort((-sizes, groups))
+    sorted_sizes = sizes[order]
+    sorted_groups = groups[order]
+    
+    # Offsets within each group: exclusive prefix sum restarted per group
+    offsets = np.cumsum(sorted_sizes) - sorted_sizes
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    counts = np.diff(np.r_[starts, len(order)])
+    offsets -= np.repeat(offsets[starts], counts)
+    
+    # Each group takes the power-of-two block covering its pools
+    totals = np.add.reduceat(sorted_sizes, starts)
+    group_sizes = np.left_shift(np.int64(1), np.frexp((totals - 1).astype(np.float64))[1])
+    group_order = np.argsort(-group_sizes, kind="stable")
+    group_offsets = np.empty_like(group_sizes)
+    group_offsets[group_order] = np.cumsum(group_sizes[group_order]) - group_sizes[group_order]
+    used = int(group_sizes.sum())
+    if used > capacity:
+        raise ValueError(f"{used} addresses requested, supernet holds {capacity}")
+    
+    group_index = np.repeat(np.arange(len(starts)), counts)
+    networks = np.empty_like(sizes)
+    networks[order] = base + group_offsets[group_index] + offsets
+    return networks.tolist()
+
+
+def _carve_python(base: int, capacity: int, groups: List[int], bits: List[int]) -> List[int]:
+    """carve() on lists, used when NumPy is not installed"""
+    order = sorted(range(len(bits)), key=lambda i: (groups[i], -bits[i]))
+    
+    offsets = {}
+    group_totals = {}
+    for i in order:
+        offsets[i] = group_totals.get(groups[i], 0)
+        group_totals[groups[i]] = offsets[i] + (1 << bits[i])
+    
+    group_sizes = {group: 1 << (total - 1).bit_length() for group, total in group_totals.items()}
+    group_offsets = {}
+    used = 0
+    for group in sorted(group_sizes, key=lambda g: -group_sizes[g]):
+        group_offsets[group] = used
+        used += group_sizes[group]
+    if used > capacity:
+        raise ValueError(f"{used} addresses requested, supernet holds {capacity}")
+    
+    return [base + group_offsets[groups[i]] + offsets[i] for i in range(len(bits))]
+
+
+def dotted(addresses: Sequence[int]) -> List[str]:
+    """Format integer IPv4 addresses as dotted quads"""
+    if np is not None and len(addresses):
+        octets = np.right_shift(np.asarray(addresses, dtype=np.int64)[:, None],
+                                np.array([24, 16, 8, 0])) & 255
+        return [f"{a}.{b}.{c}.{d}" for a, b, c, d in octets.tolist()]
+    return [str(ipaddress.IPv4Address(address)) for address in addresses]
+
+
+def plan_pools(supernet: str, sites: List[str], virtual_networks: List[Dict]) -> Dict[str, List[Dict]]:
+    """
+    Plan an IP pool, first subnet and gateway for every virtual network at every site
+    
+    Args:
+        supernet: CIDR the pools are carved from
+        sites: Site hierarchies
+        virtual_networks: Dicts with "name", "hosts" and optional "subnet_hosts"
+    
+    Returns:
+        Per site hierarchy, the virtual networks with ip_pool, gateway and subnet
+    """
+    network = ipaddress.IPv4Network(supernet)
+    vn_bits = pool_bits([vn["hosts"] for vn in virtual_networks])
+    subnet_bits = pool_bits([vn.get("subnet_hosts", DEFAULT_SUBNET_HOSTS) for vn in virtual_networks])
+    
+    count = len(virtual_networks)
+    groups = [site for site in range(len(sites)) for _ in range(count)]
+    networks = carve(network, groups, vn_bits * len(sites))
+    gateways = dotted([address + 1 for address in networks])
+    networks = dotted(networks)
+    
+    pool_lengths = [f"/{32 - bits}" for bits in vn_bits]
+    subnet_lengths = [f"/{32 - min(bits, pool)}" for bits, pool in zip(subnet_bits, vn_bits)]
+    plan = {}
+    for site_index, site in enumerate(sites):
+        offset = site_index * count
+        plan[site] = [
+            {
+                "name": vn["name"],
+                "ip_pool": networks[offset + i] + pool_lengths[i],
+                "gateway": gateways[offset + i],
+                "subnet": networks[offset + i] + subnet_lengths[i]
+            }
+            for i, vn in enumerate(virtual_networks)
+        ]
+    return plan
+
+
+def plan_loopbacks(supernet: str, devices: List[str]) -> Dict[str, str]:
+    """
+    Assign a Loopback0 /32 to each device, skipping the supernet's network address
+    
+    Args:
+        supernet: CIDR the loopbacks are taken from
+        devices: Device names
+    
+    Returns:
+        Loopback0 address per device name
+    """
+    network = ipaddress.IPv4Network(supernet)
+    if len(devices) > network.num_addresses - 2:
+        raise ValueError(f"{len(devices)} loopbacks do not fit in {network}")
+    first = int(network.network_address) + 1
+    if np is not None:
+        addresses = dotted(np.arange(first, first + len(devices), dtype=np.int64))
+    else:
+        addresses = dotted(range(first, first + len(devices)))
+    return dict(zip(devices, addresses))
+
+
+def fabric_sites(config: Dict) -> List[Dict]:
+    """Return the site objects of a single- or multi-site fabric configuration"""
+    if "fabric_sites" in config:
+        return config["fabric_sites"]
+    return [dict(config, site_hierarchy=config["fabric_site"]["site_hierarchy"])]
+
+
+def fabric_devices(config: Dict) -> List[str]:
+    """Return the fabric device names in configuration order, once each"""
+    names = []
+    for site in fabric_sites(config):
+        for role in ("control_plane_devices", "border_devices", "edge_devices"):
+            names += [device["name"] for device in site.get(role, [])]
+    return list(dict.fromkeys(names))
+
+
+def _merge_virtual_networks(existing: List[Dict], planned: List[Dict]) -> List[Dict]:
+    """Planned pools and gateways, keeping other attributes of existing entries"""
+    by_name = {vn["name"]: vn for vn in existing}
+    return [dict(by_name.get(vn["name"], {}), name=vn["name"], ip_pool=vn["ip_pool"],
+                 gateway=vn["gateway"])
+            for vn in planned]
+
+
+def apply_to_fabric_config(config: Dict, plan: Dict[str, List[Dict]]):
+    """Replace the virtual networks of each planned site in a fabric configuration"""
+    if "fabric_sites" not in config:
+        site = config["fabric_site"]["site_hierarchy"]
+        config["virtual_networks"] = _merge_virtual_networks(config.get("virtual_networks", []),
+                                                             plan[site])
+        return
+    for site in config["fabric_sites"]:
+        if site["site_hierarchy"] in plan:
+            existing = site.get("virtual_networks", config.get("virtual_networks", []))
+            site["virtual_networks"] = _merge_virtual_networks(existing,
+                                                               plan[site["site_hierarchy"]])
+
+
+def apply_to_group_vars(text: str, planned: List[Dict]) -> Tuple[str, List[str]]:
+    """
+    Rewrite ip_pool, gateway and subnet in the virtual_networks list of group_vars
+    
+    The file is edited line by line so comments and layout are kept.
+    
+    Args:
+        text: Contents of group_vars/all.yml
+        planned: Planned virtual networks of one site
+    
+    Returns:
+        (new text, names of planned virtual networks not found in the file)
+    """
+    values = {vn["name"]: vn for vn in planned}
+    found = set()
+    lines = text.splitlines(keepends=True)
+    in_section = False
+    current = None
+    for i, line in enumerate(lines):
+        if re.match(r"^\S", line):
+            in_section = line.startswith("virtual_networks:")
+            current = None
+            continue
+        if not in_section:
+            continue
+        item = re.match(r"^\s*-\s+name:\s*(\S+)", line)
+        if item:
+            current = values.get(item.group(1).strip("'\""))
+            if current:
+                found.add(current["name"])
+            continue
+        field = re.match(r"^(\s*)(ip_pool|gateway|subnet):(\s*)\S+(.*?)(\r?\n?)$", line)
+        if current and field:
+            indent, key, space, comment, newline = field.groups()
+            lines[i] = f"{indent}{key}:{space or ' '}{current[key]}{comment}{newline}"
+    return "".join(lines), [name for name in values if name not in found]
+
+
+def apply_to_inventory(text: str, loopbacks: Dict[str, str]) -> Tuple[str, List[str]]:
+    """
+    Rewrite the loopback0 variable of each planned host in a YAML inventory
+    
+    Args:
+        text: Contents of hosts.yml
+        loopbacks: Loopback0 address per host name
+    
+    Returns:
+        (new text, names of planned hosts without a loopback0 line)
+    """
+    found = set()
+    lines = text.splitlines(keepends=True)
+    keys = []
+    for i, line in enumerate(lines):
+        key = re.match(r"^(\s*)([\w.-]+):\s*(.*?)(\r?\n?)$", line)
+        if not key:
+            continue
+        indent = len(key.group(1))
+        while keys and keys[-1][0] >= indent:
+            keys.pop()
+        host = keys[-1][1] if keys else None
+        if key.group(2) == "loopback0" and host in loopbacks:
+            lines[i] = f"{key.group(1)}loopback0: {loopbacks[host]}{key.group(4)}"
+            found.add(host)
+        keys.append((indent, key.group(2)))
+    return "".join(lines), [name for name in loopbacks if name not in found]
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Plan virtual network pools and loopback addresses")
+    parser.add_argument("--plan", required=True, help="Path to the IP plan JSON file")
+    parser.add_argument("--fabric-config", default="config/fabric-config.json",
+                        help="Fabric configuration to plan for (default: config/fabric-config.json)")
+    parser.add_argument("--group-vars", default="ansible/group_vars/all.yml",
+                        help="Ansible variables file (default: ansible/group_vars/all.yml)")
+    parser.add_argument("--inventory", default="ansible/inventory/hosts.yml",
+                        help="Ansible inventory (default: ansible/inventory/hosts.yml)")
+    parser.add_argument("--write", action="store_true",
+                        help="Update the configuration files instead of printing the plan")
+    
+    args = parser.parse_args()
+    
+    with open(args.plan, 'r') as f:
+        spec = json.load(f)
+    with open(args.fabric_config, 'r') as f:
+        config = json.load(f)
+    
+    sites = spec.get("sites") or [site["site_hierarchy"] for site in fabric_sites(config)]
+    try:
+        pools = plan_pools(spec["pool_supernet"], sites, spec["virtual_networks"])
+        loopbacks = plan_loopbacks(spec["loopback_supernet"], fabric_devices(config))
+    except ValueError as e:
+        print(f"Planning failed: {e}")
+        return 1
+    
+    if not args.write:
+        print(json.dumps({"sites": pools, "loopbacks": loopbacks}, indent=2))
+        return 0
+    
+    apply_to_fabric_config(config, pools)
+    with open(args.fabric_config, 'w') as f:
+        json.dump(config, f, indent=2)
+        f.write("\n")
+    print(f"Updated virtual network pools in {args.fabric_config}")
+    
+    # group_vars holds one list of virtual networks, planned from the first site
+    for path, apply, values in ((args.group_vars, apply_to_group_vars, pools[sites[0]]),
+                                (args.inventory, apply_to_inventory, loopbacks)):
+        with open(path, 'r') as f:
+            text, missing = apply(f.read(), values)
+        with open(path, 'w') as f:
+            f.write(text)
+        print(f"Updated {path}")
+        for name in missing:
+            print(f"Warning: {name} is not in {path}; add it by hand")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
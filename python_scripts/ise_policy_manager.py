@@ -5,19 +5,73 @@ This script automates ISE configuration for SD-Access deployment
 """
 
 import json
+import math
+import threading
+import time
 import requests
 import argparse
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
 from urllib3.exceptions import InsecureRequestWarning
 
+from dag_scheduler import DAGScheduler
+from deploy_journal import DEFAULT_JOURNAL_DIR, DeployJournal
+from http_transport import HTTPTransport
+from rate_limiter import RateLimiter
+from request_metrics import RequestLog, RequestMetrics
+
 # Suppress SSL warnings
 requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
 
+# ERS bulk endpoints: request wrapper, resource media type and object key
+BULK_RESOURCES = {
+    "sgt": ("SGTBulkRequest", "vnd.com.cisco.ise.trustsec.sgt.1.0+xml", "Sgt"),
+    "sgacl": ("SgaclBulkRequest", "vnd.com.cisco.ise.trustsec.sgacl.1.0+xml", "Sgacl"),
+    "networkdevice": ("NetworkDeviceBulkRequest",
+                      "vnd.com.cisco.ise.network.networkdevice.1.1+xml", "NetworkDevice")
+}
+
+# Object counts from which bulk requests are used, and objects per request
+BULK_THRESHOLD = 50
+BULK_CHUNK_SIZE = 500
+
+# Bulk status polling: start fast, back off geometrically up to the ceiling
+BULK_POLL_INITIAL_INTERVAL = 1.0
+BULK_POLL_MAX_INTERVAL = 10.0
+BULK_POLL_BACKOFF = 1.5
+BULK_TIMEOUT = 1800
+
+# Top-level key wrapping each ERS object type
+ERS_OBJECT_KEYS = {
+    "sgt": "Sgt",
+    "sgacl": "Sgacl",
+    "networkdevice": "NetworkDevice",
+    "authorizationprofile": "AuthorizationProfile",
+    "egressmatrixcell": "EgressMatrixCell"
+}
+
+# Egress matrix rules that set the cell's default rule instead of SGACLs
+EGRESS_DEFAULT_RULES = ("PERMIT_IP", "DENY_IP")
+
+# Largest page ERS search endpoints return
+ERS_PAGE_SIZE = 100
+
+# Resources kept in the in-memory name -> id index
+INDEXED_RESOURCES = ("sgt", "networkdevice", "sgacl", "authorizationprofile")
+
+
+class ISEQueryError(RuntimeError):
+    """An ISE read whose result other operations rely on failed"""
+
 
 class ISEPolicyManager:
     """Manages ISE configuration for SD-Access"""
     
-    def __init__(self, host: str, username: str, password: str, verify_ssl: bool = False):
+    def __init__(self, host: str, username: str, password: str, verify_ssl: bool = False,
+                 transport: Optional[HTTPTransport] = None,
+                 rate_limiter: Optional[RateLimiter] = None, max_workers: int = 8,
+                 metrics: Optional[RequestMetrics] = None):
         """
         Initialize ISE connection
         
@@ -26,20 +80,32 @@ class ISEPolicyManager:
             username: ISE username
             password: ISE password
             verify_ssl: Whether to verify SSL certificates
+            transport: Shared HTTP transport; a private pool is created when omitted
+            rate_limiter: Shared rate limiter; a default one is created when omitted
+            max_workers: Maximum number of concurrent API operations
+            metrics: Shared request metrics; a private one is created when omitted
         """
         self.host = host
         self.username = username
         self.password = password
         self.verify_ssl = verify_ssl
         self.base_url = f"https://{host}"
-        self.session = requests.Session()
-        self.session.auth = (username, password)
-        self.session.headers.update({
+        self.max_workers = max(1, max_workers)
+        self.transport = transport or HTTPTransport(pool_size=self.max_workers)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.metrics = metrics or RequestMetrics()
+        self.journal = None
+        self._index = {}
+        self._sgt_tags = None
+        self._index_lock = threading.Lock()
+        self.headers = {
             "Content-Type": "application/json",
             "Accept": "application/json"
-        })
+        }
         
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Optional[Dict]:
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                      params: Optional[Dict] = None,
+                      headers: Optional[Dict] = None) -> Optional[Dict]:
         """
         Make API request to ISE
         
@@ -47,25 +113,49 @@ class ISEPolicyManager:
             method: HTTP method
             endpoint: API endpoint
             data: Request payload
+            params: Query string parameters
+            headers: Extra request headers
             
         Returns:
-            Response JSON or None on error
+            Response JSON (with the response ETag under "etag" when one is
+            sent) or None on error
         """
         url = f"{self.base_url}{endpoint}"
+        request_headers = dict(self.headers, **(headers or {}))
         
         try:
-            response = self.session.request(
-                method,
-                url,
-                json=data,
-                verify=self.verify_ssl,
-                timeout=30
-            )
+            attempt = 0
+            while True:
+                self.rate_limiter.acquire(endpoint)
+                with self.metrics.timer(method, endpoint) as timer:
+                    response = self.transport.request(
+                        method,
+                        url,
+                        auth=(self.username, self.password),
+                        headers=request_headers,
+                        json=data,
+                        params=params,
+                        verify=self.verify_ssl,
+                        timeout=30
+                    )
+                    timer.response(response.status_code, len(response.content))
+                if not self.rate_limiter.wait_before_retry(method, endpoint, response, attempt):
+                    break
+                attempt += 1
+            
             response.raise_for_status()
             
             if response.text:
-                return response.json()
-            return {"status": "success"}
+                result = response.json()
+                if isinstance(result, dict) and response.headers.get("ETag"):
+                    result["etag"] = response.headers["ETag"]
+                return result
+            
+            # Bulk submissions answer 202 with the status URL in Location
+            result = {"status": "success"}
+            if response.headers.get("Location"):
+                result["location"] = response.headers["Location"]
+            return result
             
         except requests.exceptions.RequestException as e:
             print(f"Request failed: {e}")
@@ -86,30 +176,243 @@ class ISEPolicyManager:
             bool: True if successful
         """
         endpoint = "/ers/config/sgt"
-        data = {
-            "Sgt": {
-                "name": name,
-                "value": tag,
-                "description": description,
-                "generationId": "0"
-            }
-        }
+        data = {"Sgt": self._sgt_payload(name, tag, description)}
         
         result = self._make_request("POST", endpoint, data)
         
         if result:
+            if result.get("location"):
+                self._remember_sgt(name, tag, result["location"].rstrip("/").rsplit("/", 1)[-1])
+            else:
+                self.invalidate_sgt_cache()
             print(f"Security group created: {name} (SGT {tag})")
             return True
         return False
     
+    @staticmethod
+    def _sgt_payload(name: str, tag: int, description: str = "") -> Dict:
+        """Build the ERS representation of a security group"""
+        return {
+            "name": name,
+            "value": tag,
+            "description": description,
+            "generationId": "0"
+        }
+    
     def get_security_groups(self) -> List[Dict]:
         """Get all security groups"""
-        endpoint = "/ers/config/sgt"
-        result = self._make_request("GET", endpoint)
+        return list(self.iter_resources("sgt"))
+    
+    def iter_resources(self, resource: str, page_size: int = ERS_PAGE_SIZE,
+                       filters: Optional[List[str]] = None) -> Iterator[Dict]:
+        """
+        Stream the search results of an ERS resource
+        
+        The first page reports the total, after which the remaining pages are
+        fetched in parallel and yielded in order. Responses without a total
+        are paged by following their nextPage links.
+        
+        Args:
+            resource: ERS resource name, e.g. "sgt" or "networkdevice"
+            page_size: Results per page (ERS caps this at 100)
+            filters: ERS filter expressions, e.g. ["name.STARTSW.core"]
+        
+        Yields:
+            Search result entries with id, name and description
+        
+        Raises:
+            ISEQueryError: If a page cannot be retrieved, so a failed request
+                is never mistaken for the end of the results
+        """
+        endpoint = f"/ers/config/{resource}"
+        page_size = max(1, min(page_size, ERS_PAGE_SIZE))
+        
+        def search_result(result: Optional[Dict], page: str) -> Dict:
+            if not result or not isinstance(result.get("SearchResult"), dict):
+                raise ISEQueryError(f"Failed to retrieve {resource} search page {page}")
+            return result["SearchResult"]
+        
+        def fetch_page(page: int) -> Dict:
+            params = {"size": page_size, "page": page}
+            if filters:
+                params["filter"] = filters
+            return search_result(self._make_request("GET", endpoint, params=params), str(page))
+        
+        search = fetch_page(1)
+        yield from search.get("resources", [])
+        
+        total = search.get("total")
+        if total is not None:
+            pages = math.ceil(total / page_size)
+            if pages > 1:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, pages - 1)) as executor:
+                    for search in executor.map(fetch_page, range(2, pages + 1)):
+                        yield from search.get("resources", [])
+            return
+        
+        while search.get("nextPage"):
+            link = urlsplit(search["nextPage"]["href"])
+            result = self._make_request("GET", f"{link.path}?{link.query}")
+            search = search_result(result, link.query)
+            yield from search.get("resources", [])
+    
+    def get_resource(self, resource: str, resource_id: str) -> Optional[Dict]:
+        """
+        Get the full representation of one ERS object
+        
+        Args:
+            resource: ERS resource name
+            resource_id: Object ID
+        
+        Returns:
+            The object's attributes, or None on error
+        """
+        return self._get_resource_versioned(resource, resource_id)[0]
+    
+    def _get_resource_versioned(self, resource: str,
+                                resource_id: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """Get one ERS object together with its ETag"""
+        result = self._make_request("GET", f"/ers/config/{resource}/{resource_id}")
+        if not result:
+            return None, None
+        etag = result.pop("etag", None)
+        return next(iter(result.values()), None), etag
+    
+    def build_index(self, resources: Tuple[str, ...] = INDEXED_RESOURCES, refresh: bool = False):
+        """
+        Load the name -> id index for ERS resources
+        
+        Args:
+            resources: ERS resource names to index
+            refresh: Reload resources that are already indexed
+        
+        Raises:
+            ISEQueryError: If any sweep failed; nothing is published then, so
+                a partial index is never mistaken for the live configuration
+        """
+        missing = [r for r in resources if refresh or r not in self._index]
+        if not missing:
+            return
+        
+        # One paged sweep per resource, the sweeps running side by side
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            sweeps = list(executor.map(lambda r: list(self.iter_resources(r)), missing))
+        with self._index_lock:
+            for resource, items in zip(missing, sweeps):
+                self._index[resource] = {item["name"]: item["id"] for item in items}
+                if resource == "sgt":
+                    self._sgt_tags = None
+    
+    def _loaded_index(self, resource: str) -> Dict[str, str]:
+        """
+        Return the name -> id index of a resource, loading it if needed
+        
+        Published index dicts are never modified in place (see
+        _remember_sgt), so callers can read the returned reference without
+        holding the lock while other threads invalidate or extend the index.
+        
+        Raises:
+            ISEQueryError: If the index had to be loaded and that failed
+        """
+        while True:
+            with self._index_lock:
+                index = self._index.get(resource)
+            if index is not None:
+                return index
+            self.build_index((resource,))
+    
+    def get_resource_id(self, resource: str, name: str) -> Optional[str]:
+        """
+        Look up an ERS object ID by name through the index
+        
+        Args:
+            resource: ERS resource name
+            name: Object name
+        
+        Returns:
+            Object ID or None
+        
+        Raises:
+            ISEQueryError: If the index could not be loaded
+        """
+        return self._loaded_index(resource).get(name)
+    
+    def get_sgt_id_by_tag(self, tag: int) -> Optional[str]:
+        """
+        Look up a security group ID by its tag value
+        
+        Search results do not carry tag values, so the first lookup reads
+        every SGT once (in parallel) and keeps the tag -> id mapping.
+        
+        Args:
+            tag: SGT value
+        
+        Returns:
+            Security group ID or None
         
-        if result and "SearchResult" in result:
-            return result["SearchResult"].get("resources", [])
-        return []
+        Raises:
+            ISEQueryError: If the SGT index or any SGT could not be read
+        """
+        index = self._loaded_index("sgt")
+        with self._index_lock:
+            tags = self._sgt_tags
+        if tags is None:
+            ids = list(index.values())
+            details = self._run_concurrently(self.get_resource, [("sgt", sgt_id) for sgt_id in ids])
+            failed = details.count(None)
+            if failed:
+                raise ISEQueryError(f"Failed to read {failed} security groups for their tags")
+            tags = {
+                int(detail["value"]): sgt_id
+                for sgt_id, detail in zip(ids, details)
+                if detail and detail.get("value") is not None
+            }
+            with self._index_lock:
+                # Only publish tags read from the index that is still current
+                if self._index.get("sgt") is index:
+                    self._sgt_tags = tags
+        return tags.get(int(tag))
+    
+    def resolve_sgt(self, value: Union[str, int]) -> Optional[str]:
+        """
+        Resolve a security group given by name, tag value or ID to its ID
+        
+        Lookups are served from the SGT index, which is loaded once and
+        kept current by create_security_group, so resolving every cell of
+        a matrix costs no extra requests.
+        
+        Args:
+            value: SGT name, tag value or ERS ID
+        
+        Returns:
+            Security group ID or None
+        
+        Raises:
+            ISEQueryError: If the SGT lookups could not be loaded
+        """
+        if isinstance(value, int) or str(value).isdigit():
+            return self.get_sgt_id_by_tag(int(value))
+        
+        index = self._loaded_index("sgt")
+        sgt_id = index.get(value)
+        if sgt_id is None and value in index.values():
+            sgt_id = value
+        return sgt_id
+    
+    def _remember_sgt(self, name: str, tag: int, sgt_id: str):
+        """Add a newly created security group to the loaded lookups"""
+        # Copy on write: readers may be iterating the current dicts unlocked
+        with self._index_lock:
+            if "sgt" in self._index:
+                self._index["sgt"] = {**self._index["sgt"], name: sgt_id}
+            if self._sgt_tags is not None:
+                self._sgt_tags = {**self._sgt_tags, int(tag): sgt_id}
+    
+    def invalidate_sgt_cache(self):
+        """Drop the SGT name and tag lookups so the next resolution reloads them"""
+        with self._index_lock:
+            self._index.pop("sgt", None)
+            self._sgt_tags = None
     
     def create_sgacl(self, name: str, description: str, acl_content: str) -> bool:
         """
@@ -124,14 +427,7 @@ class ISEPolicyManager:
             bool: True if successful
         """
         endpoint = "/ers/config/sgacl"
-        data = {
-            "Sgacl": {
-                "name": name,
-                "description": description,
-                "aclcontent": acl_content,
-                "generationId": "0"
-            }
-        }
+        data = {"Sgacl": self._sgacl_payload(name, description, acl_content)}
         
         result = self._make_request("POST", endpoint, data)
         
@@ -140,29 +436,45 @@ class ISEPolicyManager:
             return True
         return False
     
-    def create_egress_policy(self, name: str, source_sgt: str, dest_sgt: str, 
-                            sgacl_name: str) -> bool:
+    @staticmethod
+    def _sgacl_payload(name: str, description: str, acl_content: str) -> Dict:
+        """Build the ERS representation of a security group ACL"""
+        return {
+            "name": name,
+            "description": description,
+            "aclcontent": acl_content,
+            "generationId": "0"
+        }
+    
+    def create_egress_policy(self, name: str, source_sgt: Union[str, int],
+                             dest_sgt: Union[str, int], sgacl_name: str) -> bool:
         """
         Create TrustSec egress policy
         
         Args:
             name: Policy name
-            source_sgt: Source SGT name
-            dest_sgt: Destination SGT name
+            source_sgt: Source SGT name, tag value or ID
+            dest_sgt: Destination SGT name, tag value or ID
             sgacl_name: SGACL to apply
             
         Returns:
             bool: True if successful
         """
+        source_id = self.resolve_sgt(source_sgt)
+        dest_id = self.resolve_sgt(dest_sgt)
+        if source_id is None or dest_id is None:
+            print(f"Unknown security group: {source_sgt if source_id is None else dest_sgt}")
+            return False
+        
         endpoint = "/ers/config/egressmatrixcell"
         data = {
             "EgressMatrixCell": {
                 "name": name,
-                "sourceSgtId": source_sgt,
-                "destinationSgtId": dest_sgt,
+                "sourceSgtId": source_id,
+                "destinationSgtId": dest_id,
                 "matrixCellStatus": "ENABLED",
                 "defaultRule": "NONE",
-                "sgacls": [sgacl_name]
+                "sgacls": [self.get_resource_id("sgacl", sgacl_name) or sgacl_name]
             }
         }
         
@@ -173,6 +485,163 @@ class ISEPolicyManager:
             return True
         return False
     
+    @staticmethod
+    def expand_egress_matrix(spec: Dict, groups: List[str]) -> Dict[Tuple[str, str], object]:
+        """
+        Expand a compact egress matrix spec into one rule per cell
+        
+        The spec has a "default" rule, "rows" mapping a source SGT (or "*"
+        for every source) to {destination SGT or "*": rule}, and a list of
+        "overrides" with source, destination and rule. A rule is an SGACL
+        name, a list of SGACL names, or PERMIT_IP / DENY_IP. For each cell
+        the most specific entry wins: override, source row with that
+        destination, "*" row with that destination, source row "*", "*"
+        row "*", and finally the default. Without a default, cells that no
+        entry covers are left unmanaged.
+        
+        Args:
+            spec: Compact matrix specification
+            groups: SGT names spanning both matrix axes
+        
+        Returns:
+            Mapping of (source, destination) to rule
+        """
+        rows = spec.get("rows", {})
+        wildcard = rows.get("*", {})
+        fill = wildcard.get("*", spec.get("default"))
+        columns = {dst: rule for dst, rule in wildcard.items() if dst != "*"}
+        
+        unknown = ({src for src in rows if src != "*"}
+                   | {dst for row in rows.values() for dst in row if dst != "*"}) - set(groups)
+        if unknown:
+            print(f"Egress matrix: ignoring unknown SGTs {', '.join(sorted(unknown))}")
+        
+        cells = {}
+        for src in groups:
+            row = rows.get(src, {})
+            row_fill = row.get("*", fill)
+            specific = {dst: rule for dst, rule in row.items() if dst != "*"}
+            for dst in groups:
+                rule = specific.get(dst, columns.get(dst, row_fill))
+                if rule is not None:
+                    cells[(src, dst)] = rule
+        
+        for override in spec.get("overrides", []):
+            key = (override["source"], override["destination"])
+            if key[0] in groups and key[1] in groups:
+                cells[key] = override["rule"]
+        return cells
+    
+    @staticmethod
+    def _egress_cell_payload(source: str, dest: str, source_id: str, dest_id: str,
+                             rule, sgacl_ids: Dict[str, str]) -> Dict:
+        """Build the ERS representation of an egress matrix cell"""
+        if rule in EGRESS_DEFAULT_RULES:
+            default_rule, sgacls = rule, []
+        else:
+            names = [rule] if isinstance(rule, str) else list(rule)
+            default_rule, sgacls = "NONE", [sgacl_ids[name] for name in names]
+        return {
+            "name": f"{source}-{dest}",
+            "sourceSgtId": source_id,
+            "destinationSgtId": dest_id,
+            "matrixCellStatus": "ENABLED",
+            "defaultRule": default_rule,
+            "sgacls": sgacls
+        }
+    
+    def _create_egress_cell(self, payload: Dict) -> bool:
+        """Create one egress matrix cell from its ERS representation"""
+        result = self._make_request("POST", "/ers/config/egressmatrixcell",
+                                    {"EgressMatrixCell": payload})
+        
+        if result:
+            print(f"Egress matrix cell created: {payload['name']}")
+            return True
+        return False
+    
+    def get_egress_matrix(self) -> Dict[Tuple[str, str], Tuple[Dict, Optional[str]]]:
+        """
+        Read every configured egress matrix cell
+        
+        Search results only carry cell names, so the paged sweep is
+        followed by parallel reads of the cells.
+        
+        Returns:
+            Mapping of (source SGT ID, destination SGT ID) to (cell, ETag)
+        
+        Raises:
+            ISEQueryError: If the search or any cell read failed, since a
+                missing cell would be re-created as a duplicate
+        """
+        ids = [item["id"] for item in self.iter_resources("egressmatrixcell")]
+        details = self._run_concurrently(self._get_resource_versioned,
+                                         [("egressmatrixcell", cell_id) for cell_id in ids])
+        failed = [cell_id for cell_id, (cell, _) in zip(ids, details) if cell is None]
+        if failed:
+            raise ISEQueryError(f"Failed to read {len(failed)} egress matrix cells")
+        return {
+            (cell["sourceSgtId"], cell["destinationSgtId"]): (cell, etag)
+            for cell, etag in details
+        }
+    
+    def deploy_egress_matrix(self, spec: Dict, groups: Optional[List[str]] = None) -> bool:
+        """
+        Converge the TrustSec egress matrix to a compact spec
+        
+        The spec is expanded into cells and diffed against the live
+        matrix; only missing and changed cells are written, concurrently.
+        
+        Args:
+            spec: Compact matrix specification (see expand_egress_matrix)
+            groups: SGT names spanning the matrix; every SGT in ISE when omitted
+        
+        Returns:
+            bool: True if every written cell succeeded
+        
+        Raises:
+            ISEQueryError: If the SGTs, SGACLs or live matrix could not be
+                read; no cell is written then
+        """
+        self.build_index(("sgacl",), refresh=True)
+        sgt_ids = self._loaded_index("sgt")
+        sgacl_ids = self._loaded_index("sgacl")
+        groups = [name for name in (groups or list(sgt_ids)) if name in sgt_ids]
+        
+        cells = self.expand_egress_matrix(spec, groups)
+        live = self.get_egress_matrix()
+        
+        creates, updates, unchanged, invalid = [], [], 0, 0
+        for (src, dst), rule in cells.items():
+            try:
+                payload = self._egress_cell_payload(src, dst, sgt_ids[src], sgt_ids[dst],
+                                                    rule, sgacl_ids)
+            except KeyError as e:
+                print(f"Egress matrix cell {src} -> {dst}: unknown SGACL {e}")
+                invalid += 1
+                continue
+            
+            existing = live.get((sgt_ids[src], sgt_ids[dst]))
+            if existing is None:
+                creates.append((payload,))
+                continue
+            cell, etag = existing
+            changed = [field for field in self._changed_fields(payload, cell) if field != "name"]
+            if changed:
+                updates.append(("egressmatrixcell", cell["id"], dict(payload, name=cell["name"]),
+                                cell, etag))
+            else:
+                unchanged += 1
+        
+        print(f"Egress matrix: {len(cells)} cells, {len(creates)} to create, "
+              f"{len(updates)} to update, {unchanged} unchanged")
+        results = (self._run_concurrently(self._create_egress_cell, creates)
+                   + self._run_concurrently(self.update_resource, updates))
+        failed = results.count(False)
+        if failed:
+            print(f"Egress matrix: {failed} cell writes failed")
+        return not failed and not invalid
+    
     def add_network_device(self, name: str, ip_address: str, radius_key: str,
                           device_type: str = "Cisco") -> bool:
         """
@@ -188,25 +657,7 @@ class ISEPolicyManager:
             bool: True if successful
         """
         endpoint = "/ers/config/networkdevice"
-        data = {
-            "NetworkDevice": {
-                "name": name,
-                "NetworkDeviceIPList": [{
-                    "ipaddress": ip_address,
-                    "mask": 32
-                }],
-                "NetworkDeviceGroupList": [
-                    f"Device Type#All Device Types#{device_type}",
-                    "Location#All Locations",
-                    "IPSEC#Is IPSEC Device#No"
-                ],
-                "authenticationSettings": {
-                    "networkProtocol": "RADIUS",
-                    "radiusSharedSecret": radius_key,
-                    "enableKeyWrap": False
-                }
-            }
-        }
+        data = {"NetworkDevice": self._network_device_payload(name, ip_address, radius_key, device_type)}
         
         result = self._make_request("POST", endpoint, data)
         
@@ -215,6 +666,28 @@ class ISEPolicyManager:
             return True
         return False
     
+    @staticmethod
+    def _network_device_payload(name: str, ip_address: str, radius_key: str,
+                                device_type: str = "Cisco") -> Dict:
+        """Build the ERS representation of a network access device"""
+        return {
+            "name": name,
+            "NetworkDeviceIPList": [{
+                "ipaddress": ip_address,
+                "mask": 32
+            }],
+            "NetworkDeviceGroupList": [
+                f"Device Type#All Device Types#{device_type}",
+                "Location#All Locations",
+                "IPSEC#Is IPSEC Device#No"
+            ],
+            "authenticationSettings": {
+                "networkProtocol": "RADIUS",
+                "radiusSharedSecret": radius_key,
+                "enableKeyWrap": False
+            }
+        }
+    
     def create_authorization_profile(self, name: str, vlan: int, 
                                     sgt: int, description: str = "") -> bool:
         """
@@ -230,30 +703,7 @@ class ISEPolicyManager:
             bool: True if successful
         """
         endpoint = "/ers/config/authorizationprofile"
-        data = {
-            "AuthorizationProfile": {
-                "name": name,
-                "description": description,
-                "accessType": "ACCESS_ACCEPT",
-                "vlan": {
-                    "nameID": str(vlan),
-                    "tagID": vlan
-                },
-                "advancedAttributes": [
-                    {
-                        "leftHandSideDictionaryAttribue": {
-                            "AdvancedAttributeValueType": "AttributeReference",
-                            "dictionaryName": "Cisco",
-                            "attributeName": "cisco-av-pair"
-                        },
-                        "rightHandSideAttribueValue": {
-                            "AdvancedAttributeValueType": "StaticValue",
-                            "value": f"cts:security-group-tag={sgt}"
-                        }
-                    }
-                ]
-            }
-        }
+        data = {"AuthorizationProfile": self._authorization_profile_payload(name, vlan, sgt, description)}
         
         result = self._make_request("POST", endpoint, data)
         
@@ -262,12 +712,467 @@ class ISEPolicyManager:
             return True
         return False
     
-    def deploy_full_config(self, config_file: str) -> bool:
+    @staticmethod
+    def _authorization_profile_payload(name: str, vlan: int, sgt: int,
+                                       description: str = "") -> Dict:
+        """Build the ERS representation of an authorization profile"""
+        return {
+            "name": name,
+            "description": description,
+            "accessType": "ACCESS_ACCEPT",
+            "vlan": {
+                "nameID": str(vlan),
+                "tagID": vlan
+            },
+            "advancedAttributes": [
+                {
+                    "leftHandSideDictionaryAttribue": {
+                        "AdvancedAttributeValueType": "AttributeReference",
+                        "dictionaryName": "Cisco",
+                        "attributeName": "cisco-av-pair"
+                    },
+                    "rightHandSideAttribueValue": {
+                        "AdvancedAttributeValueType": "StaticValue",
+                        "value": f"cts:security-group-tag={sgt}"
+                    }
+                }
+            ]
+        }
+    
+    def update_resource(self, resource: str, resource_id: str, payload: Dict,
+                        current: Dict, etag: Optional[str] = None) -> bool:
+        """
+        Replace an existing ERS object
+        
+        The current generationId is sent back and, when ISE supplied an
+        ETag, the update is made conditional on it, so a concurrent change
+        makes the PUT fail instead of being overwritten.
+        
+        Args:
+            resource: ERS resource name
+            resource_id: Object ID
+            payload: Desired object representation
+            current: Object as currently stored in ISE
+            etag: ETag returned when the object was read
+        
+        Returns:
+            bool: True if successful
+        """
+        data = dict(payload, id=resource_id)
+        if current.get("generationId") is not None:
+            data["generationId"] = current["generationId"]
+        headers = {"If-Match": etag} if etag else None
+        
+        result = self._make_request("PUT", f"/ers/config/{resource}/{resource_id}",
+                                    {ERS_OBJECT_KEYS[resource]: data}, headers=headers)
+        
+        if result:
+            if resource == "sgt":
+                self.invalidate_sgt_cache()
+            print(f"Updated {resource}: {payload['name']}")
+            return True
+        return False
+    
+    def _journaled(self, operation: str, func: Callable[..., bool], *args) -> bool:
+        """
+        Run a configuration operation unless the resume journal shows it completed
+        
+        Args:
+            operation: Unique operation key
+            func: Manager method performing the operation
+            *args: Arguments for func
+        
+        Returns:
+            bool: True if the operation is complete
+        """
+        if self.journal is not None and self.journal.is_done(operation):
+            print(f"Already completed: {operation}")
+            return True
+        
+        success = func(*args)
+        if success and self.journal is not None:
+            self.journal.record_done(operation)
+        return success
+    
+    def _run_concurrently(self, func: Callable[..., bool], calls: List[tuple]) -> List[bool]:
+        """
+        Run func once per argument tuple with at most max_workers in flight
+        
+        Args:
+            func: Manager method to call
+            calls: Positional argument tuples, one per call
+        
+        Returns:
+            List of results in the same order as calls
+        """
+        if not calls:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(calls))) as executor:
+            futures = [executor.submit(func, *args) for args in calls]
+            return [future.result() for future in futures]
+    
+    def _bulk_status(self, resource: str, bulk_id: str) -> Optional[Dict]:
+        """Return the BulkStatus of an ERS bulk request, or None if it cannot be read"""
+        result = self._make_request("GET", f"/ers/config/{resource}/bulk/{bulk_id}")
+        return (result or {}).get("BulkStatus")
+    
+    def _wait_for_bulk(self, resource: str, bulk_id: str) -> Optional[Dict]:
+        """
+        Poll an ERS bulk request until it finishes, backing off between polls
+        
+        Args:
+            resource: ERS resource name, e.g. "networkdevice"
+            bulk_id: Bulk request ID from the submission's Location header
+        
+        Returns:
+            BulkStatus dict, or None on timeout
+        """
+        start = time.monotonic()
+        interval = BULK_POLL_INITIAL_INTERVAL
+        
+        while True:
+            status = self._bulk_status(resource, bulk_id)
+            if status and status.get("executionStatus") not in (None, "IN_PROGRESS", "PENDING"):
+                return status
+            
+            elapsed = time.monotonic() - start
+            if elapsed >= BULK_TIMEOUT:
+                print(f"Timed out after {elapsed:.0f}s waiting for bulk {resource} request {bulk_id}")
+                return None
+            time.sleep(min(interval, BULK_TIMEOUT - elapsed))
+            interval = min(interval * BULK_POLL_BACKOFF, BULK_POLL_MAX_INTERVAL)
+    
+    def bulk_create(self, resource: str, payloads: List[Dict]) -> Optional[Dict[str, bool]]:
+        """
+        Create objects with a single ERS bulk request and wait for it to finish
+        
+        Args:
+            resource: ERS resource name ("sgt", "sgacl" or "networkdevice")
+            payloads: Object representations, each with a "name"
+        
+        Returns:
+            Mapping of object name to success, or None if ISE did not
+            accept the bulk request
+        """
+        bulk_id = self._submit_bulk(resource, payloads)
+        if bulk_id is None:
+            return None
+        return self._bulk_outcome(resource, self._wait_for_bulk(resource, bulk_id),
+                                  [payload["name"] for payload in payloads])
+    
+    def _submit_bulk(self, resource: str, payloads: List[Dict]) -> Optional[str]:
+        """Submit an ERS bulk create request and return its bulk ID"""
+        request_key, media_type, object_key = BULK_RESOURCES[resource]
+        data = {
+            request_key: {
+                "operationType": "create",
+                "resourceMediaType": media_type,
+                "resources": [{object_key: payload} for payload in payloads]
+            }
+        }
+        
+        result = self._make_request("PUT", f"/ers/config/{resource}/bulk/submit", data)
+        if not result or not result.get("location"):
+            return None
+        return result["location"].rstrip("/").rsplit("/", 1)[-1]
+    
+    def _bulk_outcome(self, resource: str, status: Optional[Dict],
+                      names: List[str]) -> Dict[str, bool]:
+        """Map the objects of a finished bulk request to their success"""
+        if resource == "sgt":
+            self.invalidate_sgt_cache()
+        if status is None:
+            return {name: False for name in names}
+        
+        outcome = {
+            item.get("name"): item.get("status") == "SUCCESS"
+            for item in status.get("resourcesStatus", [])
+        }
+        if not outcome:
+            success = not int(status.get("failCount", 0))
+            return {name: success for name in names}
+        return {name: outcome.get(name, False) for name in names}
+    
+    def _bulk_create_chunk(self, resource: str, entries: List[Tuple]) -> bool:
+        """
+        Create one chunk of objects in bulk, falling back to individual POSTs
+        
+        Args:
+            resource: ERS resource name
+            entries: (operation, create method, arguments, payload) tuples
+        
+        Returns:
+            bool: True if every object was created
+        """
+        payloads = [entry[3] for entry in entries]
+        bulk_id = self._submit_bulk(resource, payloads)
+        if bulk_id is None:
+            print(f"Bulk {resource} request not accepted, creating {len(entries)} objects individually")
+            return all(self._run_concurrently(self._journaled, [
+                (operation, func) + args for operation, func, args, _ in entries
+            ]))
+        
+        # A resumed run polls this bulk instead of submitting the objects again
+        if self.journal is not None:
+            for operation, _, _, _ in entries:
+                self.journal.record_submitted(operation, "bulk", bulk_id)
+        
+        outcome = self._bulk_outcome(resource, self._wait_for_bulk(resource, bulk_id),
+                                     [payload["name"] for payload in payloads])
+        self._journal_bulk_outcome(entries, outcome)
+        created = sum(1 for success in outcome.values() if success)
+        print(f"Bulk {resource}: {created} created, {len(outcome) - created} failed")
+        return created == len(outcome)
+    
+    def _journal_bulk_outcome(self, entries: List[Tuple], outcome: Dict[str, bool]):
+        """Record the operations whose objects a bulk request created as done"""
+        if self.journal is None:
+            return
+        for operation, _, _, payload in entries:
+            if outcome.get(payload["name"]):
+                self.journal.record_done(operation)
+    
+    def _resume_bulk(self, resource: str, entries: List[Tuple]) -> List[Tuple]:
+        """
+        Settle objects a previous run submitted in bulk requests it never saw finish
+        
+        Each such bulk request is polled to completion; objects it created
+        are journaled as done, the rest are returned to be submitted again.
+        A bulk request ISE no longer knows about counts as not run.
+        
+        Args:
+            resource: ERS resource name
+            entries: (operation, create method, arguments, payload) tuples
+        
+        Returns:
+            Entries that still need to be created
+        """
+        in_flight = {}
+        for entry in entries:
+            pending = self.journal.pending_task(entry[0])
+            if pending and pending[0] == "bulk":
+                in_flight.setdefault(pending[1], []).append(entry)
+        
+        for bulk_id, bulk_entries in in_flight.items():
+            if self._bulk_status(resource, bulk_id) is None:
+                print(f"Bulk {resource} request {bulk_id} not found, submitting its objects again")
+                continue
+            outcome = self._bulk_outcome(resource, self._wait_for_bulk(resource, bulk_id),
+                                         [entry[3]["name"] for entry in bulk_entries])
+            self._journal_bulk_outcome(bulk_entries, outcome)
+            created = sum(1 for success in outcome.values() if success)
+            print(f"In-flight bulk {resource} request {bulk_id} completed: {created} created, "
+                  f"{len(outcome) - created} to retry")
+        
+        return [entry for entry in entries if not self.journal.is_done(entry[0])]
+    
+    def _schedule_creates(self, scheduler: DAGScheduler, resource: str, entries: List[Tuple],
+                          after: List[str] = ()) -> Dict[str, str]:
+        """
+        Add the creation of one object type to a scheduler
+        
+        Large batches of a bulk-capable type become one task per bulk
+        chunk; everything else becomes one task per object.
+        
+        Args:
+            scheduler: Scheduler to add tasks to
+            resource: ERS resource name
+            entries: (operation, create method, arguments, payload) tuples
+            after: Tasks that must finish before these objects are created
+        
+        Returns:
+            Mapping of each scheduled operation to the task performing it
+        """
+        if self.journal is not None:
+            # Settle in-flight bulk requests first so their objects are not
+            # created a second time, in bulk or individually
+            pending = self._resume_bulk(resource, entries)
+            if len(pending) < len(entries):
+                print(f"Already completed: {len(entries) - len(pending)} {resource} objects")
+            entries = pending
+        
+        if resource in BULK_RESOURCES and len(entries) >= BULK_THRESHOLD:
+            tasks = {}
+            for index in range(0, len(entries), BULK_CHUNK_SIZE):
+                chunk = entries[index:index + BULK_CHUNK_SIZE]
+                name = scheduler.add(f"{resource}:bulk{index // BULK_CHUNK_SIZE + 1}",
+                                     self._bulk_create_chunk, resource, chunk, after=after)
+                tasks.update((entry[0], name) for entry in chunk)
+            return tasks
+        return {
+            operation: scheduler.add(operation, self._journaled, operation, func, *args, after=after)
+            for operation, func, args, _ in entries
+        }
+    
+    @staticmethod
+    def _changed_fields(desired: Dict, current: Dict) -> List[str]:
+        """
+        List the top-level fields of a payload that differ from the live object
+        
+        Only fields present in the payload are compared; nested dictionaries
+        are compared on the keys the payload sets, and scalars as strings
+        since ERS echoes some numbers back as text.
+        """
+        def matches(want, have) -> bool:
+            if isinstance(want, dict):
+                return isinstance(have, dict) and all(
+                    matches(value, have.get(key)) for key, value in want.items()
+                )
+            if isinstance(want, list):
+                have = [] if have is None else have
+                return (isinstance(have, list) and len(want) == len(have)
+                        and all(matches(w, h) for w, h in zip(want, have)))
+            return str(want) == str(have) if have is not None else want in (None, "")
+        
+        return [
+            key for key, value in desired.items()
+            if key not in ("id", "generationId") and not matches(value, current.get(key))
+        ]
+    
+    def _schedule_upserts(self, scheduler: DAGScheduler, resource: str, entries: List[Tuple],
+                          after: List[str] = ()) -> Tuple[Dict[str, str], Dict[str, int]]:
+        """
+        Add only the calls needed to converge one object type to a scheduler
+        
+        Objects missing from the name index are created as usual; existing
+        ones are read in parallel and updated only when a field differs.
+        Updates carry the generationId and ETag of the object just read.
+        
+        Args:
+            scheduler: Scheduler to add tasks to
+            resource: ERS resource name
+            entries: (operation, create method, arguments, payload) tuples
+            after: Tasks that must finish before these objects are written
+        
+        Returns:
+            Mapping of scheduled operations to tasks, and create/update/unchanged counts
+        
+        Raises:
+            ISEQueryError: If the index or any existing object could not be
+                read; nothing is scheduled, since a failed read must not turn
+                into a duplicate create or a blind update
+        """
+        index = self._loaded_index(resource)
+        existing = [entry for entry in entries if entry[3]["name"] in index]
+        missing = [entry for entry in entries if entry[3]["name"] not in index]
+        
+        ids = [index[entry[3]["name"]] for entry in existing]
+        details = self._run_concurrently(self._get_resource_versioned,
+                                         [(resource, resource_id) for resource_id in ids])
+        unread = [entry[3]["name"] for entry, (current, _) in zip(existing, details) if current is None]
+        if unread:
+            raise ISEQueryError(f"Failed to read {resource}: {', '.join(unread)}")
+        
+        tasks = self._schedule_creates(scheduler, resource, missing, after)
+        counts = {"create": len(missing), "update": 0, "unchanged": 0}
+        for (operation, _, _, payload), resource_id, (current, etag) in zip(existing, ids, details):
+            if not self._changed_fields(payload, current):
+                counts["unchanged"] += 1
+                continue
+            if self.journal is not None and self.journal.is_done(operation):
+                continue
+            counts["update"] += 1
+            tasks[operation] = scheduler.add(operation, self._journaled, operation,
+                                             self.update_resource, resource, resource_id,
+                                             payload, current, etag, after=after)
+        
+        print(f"{resource}: {counts['create']} to create, {counts['update']} to update, "
+              f"{counts['unchanged']} unchanged")
+        return tasks, counts
+    
+    def schedule_config(self, scheduler: DAGScheduler, config: Dict,
+                        upsert: bool = False) -> Dict[str, str]:
+        """
+        Add the operations of an ISE configuration to a scheduler
+        
+        Args:
+            scheduler: Scheduler to add tasks to, possibly shared with DNA Center
+            config: ISE configuration
+            upsert: Compare against the live configuration and only create or
+                update objects that are missing or differ
+        
+        Returns:
+            Mapping of operation (e.g. "networkdevice:core-switch-1") to the
+            task that performs it
+        
+        Raises:
+            ISEQueryError: If upsert could not read the live configuration
+        """
+        totals = {"create": 0, "update": 0, "unchanged": 0}
+        operations = {}
+        
+        def schedule(resource: str, entries: List[Tuple], after: List[str] = ()) -> List[str]:
+            if upsert:
+                tasks, counts = self._schedule_upserts(scheduler, resource, entries, after)
+                for key, value in counts.items():
+                    totals[key] += value
+            else:
+                tasks = self._schedule_creates(scheduler, resource, entries, after)
+            operations.update(tasks)
+            return list(dict.fromkeys(tasks.values()))
+        
+        if upsert:
+            print("\n=== Comparing against live ISE configuration ===")
+            self.build_index(refresh=True)
+        
+        sgt_tasks = schedule("sgt", [
+            (f"sgt:{sg['name']}", self.create_security_group,
+             (sg["name"], sg["tag"], sg.get("description", "")),
+             self._sgt_payload(sg["name"], sg["tag"], sg.get("description", "")))
+            for sg in config.get("security_groups", [])
+        ])
+        
+        schedule("networkdevice", [
+            (f"networkdevice:{device['name']}", self.add_network_device,
+             (device["name"], device["ip"], device["radius_key"], device.get("type", "Cisco")),
+             self._network_device_payload(device["name"], device["ip"], device["radius_key"],
+                                          device.get("type", "Cisco")))
+            for device in config.get("network_devices", [])
+        ])
+        
+        sgacl_tasks = schedule("sgacl", [
+            (f"sgacl:{sgacl['name']}", self.create_sgacl,
+             (sgacl["name"], sgacl.get("description", ""), sgacl["acl_content"]),
+             self._sgacl_payload(sgacl["name"], sgacl.get("description", ""),
+                                 sgacl["acl_content"]))
+            for sgacl in config.get("sgacls", [])
+        ])
+        
+        # Authorization profiles reference SGT values, so they wait for the SGTs
+        schedule("authorizationprofile", [
+            (f"authorizationprofile:{profile['name']}", self.create_authorization_profile,
+             (profile["name"], profile["vlan"], profile["sgt"], profile.get("description", "")),
+             self._authorization_profile_payload(profile["name"], profile["vlan"],
+                                                 profile["sgt"], profile.get("description", "")))
+            for profile in config.get("authorization_profiles", [])
+        ], after=sgt_tasks)
+        
+        # The matrix references SGT and SGACL IDs, so it is built once both exist
+        if config.get("egress_matrix"):
+            operations["egressmatrix"] = scheduler.add(
+                "egressmatrix", self.deploy_egress_matrix, config["egress_matrix"],
+                [sg["name"] for sg in config.get("security_groups", [])],
+                after=sgt_tasks + sgacl_tasks
+            )
+        
+        if upsert:
+            print(f"Upsert: {totals['create']} creates, {totals['update']} updates, "
+                  f"{totals['unchanged']} write calls skipped for unchanged objects")
+        
+        return operations
+    
+    def deploy_full_config(self, config_file: str, resume: bool = False,
+                           journal_dir: str = DEFAULT_JOURNAL_DIR, upsert: bool = False) -> bool:
         """
         Deploy complete ISE configuration from file
         
         Args:
             config_file: Path to JSON configuration file
+            resume: Skip objects a previous run of the same configuration created
+            journal_dir: Directory holding resume journals
+            upsert: Compare against the live configuration and only create or
+                update objects that are missing or differ
             
         Returns:
             bool: True if successful
@@ -276,43 +1181,19 @@ class ISEPolicyManager:
             with open(config_file, 'r') as f:
                 config = json.load(f)
             
-            # Create security groups
-            print("\n=== Creating Security Groups ===")
-            for sg in config.get("security_groups", []):
-                self.create_security_group(
-                    sg["name"],
-                    sg["tag"],
-                    sg.get("description", "")
-                )
-            
-            # Add network devices
-            print("\n=== Adding Network Devices ===")
-            for device in config.get("network_devices", []):
-                self.add_network_device(
-                    device["name"],
-                    device["ip"],
-                    device["radius_key"],
-                    device.get("type", "Cisco")
-                )
+            self.journal = DeployJournal("ise", config_file, resume, journal_dir)
             
-            # Create SGACLs
-            print("\n=== Creating SGACLs ===")
-            for sgacl in config.get("sgacls", []):
-                self.create_sgacl(
-                    sgacl["name"],
-                    sgacl.get("description", ""),
-                    sgacl["acl_content"]
-                )
+            scheduler = DAGScheduler(max_workers=self.max_workers)
+            self.schedule_config(scheduler, config, upsert)
             
-            # Create authorization profiles
-            print("\n=== Creating Authorization Profiles ===")
-            for profile in config.get("authorization_profiles", []):
-                self.create_authorization_profile(
-                    profile["name"],
-                    profile["vlan"],
-                    profile["sgt"],
-                    profile.get("description", "")
-                )
+            print(f"\n=== Deploying ISE Configuration ({len(scheduler.tasks)} operations) ===")
+            success = scheduler.run()
+            scheduler.print_report("ISE")
+            self.transport.print_stats()
+            self.rate_limiter.print_stats()
+            self.metrics.print_stats()
+            if not success:
+                return False
             
             print("\n=== ISE Configuration Complete ===")
             return True
@@ -320,6 +1201,11 @@ class ISEPolicyManager:
         except Exception as e:
             print(f"Configuration failed: {e}")
             return False
+        
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
 
 
 def main():
@@ -330,19 +1216,49 @@ def main():
     parser.add_argument("--password", required=True, help="ISE password")
     parser.add_argument("--config", required=True, help="Path to configuration JSON file")
     parser.add_argument("--verify-ssl", action="store_true", help="Verify SSL certificates")
+    parser.add_argument("--max-workers", type=int, default=8,
+                        help="Maximum concurrent ISE operations (default: 8)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume an interrupted run of the same configuration")
+    parser.add_argument("--journal-dir", default=DEFAULT_JOURNAL_DIR,
+                        help=f"Resume journal directory (default: {DEFAULT_JOURNAL_DIR})")
+    parser.add_argument("--upsert", action="store_true",
+                        help="Only create or update objects that are missing or differ in ISE")
+    parser.add_argument("--metrics-file",
+                        help="Write per-endpoint request latency histograms to this file")
+    parser.add_argument("--metrics-format", choices=("prometheus", "jsonl"), default="prometheus",
+                        help="Metrics file format: Prometheus textfile or JSON lines "
+                             "(default: prometheus)")
+    parser.add_argument("--request-log", help="Append a JSON line per API request to this file")
     
     args = parser.parse_args()
     
+    metrics = RequestMetrics()
+    request_log = RequestLog(args.request_log) if args.request_log else None
+    if request_log:
+        metrics.add_hook(request_log)
+    
     # Create manager instance
     manager = ISEPolicyManager(
         host=args.host,
         username=args.username,
         password=args.password,
-        verify_ssl=args.verify_ssl
+        verify_ssl=args.verify_ssl,
+        max_workers=args.max_workers,
+        metrics=metrics
     )
     
     # Deploy configuration
-    if manager.deploy_full_config(args.config):
+    try:
+        success = manager.deploy_full_config(args.config, resume=args.resume,
+                                             journal_dir=args.journal_dir, upsert=args.upsert)
+    finally:
+        if request_log:
+            request_log.close()
+        if args.metrics_file:
+            metrics.export(args.metrics_file, args.metrics_format)
+    
+    if success:
         print("\nISE configuration successful!")
         return 0
     else:
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Mock SDA Server
+Offline stand-in for the DNA Center intent/task APIs and the ISE ERS API, with
+configurable latency, throttling and asynchronous task durations
+"""
+
+import argparse
+import json
+import random
+import ssl
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+DNAC_PREFIX = "/dna/intent/api/v1"
+ERS_PREFIX = "/ers/config/"
+
+# Object key wrapping each ERS resource in requests and responses
+ERS_OBJECT_KEYS = {
+    "sgt": "Sgt",
+    "sgacl": "Sgacl",
+    "networkdevice": "NetworkDevice",
+    "authorizationprofile": "AuthorizationProfile",
+    "egressmatrixcell": "EgressMatrixCell"
+}
+
+
+class MockState:
+    """Objects and counters held by the mock server, shared by all handler threads"""
+    
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, max_rps: float = 0.0,
+                 task_duration: float = 1.0, inventory_size: int = 0):
+        """
+        Initialize the server state
+        
+        Args:
+            latency: Seconds added to every response
+            jitter: Extra random delay of up to this many seconds
+            max_rps: Requests per second served before answering 429; 0 disables throttling
+            task_duration: Seconds an asynchronous DNA Center task runs
+            inventory_size: Devices reported by the network-device API
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.max_rps = max_rps
+        self.task_duration = task_duration
+        self.inventory_size = inventory_size
+        
+        self.lock = threading.Lock()
+        self.tasks = {}
+        self.sda = {}
+        self.ers = {name: {} for name in ERS_OBJECT_KEYS}
+        self.bulks = {}
+        self.window = (0, 0)
+        self.stats = {"requests": 0, "throttled": 0}
+    
+    def admit(self) -> bool:
+        """Count a request against the per-second budget"""
+        second = int(time.monotonic())
+        with self.lock:
+            self.stats["requests"] += 1
+            start, count = self.window
+            count = count + 1 if start == second else 1
+            self.window = (second, count)
+            if self.max_rps and count > self.max_rps:
+                self.stats["throttled"] += 1
+                return False
+        return True
+    
+    def new_task(self, failed: bool = False) -> str:
+        """Start an asynchronous task and return its ID"""
+        task_id = str(uuid.uuid4())
+        with self.lock:
+            self.tasks[task_id] = (time.monotonic() + self.task_duration, failed)
+        return task_id
+    
+    def device(self, index: int) -> Dict:
+        """Synthesize inventory device number index (1-based)"""
+        return {
+            "id": f"device-{index}",
+            "hostname": f"switch-{index}",
+            "managementIpAddress": f"10.{index // 65536}.{index // 256 % 256}.{index % 256}",
+            "serialNumber": f"FOC{index:08d}",
+            "family": "Switches and Hubs",
+            "lastUpdateTime": 1700000000000
+        }
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Routes DNA Center and ISE requests to the shared MockState"""
+    
+    protocol_version = "HTTP/1.1"
+    state: MockState = None
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send(self, status: int, body: Optional[Dict] = None, headers: Optional[Dict] = None):
+        """Write a JSON response (or an empty one when body is None)"""
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(raw) if raw else {}
+        except ValueError:
+            return {}
+    
+    def _handle(self, method: str):
+        """Apply latency and throttling, then dispatch"""
+        body = self._read_json() if method in ("POST", "PUT") else {}
+        delay = self.state.latency + random.uniform(0, self.state.jitter)
+        if delay:
+            time.sleep(delay)
+        if not self.state.admit():
+            return self._send(429, {"error": "Too many requests"}, {"Retry-After": "1"})
+        
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path == "/dna/system/api/v1/auth/token":
+            return self._send(200, {"Token": str(uuid.uuid4())})
+        if url.path.startswith(DNAC_PREFIX):
+            return self._dnac(method, url.path[len(DNAC_PREFIX):], query, body)
+        if url.path.startswith(ERS_PREFIX):
+            return self._ers(method, url.path[len(ERS_PREFIX):].split("/"), query, body)
+        self._send(404, {"error": f"Unknown endpoint {url.path}"})
+    
+    def do_GET(self):
+        self._handle("GET")
+    
+    def do_POST(self):
+        self._handle("POST")
+    
+    def do_PUT(self):
+        self._handle("PUT")
+    
+    def _dnac(self, method: str, path: str, query: Dict, body: Dict):
+        """DNA Center intent, task and inventory endpoints"""
+        state = self.state
+        
+        if path.startswith("/task/"):
+            task = state.tasks.get(path.rsplit("/", 1)[-1])
+            if task is None:
+                return self._send(404, {"response": {"errorCode": "NOT_FOUND"}})
+            ends_at, failed = task
+            response = {"isError": False, "progress": "In progress"}
+            if time.monotonic() >= ends_at:
+                response.update(isError=failed, progress="Done", endTime=int(time.time() * 1000))
+                if failed:
+                    response["failureReason"] = "Simulated failure"
+            return self._send(200, {"response": response})
+        
+        if path == "/network-device":
+            offset = int(query.get("offset", 1))
+            limit = int(query.get("limit", 500))
+            last = min(state.inventory_size, offset + limit - 1)
+            return self._send(200, {"response": [state.device(i) for i in range(offset, last + 1)]})
+        
+        if not path.startswith("/business/sda/"):
+            return self._send(404, {"error": f"Unknown endpoint {path}"})
+        
+        with state.lock:
+            items = state.sda.setdefault(path, [])
+            if method == "GET" and not query:
+                return self._send(200, {"response": items})
+            if method == "GET":
+                # Like the real SDA APIs, a query reads one object by its
+                # device IP, VN or pool name
+                for item in items:
+                    if all(item.get(key, value) == value for key, value in query.items()):
+                        return self._send(200, dict(item, status="success"))
+                return self._send(404, {"status": "failed",
+                                        "description": f"{path} {query} not found"})
+            items.append(body)
+        task_id = state.new_task()
+        self._send(202, {"response": {"taskId": task_id, "url": f"{DNAC_PREFIX}/task/{task_id}"}})
+    
+    def _ers(self, method: str, parts: List[str], query: Dict, body: Dict):
+        """ISE ERS search, CRUD and bulk endpoints"""
+        state = self.state
+        resource = parts[0]
+        if resource not in state.ers:
+            return self._send(404, {"ERSResponse": {"messages": [{"title": "Unknown resource"}]}})
+        objects = state.ers[resource]
+        key = ERS_OBJECT_KEYS[resource]
+        
+        if len(parts) > 2 and parts[1] == "bulk":
+            return self._ers_bulk(method, resource, parts[2], body)
+        
+        if len(parts) == 1:
+            if method == "POST":
+                return self._ers_create(resource, body.get(key, {}))
+            return self._ers_search(resource, query)
+        
+        with state.lock:
+            current = objects.get(parts[1])
+            if current is None:
+                return self._send(404, {"ERSResponse": {"messages": [{"title": "Not found"}]}})
+            etag = self._etag(current)
+            if method == "GET":
+                return self._send(200, {key: current}, {"ETag": etag})
+            if self.headers.get("If-Match") not in (None, etag):
+                return self._send(412, {"ERSResponse": {"messages": [{"title": "Changed"}]}})
+            updated = dict(body.get(key, {}), id=parts[1])
+            updated["generationId"] = str(int(current.get("generationId", 0)) + 1)
+            objects[parts[1]] = updated
+        self._send(200, {"UpdatedFieldsList": {"updatedField": []}})
+    
+    @staticmethod
+    def _etag(obj: Dict) -> str:
+        return '"%08x"' % (hash(json.dumps(obj, sort_keys=True)) & 0xffffffff)
+    
+    def _store(self, resource: str, obj: Dict) -> Tuple[bool, str]:
+        """Add an ERS object unless its name is taken; returns (created, id)"""
+        with self.state.lock:
+            objects = self.state.ers[resource]
+            if any(existing.get("name") == obj.get("name") for existing in objects.values()):
+                return False, ""
+            obj_id = str(uuid.uuid4())
+            objects[obj_id] = dict(obj, id=obj_id, generationId="0")
+        return True, obj_id
+    
+    def _ers_create(self, resource: str, obj: Dict):
+        created, obj_id = self._store(resource, obj)
+        if not created:
+            return self._send(400, {"ERSResponse": {"messages": [
+                {"title": f"{resource} {obj.get('name')} already exists"}
+            ]}})
+        host = self.headers.get("Host", "localhost")
+        self._send(201, None, {"Location": f"https://{host}{ERS_PREFIX}{resource}/{obj_id}"})
+    
+    def _ers_search(self, resource: str, query: Dict):
+        size = min(100, int(query.get("size", 20)))
+        page = int(query.get("page", 1))
+        with self.state.lock:
+            items = list(self.state.ers[resource].values())
+        chunk = items[(page - 1) * size:page * size]
+        search = {
+            "total": len(items),
+            "resources": [{"id": item["id"], "name": item.get("name"),
+                           "description": item.get("description", "")} for item in chunk]
+        }
+        if page * size < len(items):
+            host = self.headers.get("Host", "localhost")
+            search["nextPage"] = {
+                "rel": "next",
+                "href": f"https://{host}{ERS_PREFIX}{resource}?size={size}&page={page + 1}"
+            }
+        self._send(200, {"SearchResult": search})
+    
+    def _ers_bulk(self, method: str, resource: str, bulk_id: str, body: Dict):
+        state = self.state
+        if method == "PUT" and bulk_id == "submit":
+            request = next(iter(body.values()), {})
+            results = []
+            for entry in request.get("resources", []):
+                obj = next(iter(entry.values()), {})
+                created, _ = self._store(resource, obj)
+                results.append({"name": obj.get("name"), "status": "SUCCESS" if created else "FAIL"})
+            bulk_id = str(uuid.uuid4())
+            with state.lock:
+                state.bulks[bulk_id] = (time.monotonic() + state.task_duration, results)
+            host = self.headers.get("Host", "localhost")
+            return self._send(202, None,
+                              {"Location": f"https://{host}{ERS_PREFIX}{resource}/bulk/{bulk_id}"})
+        
+        bulk = state.bulks.get(bulk_id)
+        if bulk is None:
+            return self._send(404, {"ERSResponse": {"messages": [{"title": "Unknown bulk"}]}})
+        ends_at, results = bulk
+        if time.monotonic() < ends_at:
+            return self._send(200, {"BulkStatus": {"executionStatus": "IN_PROGRESS"}})
+        failed = sum(1 for result in results if result["status"] != "SUCCESS")
+        self._send(200, {"BulkStatus": {
+            "executionStatus": "COMPLETED",
+            "successCount": len(results) - failed,
+            "failCount": failed,
+            "resourcesStatus": results
+        }})
+
+
+def start_server(state: MockState, port: int = 0, host: str = "127.0.0.1",
+                 certfile: Optional[str] = None, keyfile: Optional[str] = None) -> ThreadingHTTPServer:
+    """
+    Serve the mock API from a background thread
+    
+    Args:
+        state: Server state and behaviour settings
+        port: TCP port; 0 picks a free one (see server.server_address)
+        host: Address to bind
+        certfile: TLS certificate, so the managers' https:// URLs can be used unchanged
+        keyfile: TLS private key
+    
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    handler = type("BoundMockHandler", (MockHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Mock DNA Center / ISE API server")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8443, help="TCP port (default: 8443)")
+    parser.add_argument("--certfile", help="TLS certificate (serve HTTPS)")
+    parser.add_argument("--keyfile", help="TLS private key")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds added to every response (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Random extra latency up to this many seconds (default: 0)")
+    parser.add_argument("--max-rps", type=float, default=0.0,
+                        help="Requests per second before answering 429 (default: unlimited)")
+    parser.add_argument("--task-duration", type=float, default=1.0,
+                        help="Seconds each DNA Center task runs (default: 1)")
+    parser.add_argument("--inventory-size", type=int, default=100,
+                        help="Devices in the mock inventory (default: 100)")
+    
+    args = parser.parse_args()
+    
+    state = MockState(args.latency, args.jitter, args.max_rps, args.task_duration,
+                      args.inventory_size)
+    server = start_server(state, args.port, args.host, args.certfile, args.keyfile)
+    scheme = "https" if args.certfile else "http"
+    print(f"Mock DNA Center / ISE API listening on {scheme}://{args.host}:{server.server_address[1]}")
+    
+    try:
+        while True:
+            time.sleep(60)
+            print(f"{state.stats['requests']} requests served, {state.stats['throttled']} throttled")
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
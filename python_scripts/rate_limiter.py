@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter
+Client-side token buckets and throttling-aware retries for DNA Center and ISE APIs
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from fnmatch import fnmatch
+from typing import Dict, Mapping, Optional
+
+import requests
+
+
+# Requests per second and burst size per endpoint family. The first
+# matching pattern wins, so list specific families before broad ones.
+DEFAULT_FAMILIES = {
+    "/dna/intent/api/v1/business/sda/*": {"rate": 5.0, "burst": 10},
+    "/dna/intent/api/v1/task/*": {"rate": 20.0, "burst": 40},
+    "/dna/*": {"rate": 10.0, "burst": 20},
+    "/ers/config/*": {"rate": 20.0, "burst": 40},
+    "*": {"rate": 10.0, "burst": 20}
+}
+
+# Status codes that signal throttling or transient overload
+RETRY_STATUS_CODES = (429, 503)
+
+# A 503 may arrive after the server accepted a write, so only methods that
+# are safe to repeat are retried on it. 429 means the request was refused.
+IDEMPOTENT_RETRY_STATUS_CODES = (503,)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+def _empty_stats() -> Dict:
+    """Return zeroed throttling counters for one endpoint family"""
+    return {"requests": 0, "throttled": 0, "retries": 0, "gave_up": 0,
+            "bucket_wait": 0.0, "backoff_wait": 0.0}
+
+
+class TokenBucket:
+    """Thread-safe token bucket"""
+    
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize the bucket
+        
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+    
+    def _try_take(self) -> float:
+        """Take a token if one is available, otherwise return the seconds to wait"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+    
+    def acquire(self) -> float:
+        """
+        Take one token, blocking until one is available
+        
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self._try_take()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+    
+    async def acquire_async(self) -> float:
+        """
+        Take one token, yielding to the event loop until one is available
+        
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self._try_take()
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+    
+    def pause(self, seconds: float):
+        """Hold back every caller of this bucket for the given time"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """Per endpoint family rate limiting with jittered exponential backoff"""
+    
+    def __init__(self, families: Optional[Dict[str, Dict]] = None, max_retries: int = 5,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0):
+        """
+        Initialize the rate limiter
+        
+        Args:
+            families: Mapping of endpoint glob pattern to {"rate", "burst"}
+            max_retries: Retries per request after a throttling response
+            backoff_base: First backoff ceiling in seconds
+            backoff_max: Largest backoff in seconds
+        """
+        self.families = families or DEFAULT_FAMILIES
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.buckets = {
+            pattern: TokenBucket(limits["rate"], limits["burst"])
+            for pattern, limits in self.families.items()
+        }
+        self.metrics = {pattern: _empty_stats() for pattern in self.families}
+        self.metrics_lock = threading.Lock()
+    
+    def family(self, endpoint: str) -> str:
+        """Return the pattern of the endpoint family an API path belongs to"""
+        path = endpoint.split("?", 1)[0]
+        for pattern in self.families:
+            if fnmatch(path, pattern):
+                return pattern
+        return "*"
+    
+    def acquire(self, endpoint: str):
+        """Block until the endpoint's family allows another request"""
+        family = self.family(endpoint)
+        bucket = self.buckets.get(family)
+        waited = bucket.acquire() if bucket else 0.0
+        self._record(family, requests=1, bucket_wait=waited)
+    
+    async def acquire_async(self, endpoint: str):
+        """Wait without blocking the event loop until the endpoint's family allows a request"""
+        family = self.family(endpoint)
+        bucket = self.buckets.get(family)
+        waited = await bucket.acquire_async() if bucket else 0.0
+        self._record(family, requests=1, bucket_wait=waited)
+    
+    def retry_delay(self, method: str, endpoint: str, status_code: int,
+                    headers: Mapping[str, str], attempt: int) -> Optional[float]:
+        """
+        Decide whether a response should be retried and how long to wait first
+        
+        429 is retried for every method, 503 only for idempotent ones.
+        Retry-After is honoured when present, otherwise the delay is drawn
+        uniformly from [0, backoff_base * 2^attempt] ("full jitter").
+        
+        Args:
+            method: HTTP method of the request
+            endpoint: API endpoint path
+            status_code: HTTP status of the response
+            headers: Response headers
+            attempt: Number of retries already made for this request
+        
+        Returns:
+            Seconds to wait before sending the request again, or None if
+            it should not be retried
+        """
+        if status_code not in RETRY_STATUS_CODES:
+            return None
+        if (status_code in IDEMPOTENT_RETRY_STATUS_CODES
+                and method.upper() not in IDEMPOTENT_METHODS):
+            return None
+        
+        family = self.family(endpoint)
+        if attempt >= self.max_retries:
+            self._record(family, throttled=1, gave_up=1)
+            return None
+        
+        delay = self._retry_after(headers)
+        if delay is None:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        elif family in self.buckets:
+            # The server told us when to come back: hold the whole family
+            self.buckets[family].pause(delay)
+        
+        self._record(family, throttled=1, retries=1, backoff_wait=delay)
+        return delay
+    
+    def wait_before_retry(self, method: str, endpoint: str, response: requests.Response,
+                          attempt: int) -> bool:
+        """
+        Sleep before retrying a throttled response
+        
+        Args:
+            method: HTTP method of the request
+            endpoint: API endpoint path
+            response: Response to inspect
+            attempt: Number of retries already made for this request
+        
+        Returns:
+            bool: True if the caller should send the request again
+        """
+        delay = self.retry_delay(method, endpoint, response.status_code, response.headers, attempt)
+        if delay is None:
+            return False
+        time.sleep(delay)
+        return True
+    
+    async def wait_before_retry_async(self, method: str, endpoint: str, status_code: int,
+                                      headers: Mapping[str, str], attempt: int) -> bool:
+        """
+        Event loop friendly counterpart of wait_before_retry
+        
+        Args:
+            method: HTTP method of the request
+            endpoint: API endpoint path
+            status_code: HTTP status of the response
+            headers: Response headers
+            attempt: Number of retries already made for this request
+        
+        Returns:
+            bool: True if the caller should send the request again
+        """
+        delay = self.retry_delay(method, endpoint, status_code, headers, attempt)
+        if delay is None:
+            return False
+        await asyncio.sleep(delay)
+        return True
+    
+    def _retry_after(self, headers: Mapping[str, str]) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date"""
+        value = headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return min(self.backoff_max, max(0.0, float(value)))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            return None
+        return min(self.backoff_max, max(0.0, retry_at - time.time()))
+    
+    def _record(self, family: str, **counters):
+        """Add to the metrics of an endpoint family"""
+        with self.metrics_lock:
+            stats = self.metrics.setdefault(family, _empty_stats())
+            for name, value in counters.items():
+                stats[name] += value
+    
+    def print_stats(self):
+        """Print throttling statistics for families that saw traffic"""
+        with self.metrics_lock:
+            active = {f: dict(s) for f, s in self.metrics.items() if s["requests"]}
+        for family, stats in active.items():
+            print(f"Rate limit {family}: {stats['requests']} requests, "
+                  f"{stats['throttled']} throttled, {stats['retries']} retried, "
+                  f"{stats['gave_up']} gave up, "
+                  f"{stats['bucket_wait']:.1f}s queued, {stats['backoff_wait']:.1f}s backing off")
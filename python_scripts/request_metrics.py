@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Request Metrics
+Per-request timing hooks and per-endpoint latency histograms for DNA Center and
+ISE API calls, exported as a Prometheus textfile or JSON lines
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Path segments that identify a single object (UUIDs, hex and numeric IDs)
+ID_SEGMENT = re.compile(r"^(?:[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}|[0-9a-fA-F]{24,}|\d+)$")
+
+METRIC_PREFIX = "sda_api"
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    Reduce an API path to its template so calls on different objects aggregate together
+    
+    /ers/config/sgt/6b3f...-... becomes /ers/config/sgt/{id} and the value
+    after a name/ segment becomes {name}. Query strings are dropped.
+    
+    Args:
+        endpoint: API endpoint path, optionally with a query string
+    
+    Returns:
+        Endpoint template
+    """
+    segments = endpoint.split("?", 1)[0].split("/")
+    for i, segment in enumerate(segments):
+        if i and segments[i - 1] == "name":
+            segments[i] = "{name}"
+        elif ID_SEGMENT.match(segment):
+            segments[i] = "{id}"
+    return "/".join(segments)
+
+
+def _empty_series() -> Dict:
+    """Return zeroed aggregates for one method and endpoint template"""
+    return {"count": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0, "bytes": 0,
+            "buckets": [0] * (len(LATENCY_BUCKETS) + 1), "statuses": {}}
+
+
+def _label(value: str) -> str:
+    """Escape a Prometheus label value"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RequestTimer:
+    """Times one HTTP exchange; the caller reports the response it received"""
+    
+    def __init__(self):
+        self.status = None
+        self.size = 0
+    
+    def response(self, status: int, size: int):
+        """
+        Record the response of the timed request
+        
+        Args:
+            status: HTTP status code
+            size: Response body size in bytes
+        """
+        self.status = status
+        self.size = size
+
+
+class RequestMetrics:
+    """Thread-safe request hooks aggregating latency histograms per endpoint"""
+    
+    def __init__(self):
+        self.series = {}
+        self.hooks = []
+        self.lock = threading.Lock()
+    
+    def add_hook(self, hook: Callable[[Dict], None]):
+        """
+        Call hook with the record of every request
+        
+        Records hold method, endpoint, template, status (None when no
+        response arrived), bytes, seconds and time.
+        
+        Args:
+            hook: Callable taking one record dict
+        """
+        self.hooks.append(hook)
+    
+    @contextmanager
+    def timer(self, method: str, endpoint: str) -> Iterator[RequestTimer]:
+        """
+        Time the request made inside the block and record it on exit
+        
+        A request whose block raises before a response is reported is
+        recorded as a failure without a status.
+        
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+        
+        Yields:
+            RequestTimer to report the response on
+        """
+        timer = RequestTimer()
+        start = time.monotonic()
+        try:
+            yield timer
+        finally:
+            self.record(method, endpoint, timer.status, timer.size, time.monotonic() - start)
+    
+    def record(self, method: str, endpoint: str, status: Optional[int], size: int,
+               seconds: float):
+        """
+        Add one request to the histograms and pass it to the hooks
+        
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            status: HTTP status code, or None if the request failed without a response
+            size: Response body size in bytes
+            seconds: Time from sending the request to reading the response
+        """
+        template = endpoint_template(endpoint)
+        with self.lock:
+            series = self.series.setdefault((method, template), _empty_series())
+            series["count"] += 1
+            series["errors"] += status is None or status >= 400
+            series["seconds"] += seconds
+            series["max_seconds"] = max(series["max_seconds"], seconds)
+            series["bytes"] += size
+            series["buckets"][bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            key = str(status) if status is not None else "error"
+            series["statuses"][key] = series["statuses"].get(key, 0) + 1
+        
+        if not self.hooks:
+            return
+        entry = {"method": method, "endpoint": endpoint, "template": template, "status": status,
+                 "bytes": size, "seconds": seconds, "time": time.time()}
+        for hook in self.hooks:
+            try:
+                hook(entry)
+            except Exception as e:
+                print(f"Request metrics hook failed: {e}")
+    
+    def snapshot(self) -> Dict[Tuple[str, str], Dict]:
+        """Return a consistent copy of the per-endpoint aggregates"""
+        with self.lock:
+            return {key: dict(series, buckets=list(series["buckets"]),
+                              statuses=dict(series["statuses"]))
+                    for key, series in self.series.items()}
+    
+    @staticmethod
+    def quantile(series: Dict, fraction: float) -> float:
+        """
+        Estimate a latency quantile from a histogram
+        
+        Returns:
+            Upper bound of the bucket holding the quantile (the largest
+            observed latency for the overflow bucket)
+        """
+        target = fraction * series["count"]
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, series["buckets"]):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return series["max_seconds"]
+    
+    def prometheus_text(self) -> str:
+        """Render the aggregates in the Prometheus text exposition format"""
+        duration = f"{METRIC_PREFIX}_request_duration_seconds"
+        requests = f"{METRIC_PREFIX}_requests_total"
+        size = f"{METRIC_PREFIX}_response_bytes_total"
+        lines = [f"# HELP {duration} DNA Center and ISE API request latency",
+                 f"# TYPE {duration} histogram"]
+        
+        series = sorted(self.snapshot().items())
+        for (method, template), s in series:
+            labels = f'method="{_label(method)}",endpoint="{_label(template)}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, s["buckets"]):
+                cumulative += count
+                lines.append(f'{duration}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{duration}_bucket{{{labels},le="+Inf"}} {s["count"]}')
+            lines.append(f"{duration}_sum{{{labels}}} {s['seconds']:.6f}")
+            lines.append(f"{duration}_count{{{labels}}} {s['count']}")
+        
+        lines += [f"# HELP {requests} DNA Center and ISE API requests by response status",
+                  f"# TYPE {requests} counter"]
+        for (method, template), s in series:
+            labels = f'method="{_label(method)}",endpoint="{_label(template)}"'
+            for status, count in sorted(s["statuses"].items()):
+                lines.append(f'{requests}{{{labels},status="{status}"}} {count}')
+        
+        lines += [f"# HELP {size} DNA Center and ISE API response body bytes",
+                  f"# TYPE {size} counter"]
+        for (method, template), s in series:
+            labels = f'method="{_label(method)}",endpoint="{_label(template)}"'
+            lines.append(f"{size}{{{labels}}} {s['bytes']}")
+        
+        return "\n".join(lines) + "\n"
+    
+    def json_lines(self) -> List[str]:
+        """Render one JSON object per method and endpoint template"""
+        lines = []
+        for (method, template), s in sorted(self.snapshot().items()):
+            lines.append(json.dumps({
+                "method": method,
+                "endpoint": template,
+                "count": s["count"],
+                "errors": s["errors"],
+                "seconds": round(s["seconds"], 6),
+                "max_seconds": round(s["max_seconds"], 6),
+                "p50_seconds": self.quantile(s, 0.50),
+                "p95_seconds": self.quantile(s, 0.95),
+                "bytes": s["bytes"],
+                "statuses": s["statuses"],
+                "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], s["buckets"]))
+            }))
+        return lines
+    
+    def export(self, path: str, fmt: str = "prometheus"):
+        """
+        Write the aggregates to a file
+        
+        The file is replaced atomically so a Prometheus node_exporter
+        textfile collector never reads a partial file.
+        
+        Args:
+            path: Output file
+            fmt: "prometheus" or "jsonl"
+        """
+        if fmt == "prometheus":
+            content = self.prometheus_text()
+        elif fmt == "jsonl":
+            content = "".join(line + "\n" for line in self.json_lines())
+        else:
+            raise ValueError(f"Unknown metrics format: {fmt}")
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+        print(f"Request metrics written to {path}")
+    
+    def print_stats(self, limit: int = 10):
+        """Print the endpoints that took the most total time"""
+        series = sorted(self.snapshot().items(), key=lambda item: item[1]["seconds"], reverse=True)
+        for (method, template), s in series[:limit]:
+            print(f"API {method} {template}: {s['count']} requests, {s['errors']} failed, "
+                  f"mean {s['seconds'] / s['count'] * 1000:.0f}ms, "
+                  f"p95 <= {self.quantile(s, 0.95) * 1000:.0f}ms, "
+                  f"max {s['max_seconds'] * 1000:.0f}ms, {s['seconds']:.1f}s total")
+        if len(series) > limit:
+            print(f"API ... {len(series) - limit} more endpoints")
+
+
+class RequestLog:
+    """Hook appending every request record to a JSON-lines file"""
+    
+    def __init__(self, path: str):
+        """
+        Open the log for appending
+        
+        Args:
+            path: JSON-lines file
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, 'a')
+    
+    def __call__(self, entry: Dict):
+        with self.lock:
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+    
+    def close(self):
+        """Close the log file"""
+        with self.lock:
+            self.file.close()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+SDA Deploy
+Deploys ISE policy and the DNA Center fabric as one pipelined dependency graph
+"""
+
+import argparse
+import json
+from typing import Dict, List
+
+from dag_scheduler import DAGScheduler
+from deploy_journal import DEFAULT_JOURNAL_DIR, DeployJournal
+from dnac_fabric_manager import ROLE_ENDPOINTS, DNACFabricManager, DNACQueryError
+from http_transport import HTTPTransport
+from ise_policy_manager import ISEPolicyManager, ISEQueryError
+from rate_limiter import RateLimiter
+from request_metrics import RequestLog, RequestMetrics
+
+
+def build_pipeline(scheduler: DAGScheduler, dnac: DNACFabricManager, ise: ISEPolicyManager,
+                   fabric_config: Dict, ise_config: Dict, reconcile: bool = False,
+                   upsert: bool = False) -> Dict[str, List[str]]:
+    """
+    Add the ISE and DNA Center operations to one scheduler
+    
+    Both stages start together. The only cross-system dependency is that a
+    device is provisioned only after its network device (NAD) has been
+    registered in ISE, so its RADIUS sessions can authenticate; if the
+    registration fails the provisioning is skipped.
+    
+    Args:
+        scheduler: Scheduler to add tasks to
+        dnac: DNA Center manager, already authenticated
+        ise: ISE manager
+        fabric_config: Single- or multi-site fabric configuration
+        ise_config: ISE configuration
+        reconcile: Only create fabric objects missing from DNA Center
+        upsert: Only create or update ISE objects that are missing or differ
+    
+    Returns:
+        Task names per pipeline
+    
+    Raises:
+        DNACQueryError: If reconcile could not read the current fabric state
+        ISEQueryError: If upsert could not read the live ISE configuration
+    """
+    ise_operations = ise.schedule_config(scheduler, ise_config, upsert)
+    nad_tasks = {
+        device["ip"]: ise_operations[f"networkdevice:{device['name']}"]
+        for device in ise_config.get("network_devices", [])
+        if f"networkdevice:{device['name']}" in ise_operations
+    }
+    registered = {device["ip"] for device in ise_config.get("network_devices", [])}
+    
+    dnac_tasks = []
+    for site in DNACFabricManager._site_configs(fabric_config):
+        site_hierarchy = site["fabric_site"]["site_hierarchy"]
+        plan = dnac.plan_deployment(site)
+        if reconcile:
+            full_plan = plan
+            state = dnac.get_fabric_state(site)
+            plan = dnac.plan_deployment(site, state)
+            dnac.print_plan(plan, full_plan, site_hierarchy)
+        
+        external = {}
+        for role in ROLE_ENDPOINTS:
+            for ip in plan["provision"][role]:
+                if ip in nad_tasks:
+                    external[f"provision:{ip}"] = [nad_tasks[ip]]
+                elif ip not in registered:
+                    print(f"Warning: {ip} is provisioned but not listed in the ISE network devices")
+        
+        dnac_tasks += dnac.schedule_plan(
+            scheduler, plan, site_hierarchy, site["fabric_site"].get("fabric_type", "FABRIC_SITE"),
+            prefix=f"{site_hierarchy}|", external=external
+        )
+    
+    return {
+        "ISE": list(dict.fromkeys(ise_operations.values())),
+        "DNA Center": dnac_tasks
+    }
+
+
+def print_pipeline_times(scheduler: DAGScheduler, pipelines: Dict[str, List[str]]):
+    """Print how long each pipeline took compared with the end-to-end time"""
+    print("\n=== Pipeline Summary ===")
+    for title, names in pipelines.items():
+        results = [scheduler.results[name] for name in names if name in scheduler.results]
+        if not results:
+            print(f"  {title}: nothing to do")
+            continue
+        span = max(r["end"] for r in results) - min(r["start"] for r in results)
+        failed = sum(1 for r in results if r["status"] != "ok")
+        print(f"  {title}: {len(results)} operations, {failed} not ok, {span:.1f}s")
+    print(f"  End to end: {scheduler.finished - scheduler.started:.1f}s")
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Combined ISE and DNA Center deployment")
+    parser.add_argument("--dnac-host", required=True, help="DNA Center IP or hostname")
+    parser.add_argument("--dnac-username", required=True, help="DNA Center username")
+    parser.add_argument("--dnac-password", required=True, help="DNA Center password")
+    parser.add_argument("--ise-host", required=True, help="ISE IP or hostname")
+    parser.add_argument("--ise-username", required=True, help="ISE username")
+    parser.add_argument("--ise-password", required=True, help="ISE password")
+    parser.add_argument("--fabric-config", required=True, help="Path to fabric configuration JSON file")
+    parser.add_argument("--ise-config", required=True, help="Path to ISE configuration JSON file")
+    parser.add_argument("--verify-ssl", action="store_true", help="Verify SSL certificates")
+    parser.add_argument("--task-timeout", type=int, default=1800,
+                        help="Seconds to wait for each DNA Center task (default: 1800)")
+    parser.add_argument("--max-workers", type=int, default=16,
+                        help="Maximum concurrent operations across both systems (default: 16)")
+    parser.add_argument("--reconcile", action="store_true",
+                        help="Only create fabric objects missing from DNA Center")
+    parser.add_argument("--upsert", action="store_true",
+                        help="Only create or update ISE objects that are missing or differ")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume an interrupted run of the same configurations")
+    parser.add_argument("--journal-dir", default=DEFAULT_JOURNAL_DIR,
+                        help=f"Resume journal directory (default: {DEFAULT_JOURNAL_DIR})")
+    parser.add_argument("--metrics-file",
+                        help="Write per-endpoint request latency histograms to this file")
+    parser.add_argument("--metrics-format", choices=("prometheus", "jsonl"), default="prometheus",
+                        help="Metrics file format: Prometheus textfile or JSON lines "
+                             "(default: prometheus)")
+    parser.add_argument("--request-log", help="Append a JSON line per API request to this file")
+    
+    args = parser.parse_args()
+    
+    with open(args.fabric_config, 'r') as f:
+        fabric_config = json.load(f)
+    with open(args.ise_config, 'r') as f:
+        ise_config = json.load(f)
+    
+    # One connection pool, one set of rate limits and one metrics registry for both systems
+    transport = HTTPTransport(pool_size=args.max_workers, max_hosts=2)
+    rate_limiter = RateLimiter()
+    metrics = RequestMetrics()
+    request_log = RequestLog(args.request_log) if args.request_log else None
+    if request_log:
+        metrics.add_hook(request_log)
+    dnac = DNACFabricManager(
+        host=args.dnac_host,
+        username=args.dnac_username,
+        password=args.dnac_password,
+        verify_ssl=args.verify_ssl,
+        task_timeout=args.task_timeout,
+        max_workers=args.max_workers,
+        transport=transport,
+        rate_limiter=rate_limiter,
+        metrics=metrics
+    )
+    ise = ISEPolicyManager(
+        host=args.ise_host,
+        username=args.ise_username,
+        password=args.ise_password,
+        verify_ssl=args.verify_ssl,
+        transport=transport,
+        rate_limiter=rate_limiter,
+        max_workers=args.max_workers,
+        metrics=metrics
+    )
+    
+    if not dnac.authenticate():
+        print("Authentication failed. Exiting.")
+        return 1
+    
+    dnac.journal = DeployJournal("dnac", args.fabric_config, args.resume, args.journal_dir)
+    ise.journal = DeployJournal("ise", args.ise_config, args.resume, args.journal_dir)
+    try:
+        scheduler = DAGScheduler(max_workers=args.max_workers)
+        pipelines = build_pipeline(scheduler, dnac, ise, fabric_config, ise_config,
+                                   reconcile=args.reconcile, upsert=args.upsert)
+        
+        print(f"\n=== Deploying ISE and DNA Center ({len(scheduler.tasks)} operations) ===")
+        success = scheduler.run()
+        scheduler.print_report("SDA")
+        dnac.print_task_summary()
+        print_pipeline_times(scheduler, pipelines)
+        transport.print_stats()
+        rate_limiter.print_stats()
+        metrics.print_stats()
+    
+    except DNACQueryError as e:
+        # Never apply a reconcile plan built on partial fabric state
+        print(f"Reconcile aborted, current fabric state unknown: {e}")
+        return 1
+    
+    except ISEQueryError as e:
+        # Never plan upserts against a partial ISE index
+        print(f"Upsert aborted, current ISE configuration unknown: {e}")
+        return 1
+    
+    finally:
+        dnac.journal.close()
+        ise.journal.close()
+        dnac.journal = None
+        ise.journal = None
+        if request_log:
+            request_log.close()
+        if args.metrics_file:
+            metrics.export(args.metrics_file, args.metrics_format)
+    
+    if success:
+        print("\nSDA deployment successful!")
+        return 0
+    else:
+        print("\nSDA deployment failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    exit(main())
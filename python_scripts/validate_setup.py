@@ -6,9 +6,48 @@ Validates that the SD-Access automation environment is properly configured
 
 import sys
 import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import sysconfig
+import threading
 import subprocess
+import importlib.util
+import importlib.metadata
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from config_lint import lint_files
+
+# Packages the scripts cannot run without, and the file pinning all of them
+REQUIRED_PACKAGES = ['requests', 'ansible']
+REQUIREMENTS_FILE = 'requirements.txt'
+
+# Linter findings printed per category before the rest are summarized
+MAX_LINT_MESSAGES = 20
+
+# Collections the playbooks need
+REQUIRED_COLLECTIONS = ['cisco.ios', 'cisco.dnac', 'community.general']
+
+# Ansible's default collection search path when ANSIBLE_COLLECTIONS_PATH is unset
+DEFAULT_COLLECTIONS_PATHS = ['~/.ansible/collections', '/usr/share/ansible/collections']
+
+# Results of the environment probes are reused while the environment
+# fingerprint is unchanged, for up to CACHE_MAX_AGE seconds
+CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'sda-automation', 'validate-setup.json')
+CACHE_MAX_AGE = 24 * 3600
+CACHED_CHECKS = ('Python Environment', 'System Tools', 'Ansible Collections')
+
+# Seconds taken by each check, filled in as the checks run
+check_timings = {}
+
+# Checks running on worker threads buffer their output here so that it can
+# be printed in order once they finish
+_output = threading.local()
+
 
 class Colors:
     """ANSI color codes"""
@@ -20,30 +59,161 @@ class Colors:
     BOLD = '\033[1m'
 
 
+def emit(text):
+    """Print a line, or buffer it when the current check captures its output"""
+    lines = getattr(_output, 'lines', None)
+    if lines is None:
+        print(text)
+    else:
+        lines.append(text)
+
+
 def print_header(text):
     """Print section header"""
-    print(f"\n{Colors.BOLD}{Colors.BLUE}{'=' * 60}{Colors.END}")
-    print(f"{Colors.BOLD}{Colors.BLUE}{text}{Colors.END}")
-    print(f"{Colors.BOLD}{Colors.BLUE}{'=' * 60}{Colors.END}\n")
+    emit(f"\n{Colors.BOLD}{Colors.BLUE}{'=' * 60}{Colors.END}")
+    emit(f"{Colors.BOLD}{Colors.BLUE}{text}{Colors.END}")
+    emit(f"{Colors.BOLD}{Colors.BLUE}{'=' * 60}{Colors.END}\n")
 
 
 def print_success(text):
     """Print success message"""
-    print(f"{Colors.GREEN}✓ {text}{Colors.END}")
+    emit(f"{Colors.GREEN}✓ {text}{Colors.END}")
 
 
 def print_warning(text):
     """Print warning message"""
-    print(f"{Colors.YELLOW}⚠ {text}{Colors.END}")
+    emit(f"{Colors.YELLOW}⚠ {text}{Colors.END}")
 
 
 def print_error(text):
     """Print error message"""
-    print(f"{Colors.RED}✗ {text}{Colors.END}")
+    emit(f"{Colors.RED}✗ {text}{Colors.END}")
 
 
-def check_command(command, name):
-    """Check if a command is available"""
+def run_captured(name, check, *args):
+    """
+    Run a check with its output buffered and its duration recorded
+    
+    Returns:
+        (result, output lines)
+    """
+    _output.lines = []
+    start = time.monotonic()
+    try:
+        return check(*args), _output.lines
+    finally:
+        check_timings[name] = time.monotonic() - start
+        _output.lines = None
+
+
+def run_checks(checks, cached=None, max_workers=8):
+    """
+    Run checks on a thread pool
+    
+    Args:
+        checks: List of (name, function, args) tuples
+        cached: Dict of check name to a previous (result, output lines) to reuse
+        max_workers: Maximum checks running at once
+    
+    Returns:
+        List of (result, output lines) in the given order
+    """
+    cached = cached or {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(checks)))) as executor:
+        futures = [None if name in cached else executor.submit(run_captured, name, check, *args)
+                   for name, check, args in checks]
+        return [tuple(cached[name]) if future is None else future.result()
+                for (name, _, _), future in zip(checks, futures)]
+
+
+def run_parallel(checks, max_workers=8):
+    """
+    Run checks on a thread pool and print their output in the given order
+    
+    Returns:
+        List of check results in the given order
+    """
+    results = []
+    for result, lines in run_checks(checks, max_workers=max_workers):
+        for line in lines:
+            emit(line)
+        results.append(result)
+    return results
+
+
+def _mtime(path):
+    """Return a path's modification time, or None if it does not exist"""
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def environment_fingerprint(fast=False):
+    """
+    Hash the parts of the environment the tool, package and collection checks depend on
+    
+    Installing or removing a tool, package or collection changes the
+    modification time of the directory it lives in, so only directories
+    are stat'ed and nothing is executed.
+    
+    Returns:
+        Hex digest
+    """
+    path_entries = [entry for entry in os.environ.get('PATH', '').split(os.pathsep) if entry]
+    site_dirs = sorted({sysconfig.get_paths()[key] for key in ('purelib', 'platlib')})
+    collection_dirs = []
+    for path in collection_search_paths():
+        collection_dirs.append(path)
+        with os.scandir(path) as namespaces:
+            collection_dirs += sorted(entry.path for entry in namespaces if entry.is_dir())
+    
+    state = {
+        'fast': fast,
+        'python': [sys.executable, sys.version],
+        'virtual_env': os.environ.get('VIRTUAL_ENV'),
+        'requirements': _mtime(REQUIREMENTS_FILE),
+        'path': [[entry, _mtime(entry)] for entry in path_entries],
+        'site_packages': [[path, _mtime(path)] for path in site_dirs],
+        'collections': [[path, _mtime(path)] for path in collection_dirs]
+    }
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+
+def load_cached_checks(fingerprint):
+    """Return cached {check name: (result, output lines)} for an unchanged environment"""
+    try:
+        with open(CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('fingerprint') != fingerprint or time.time() - cache.get('created', 0) > CACHE_MAX_AGE:
+        return {}
+    return cache.get('checks', {})
+
+
+def save_cached_checks(fingerprint, checks):
+    """Store passing check results under the environment fingerprint"""
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        temp_path = f"{CACHE_FILE}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'fingerprint': fingerprint, 'created': time.time(), 'checks': checks}, f)
+        os.replace(temp_path, CACHE_FILE)
+    except OSError as e:
+        print_warning(f"Could not save validation cache: {e}")
+
+
+def check_command(command, name, fast=False):
+    """Check if a command is available; fast mode only looks it up on PATH"""
+    if fast:
+        path = shutil.which(command)
+        if path:
+            print_success(f"{name} is installed: {path}")
+            return True
+        print_error(f"{name} is not installed")
+        return False
+    
     try:
         result = subprocess.run(
             [command, '--version'],
@@ -66,15 +236,133 @@ def check_command(command, name):
         return False
 
 
-def check_python_package(package_name):
-    """Check if a Python package is installed"""
-    try:
-        __import__(package_name)
+def normalize_name(name):
+    """Normalize a distribution name (PEP 503) so 'PyYAML' matches 'pyyaml'"""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def installed_distributions():
+    """Read every installed distribution's name and version in one pass over the metadata"""
+    installed = {}
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata['Name']
+        if name:
+            installed.setdefault(normalize_name(name), dist.version)
+    return installed
+
+
+def parse_requirements(path=REQUIREMENTS_FILE):
+    """
+    Read the package pins from a requirements file
+    
+    Returns:
+        List of (name, [(operator, version), ...])
+    """
+    requirements = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0].split(';', 1)[0].strip()
+            match = re.match(r'^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(.*)$', line)
+            if not match:
+                continue
+            specifiers = re.findall(r'(~=|==|!=|<=|>=|<|>)\s*([^\s,]+)', match.group(2))
+            requirements.append((match.group(1), specifiers))
+    return requirements
+
+
+def version_tuple(version):
+    """Numeric release segment of a version string, e.g. '2.28.1rc1' -> (2, 28, 1)"""
+    release = re.match(r'^\s*v?(\d+(?:\.\d+)*)', version)
+    return tuple(int(part) for part in release.group(1).split('.')) if release else ()
+
+
+def satisfies(version, specifiers):
+    """Check an installed version against requirement specifiers (release numbers only)"""
+    installed = version_tuple(version)
+    for operator, wanted in specifiers:
+        if wanted.endswith('.*'):
+            prefix = version_tuple(wanted[:-2])
+            matches = installed[:len(prefix)] == prefix
+            if matches != (operator == '=='):
+                return False
+            continue
+        
+        target = version_tuple(wanted)
+        # Pad so that 2.14 compares equal to 2.14.0
+        width = max(len(installed), len(target))
+        current = installed + (0,) * (width - len(installed))
+        padded = target + (0,) * (width - len(target))
+        ok = {
+            '==': current == padded,
+            '!=': current != padded,
+            '>=': current >= padded,
+            '<=': current <= padded,
+            '>': current > padded,
+            '<': current < padded,
+            '~=': current >= padded and installed[:len(target) - 1] == target[:-1]
+        }[operator]
+        if not ok:
+            return False
+    return True
+
+
+def check_python_package(package_name, installed=None):
+    """
+    Check if a Python package is installed without importing it
+    
+    Args:
+        package_name: Distribution or top-level module name
+        installed: Result of installed_distributions(), read when omitted
+    """
+    if installed is None:
+        installed = installed_distributions()
+    
+    version = installed.get(normalize_name(package_name))
+    if version:
+        print_success(f"Python package '{package_name}' is installed: {version}")
+        return True
+    # Installed under another distribution name (e.g. ansible from ansible-core)
+    if importlib.util.find_spec(package_name) is not None:
         print_success(f"Python package '{package_name}' is installed")
         return True
-    except ImportError:
-        print_error(f"Python package '{package_name}' is not installed")
+    print_error(f"Python package '{package_name}' is not installed")
+    return False
+
+
+def check_requirement_pins(installed, path=REQUIREMENTS_FILE):
+    """
+    Compare installed versions with the pins in requirements.txt
+    
+    Missing or mismatched packages are warnings; the packages the scripts
+    need are checked separately.
+    
+    Returns:
+        bool: True if every pinned package is installed at a matching version
+    """
+    try:
+        requirements = parse_requirements(path)
+    except OSError as e:
+        print_warning(f"Could not read {path}: {e}")
         return False
+    
+    missing = []
+    mismatched = []
+    for name, specifiers in requirements:
+        version = installed.get(normalize_name(name))
+        if version is None:
+            missing.append(name)
+        elif not satisfies(version, specifiers):
+            pins = ','.join(operator + wanted for operator, wanted in specifiers)
+            mismatched.append(f"{name} {version} (requires {pins})")
+    
+    matching = len(requirements) - len(missing) - len(mismatched)
+    print_success(f"{matching} of {len(requirements)} packages in {path} match their pins")
+    for entry in mismatched:
+        print_warning(f"Version mismatch: {entry}")
+    if missing:
+        print_warning(f"Not installed: {', '.join(missing)}")
+        print_warning(f"Install with: pip3 install -r {path}")
+    return not missing and not mismatched
 
 
 def check_file_exists(file_path, description):
@@ -167,17 +455,19 @@ def check_python_environment():
         print_warning("Not running in virtual environment")
         print_warning("Consider creating one with: python3 -m venv venv")
     
-    # Check required Python packages
-    packages = ['requests', 'ansible']
+    # Check required Python packages against a single read of the installed metadata
+    installed = installed_distributions()
     all_installed = True
-    for package in packages:
-        if not check_python_package(package):
+    for package in REQUIRED_PACKAGES:
+        if not check_python_package(package, installed):
             all_installed = False
     
+    check_requirement_pins(installed)
+    
     return all_installed
 
 
-def check_system_tools():
+def check_system_tools(fast=False):
     """Check system tools"""
     print_header("Checking System Tools")
     
@@ -189,18 +479,87 @@ def check_system_tools():
         ('git', 'Git')
     ]
     
-    all_installed = True
-    for command, name in tools:
-        if not check_command(command, name):
-            all_installed = False
-    
-    return all_installed
+    results = run_parallel([(f"System Tools: {command}", check_command, (command, name, fast))
+                            for command, name in tools])
+    return all(results)
 
 
-def check_ansible_collections():
-    """Check Ansible collections"""
+def collection_search_paths():
+    """Return the directories Ansible searches for collections"""
+    configured = os.environ.get('ANSIBLE_COLLECTIONS_PATH') or os.environ.get('ANSIBLE_COLLECTIONS_PATHS')
+    paths = configured.split(os.pathsep) if configured else list(DEFAULT_COLLECTIONS_PATHS)
+    # Collections bundled with the pip "ansible" package live in site-packages
+    paths += [entry for entry in sys.path if entry]
+    
+    search_paths = []
+    for path in paths:
+        path = os.path.expanduser(path)
+        if os.path.basename(os.path.normpath(path)) != 'ansible_collections':
+            path = os.path.join(path, 'ansible_collections')
+        if path not in search_paths and os.path.isdir(path):
+            search_paths.append(path)
+    return search_paths
+
+
+def read_collection_version(collection_dir):
+    """Read a collection's version from MANIFEST.json or galaxy.yml"""
+    try:
+        with open(os.path.join(collection_dir, 'MANIFEST.json'), 'r') as f:
+            return json.load(f)['collection_info']['version']
+    except (OSError, ValueError, KeyError):
+        pass
+    try:
+        with open(os.path.join(collection_dir, 'galaxy.yml'), 'r') as f:
+            for line in f:
+                if line.startswith('version:'):
+                    return line.split(':', 1)[1].strip().strip('"\'')
+    except OSError:
+        pass
+    return 'unknown'
+
+
+def find_installed_collections():
+    """
+    Find installed collections by reading the collection directories
+    
+    Returns:
+        Dict of collection name to version; the first path wins, as in Ansible
+    """
+    installed = {}
+    for path in collection_search_paths():
+        with os.scandir(path) as namespaces:
+            for namespace in namespaces:
+                if not namespace.is_dir():
+                    continue
+                with os.scandir(namespace.path) as collections:
+                    for collection in collections:
+                        name = f"{namespace.name}.{collection.name}"
+                        if collection.is_dir() and name not in installed:
+                            installed[name] = read_collection_version(collection.path)
+    return installed
+
+
+def check_ansible_collections(fast=False):
+    """Check Ansible collections; fast mode reads them from disk instead of ansible-galaxy"""
     print_header("Checking Ansible Collections")
     
+    if fast:
+        try:
+            installed = find_installed_collections()
+        except OSError as e:
+            print_warning(f"Could not check Ansible collections: {e}")
+            return False
+        
+        all_installed = True
+        for collection in REQUIRED_COLLECTIONS:
+            if collection in installed:
+                print_success(f"Ansible collection '{collection}' is installed: {installed[collection]}")
+            else:
+                print_warning(f"Ansible collection '{collection}' not found")
+                print_warning(f"Install with: ansible-galaxy collection install {collection}")
+                all_installed = False
+        return all_installed
+    
     try:
         result = subprocess.run(
             ['ansible-galaxy', 'collection', 'list'],
@@ -211,10 +570,9 @@ def check_ansible_collections():
         
         output = result.stdout.decode()
         
-        collections = ['cisco.ios', 'cisco.dnac', 'community.general']
         all_installed = True
         
-        for collection in collections:
+        for collection in REQUIRED_COLLECTIONS:
             if collection in output:
                 print_success(f"Ansible collection '{collection}' is installed")
             else:
@@ -230,9 +588,21 @@ def check_ansible_collections():
 
 
 def check_configuration():
-    """Check configuration files for placeholders"""
+    """Lint the configuration files and check them for placeholders"""
     print_header("Checking Configuration")
     
+    # Schema and consistency checks; errors fail validation
+    report = lint_files()
+    for messages, print_message in ((report.errors, print_error), (report.warnings, print_warning)):
+        for message in messages[:MAX_LINT_MESSAGES]:
+            print_message(message)
+        if len(messages) > MAX_LINT_MESSAGES:
+            print_message(f"... and {len(messages) - MAX_LINT_MESSAGES} more "
+                          f"(see python3 python_scripts/config_lint.py)")
+    if report.ok:
+        print_success(f"Configuration files are valid and consistent "
+                      f"({len(report.warnings)} warnings)")
+    
     # Check if inventory has been customized
     inventory_path = 'ansible/inventory/hosts.yml'
     if os.path.exists(inventory_path):
@@ -263,6 +633,8 @@ def check_configuration():
                 print_warning(".gitignore may need to include .env and .vault_pass")
     else:
         print_warning(".gitignore not found")
+    
+    return report.ok
 
 
 def print_summary(checks_passed):
@@ -287,27 +659,59 @@ def print_summary(checks_passed):
         print("Refer to docs/mac-setup-guide.md for detailed setup instructions")
 
 
+def print_timings(elapsed):
+    """Print how long each check took, slowest first"""
+    print_header("Check Timing")
+    for name, seconds in sorted(check_timings.items(), key=lambda item: item[1], reverse=True):
+        emit(f"  {name:<40} {seconds * 1000:8.0f} ms")
+    emit(f"  {'Total (wall clock)':<40} {elapsed * 1000:8.0f} ms")
+
+
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Validate the SD-Access automation environment")
+    parser.add_argument("--fast", action="store_true",
+                        help="Find tools on PATH and read Ansible collections from disk "
+                             "instead of running them")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-run every check even if the environment is unchanged")
+    args = parser.parse_args()
+    
+    start = time.monotonic()
     print(f"{Colors.BOLD}{Colors.BLUE}")
     print("=" * 60)
     print("SD-Access Automation Environment Validation")
     print("=" * 60)
     print(f"{Colors.END}\n")
     
-    # Run all checks
-    checks = {
-        'Directory Structure': check_directory_structure(),
-        'Required Files': check_required_files(),
-        'Python Environment': check_python_environment(),
-        'System Tools': check_system_tools(),
-        'Ansible Collections': check_ansible_collections()
-    }
+    fingerprint = environment_fingerprint(args.fast)
+    cached = {} if args.no_cache else load_cached_checks(fingerprint)
+    if cached:
+        print_success(f"Environment unchanged, reusing cached results for: {', '.join(cached)}")
+        print_success("Run with --no-cache to check everything again")
+    
+    # Run all checks in parallel; each one's output is printed as a block
+    checks = [
+        ('Directory Structure', check_directory_structure, ()),
+        ('Required Files', check_required_files, ()),
+        ('Python Environment', check_python_environment, ()),
+        ('System Tools', check_system_tools, (args.fast,)),
+        ('Ansible Collections', check_ansible_collections, (args.fast,)),
+        ('Configuration', check_configuration, ())
+    ]
+    outcomes = run_checks(checks, cached)
+    for _, lines in outcomes:
+        for line in lines:
+            emit(line)
     
-    # Check configuration (informational only)
-    check_configuration()
+    passed = {name: outcome for (name, _, _), outcome in zip(checks, outcomes)
+              if name in CACHED_CHECKS and outcome[0]}
+    if passed.keys() - cached.keys():
+        save_cached_checks(fingerprint, passed)
+    checks = {name: result for (name, _, _), (result, _) in zip(checks, outcomes)}
     
     # Print summary
+    print_timings(time.monotonic() - start)
     print_summary(checks)
     
     # Return exit code